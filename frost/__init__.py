@@ -1,5 +1,6 @@
+from frost.client.async_client import AsyncFrostClient
 from frost.client.client import FrostClient
 from frost.ext import Cog, Handler
 from frost.server.server import FrostServer
 
-__all__ = ('FrostServer', 'FrostClient', 'Cog', 'Handler')
+__all__ = ('FrostServer', 'FrostClient', 'AsyncFrostClient', 'Cog', 'Handler')
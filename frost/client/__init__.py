@@ -1,3 +1,4 @@
+from frost.client.async_client import AsyncFrostClient
 from frost.client.auth import get_auth
 from frost.client.client import FrostClient
 from frost.client.headers import Status
@@ -6,6 +7,7 @@ from frost.client.socketio import threaded
 
 __all__ = (
     'FrostClient',
+    'AsyncFrostClient',
     'Status',
     'threaded',
     'get_auth',
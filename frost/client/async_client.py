@@ -0,0 +1,418 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Union
+
+from frost.client.events import Subscriptions
+from frost.client.headers import Status
+from frost.client.socketio import AsyncBaseClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFrostClient(AsyncBaseClient):
+    """The asyncio Frost Client, for running many sessions in a single process. \
+    Every request is awaited for the server's response. Events pushed by the server, \
+    such as new messages and members joining or leaving a room, are delivered \
+    to callbacks subscribed with :meth:`AsyncFrostClient.on`. New messages can also be \
+    iterated over with :meth:`AsyncFrostClient.messages`. \
+    The user's ID and token are kept on the client instead of in :code:`.frost`, \
+    and events are not routed to the process-wide client cogs \
+    used by :class:`frost.client.client.FrostClient`, so every client has its own session.
+
+    :param ip: The IP address of the server to connect to, defaults to '127.0.0.1'
+    :type ip: str, optional
+    :param port: The port of the server to connect to, defaults to 5555
+    :type port: int, optional
+    :param legacy_header: Whether to frame data with the platform dependent header \
+    expected by older servers, defaults to False
+    :type legacy_header: bool, optional
+    :param codec: The name of the codec to ask the server for when connecting, \
+    such as :code:`'msgpack'`, defaults to 'json'
+    :type codec: str, optional
+    :param compression: The name of the compression to ask the server for when \
+    connecting, such as :code:`'zlib'`, defaults to None
+    :type compression: Optional[str], optional
+    """
+
+    MESSAGE_QUEUE_SIZE: int = 1000
+    """The number of new messages kept for :meth:`AsyncFrostClient.messages`, \
+    the oldest ones are dropped once it is reached.
+    """
+
+    def __init__(
+        self,
+        ip: str = '127.0.0.1',
+        port: int = 5555,
+        legacy_header: bool = False,
+        codec: str = 'json',
+        compression: Optional[str] = None
+    ) -> None:
+        """The constructor method.
+        """
+        super(AsyncFrostClient, self).__init__(ip, port, legacy_header, codec, compression)
+
+        self.id: Optional[int] = None
+        """The ID of the logged in user.
+        """
+        self.token: Optional[str] = None
+        """The token of the logged in user.
+        """
+
+        self.subscriptions = Subscriptions()
+        """The callbacks and queues events pushed by the server are delivered to.
+        """
+
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, 'asyncio.Future'] = dict()
+        self._messages: Optional[asyncio.Queue] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> 'AsyncFrostClient':
+        """The __aenter__ method, connects to the server.
+
+        :return: This instance of this class
+        :rtype: 'AsyncFrostClient'
+        """
+        await self.connect()
+        return self
+
+    async def __aexit__(self, type_, value, traceback) -> None:
+        """The __aexit__ method, closes the connection to the server.
+        """
+        await self.close()
+
+    async def connect(self) -> None:
+        """Connect to the server and begin listening for events.
+        """
+        await super().connect()
+
+        self._messages = asyncio.Queue()
+        self._listener = asyncio.ensure_future(self._listen())
+
+    async def close(self) -> None:
+        """Close the connection to the server and stop listening for events.
+        """
+        await super().close()
+
+        if self._listener is not None:
+            await self._listener
+            self._listener = None
+
+    def on(self, event: str, callback: Optional[Callable] = None) -> Callable:
+        """Calls a callback with the data of each :code:`'message'`, :code:`'member_joined'` \
+        or :code:`'member_left'` event as soon as it is received. Can be used as a decorator, \
+        see :meth:`frost.client.events.subscriptions.Subscriptions.on`.
+
+        :param event: The event to subscribe to
+        :type event: str
+        :param callback: Called with the event's data, defaults to None
+        :type callback: Optional[Callable], optional
+        :return: The callback, or a decorator if no callback was given
+        :rtype: Callable
+        """
+        return self.subscriptions.on(event, callback)
+
+    def off(self, event: str, callback: Callable) -> None:
+        """Stops calling a callback subscribed with :meth:`on`.
+
+        :param event: The event the callback is subscribed to
+        :type event: str
+        :param callback: The callback
+        :type callback: Callable
+        """
+        self.subscriptions.off(event, callback)
+
+    async def messages(self) -> AsyncIterator[Dict[str, Any]]:
+        """Iterates over new messages as they are received, including the history \
+        sent after logging in or requested with :meth:`AsyncFrostClient.get_room_msgs`, \
+        until the connection is closed. Each message has its ID under :code:`'id'`.
+
+        :return: The new messages
+        :rtype: AsyncIterator[Dict[str, Any]]
+        """
+        while True:
+            msg = await self._messages.get()
+
+            if msg is None:
+                # Let any other iterator finish as well
+                self._messages.put_nowait(None)
+                return
+
+            yield msg
+
+    def _add_messages(self, msgs: Optional[Dict[Any, Dict[str, Any]]]) -> None:
+        """Queues new messages for :meth:`AsyncFrostClient.messages`, \
+        dropping the oldest ones if the queue is full. None marks the end of the messages.
+
+        :param msgs: The messages by their IDs, or None
+        :type msgs: Optional[Dict[Any, Dict[str, Any]]]
+        """
+        items = [None] if msgs is None else [dict(msg, id=id_) for id_, msg in msgs.items()]
+
+        for item in items:
+            if self._messages.qsize() >= self.MESSAGE_QUEUE_SIZE:
+                self._messages.get_nowait()
+
+            self._messages.put_nowait(item)
+
+    async def _request(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Sends a request with a new :code:`request_id` header and waits for the response.
+
+        :param data: The request
+        :type data: Dict[str, Any]
+        :raises ConnectionError: If the connection is closed before the response arrives
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        future = asyncio.get_running_loop().create_future()
+        request_id = next(self._request_ids)
+        self._pending[request_id] = future
+
+        data['headers']['request_id'] = request_id
+
+        try:
+            await self.send(data)
+            return await future
+
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _resolve(self, data: Dict[str, Any]) -> bool:
+        """Resolves the future of the request a response answers. \
+        Only the first response carrying a status resolves it.
+
+        :param data: Data received from the server
+        :type data: Dict[str, Any]
+        :return: Whether the response answered a request
+        :rtype: bool
+        """
+        try:
+            headers = data['headers']
+            request_id = headers['request_id']
+        except (KeyError, TypeError):
+            return False
+
+        if 'status' not in headers:
+            return False
+
+        future = self._pending.pop(request_id, None)
+
+        if future is None:
+            return False
+
+        if not future.done():
+            future.set_result(data)
+
+        return True
+
+    async def _listen(self) -> None:
+        """Listen for events until the connection is closed. Responses are returned \
+        by the request awaiting them, other events are delivered to their subscribers.
+        """
+        while True:
+            try:
+                data = await self.recieve()
+            except (asyncio.IncompleteReadError, ConnectionError, OSError, ValueError) as e:
+                error = ConnectionError(f'Connection closed: {e}')
+                break
+
+            if self._resolve(data):
+                continue
+
+            try:
+                if data['headers']['path'] == 'messages/new':
+                    self._add_messages(data['msg'])
+
+            except Exception:
+                logger.exception('Unhandled error while handling an event')
+
+            self.subscriptions.publish(data)
+
+        pending, self._pending = self._pending, dict()
+
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+        self._add_messages(None)
+
+    def _auth_headers(self, path: str) -> Dict[str, Any]:
+        """Builds the headers of a request which needs the user to be logged in.
+
+        :param path: The path of the request
+        :type path: str
+        :return: The headers
+        :rtype: Dict[str, Any]
+        """
+        return {
+            'path': path,
+            'token': self.token,
+            'id': self.id
+        }
+
+    async def login(self, username: str, password: str) -> Dict[str, Any]:
+        """Login to the server, keeping the user's ID and token on the client.
+
+        :param username: The username of the account
+        :type username: str
+        :param password: The password of the account
+        :type password: str
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        response = await self._request({
+            'headers': {
+                'path': 'authentication/login'
+            },
+            'username': username,
+            'password': password
+        })
+
+        if response['headers']['status'] == Status.SUCCESS.value:
+            self.id = response['id']
+            self.token = response['token']
+
+        return response
+
+    async def register(self, username: str, password: str) -> Dict[str, Any]:
+        """Register an account on the server.
+
+        :param username: The desired username of the account
+        :type username: str
+        :param password: The desired password of the account
+        :type password: str
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': {
+                'path': 'authentication/register'
+            },
+            'username': username,
+            'password': password
+        })
+
+    async def send_msg(self, room_id: int, msg: str) -> Dict[str, Any]:
+        """Send a message to other users on a server in a specific room.
+
+        :param room_id: The ID of the room to send the message to
+        :type room_id: int
+        :param msg: The desired message to send
+        :type msg: str
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': self._auth_headers('messages/send_msg'),
+            'msg': msg,
+            'room_id': room_id
+        })
+
+    async def get_room_msgs(
+        self,
+        room_id: int,
+        before: Optional[Union[int, str]] = None,
+        after: Optional[Union[int, str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get messages from a specific room in a server, the latest ones by default. \
+        The messages arrive after the response, through :meth:`AsyncFrostClient.messages`.
+
+        :param room_id: The ID of the room to get the messages from
+        :type room_id: int
+        :param before: Only get messages with an ID lower than this one, \
+        which may be given as the string it was received as, defaults to None
+        :type before: Optional[Union[int, str]], optional
+        :param after: Only get messages with an ID higher than this one, \
+        which may be given as the string it was received as, defaults to None
+        :type after: Optional[Union[int, str]], optional
+        :param limit: The maximum number of messages to get, \
+        capped by the server, defaults to None
+        :type limit: Optional[int], optional
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': self._auth_headers('messages/get_room_msgs'),
+            'room_id': room_id,
+            # Message IDs are received as strings, the server only takes integers
+            'before_id': None if before is None else int(before),
+            'after_id': None if after is None else int(after),
+            'limit': limit
+        })
+
+    async def create_room(self, room_name: str) -> Dict[str, Any]:
+        """Create a new room in a server.
+
+        :param room_name: The name of the room to create
+        :type room_name: str
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': self._auth_headers('rooms/create'),
+            'room_name': room_name
+        })
+
+    async def join_room(self, invite_code: str) -> Dict[str, Any]:
+        """Join a room in a server with an invite code.
+
+        :param invite_code: The invite code the room to join
+        :type invite_code: str
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': self._auth_headers('rooms/join'),
+            'invite_code': invite_code
+        })
+
+    async def leave_room(self, room_id: int) -> Dict[str, Any]:
+        """Leave a joined room in a server.
+
+        :param room_id: The ID of the room to leave
+        :type room_id: int
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': self._auth_headers('rooms/leave'),
+            'room_id': room_id
+        })
+
+    async def get_invite_code(self, room_id: int) -> Dict[str, Any]:
+        """Get the invite code of a room in a server.
+
+        :param room_id: The ID of the room to get an invite code from
+        :type room_id: int
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': self._auth_headers('rooms/get_invite_code'),
+            'room_id': room_id
+        })
+
+    async def get_joined_rooms(self) -> Dict[str, Any]:
+        """Get all the joined rooms of the logged in user.
+
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': self._auth_headers('rooms/get_all_joined')
+        })
+
+    async def get_room_members(self, room_id: int) -> Dict[str, Any]:
+        """Get all the members of a specific room.
+
+        :param room_id: The ID of the room to get the members of
+        :type room_id: int
+        :return: The server's response
+        :rtype: Dict[str, Any]
+        """
+        return await self._request({
+            'headers': self._auth_headers('rooms/get_members'),
+            'room_id': room_id
+        })
@@ -1,35 +1,73 @@
+import itertools
 import json
+import logging
+import threading
+from concurrent.futures import Future
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
 
 from frost.client.auth import get_auth
 from frost.client.events import (
     Auth,
+    Errors,
     Msgs,
-    Rooms
+    Rooms,
+    Subscriptions
 )
 from frost.client.socketio import BaseClient, threaded
-from frost.ext import Handler
+from frost.ext import Handler, UnknownRouteError
+
+logger = logging.getLogger(__name__)
 
 
 class FrostClient(BaseClient):
-    """The Frost Client.
+    """The Frost Client. Every request returns a :class:`concurrent.futures.Future`, \
+    resolved with the server's response once it has been handled, so many requests \
+    can be in flight at once. Requests are told apart by a :code:`request_id` header \
+    the server echoes back. Events pushed by the server are delivered to callbacks \
+    subscribed with :meth:`FrostClient.on`.
 
     :param ip: The IP address of the server to connect to, defaults to '127.0.0.1'
     :type ip: str, optional
     :param port: The port of the server to connect to, defaults to 5555
     :type port: int, optional
+    :param legacy_header: Whether to frame data with the platform dependent header \
+    expected by older servers, defaults to False
+    :type legacy_header: bool, optional
+    :param codec: The name of the codec to ask the server for when connecting, \
+    such as :code:`'msgpack'`, defaults to 'json'
+    :type codec: str, optional
+    :param compression: The name of the compression to ask the server for when \
+    connecting, such as :code:`'zlib'`, defaults to None
+    :type compression: Optional[str], optional
     """
 
-    def __init__(self, ip: str = '127.0.0.1', port: int = 5555) -> None:
+    def __init__(
+        self,
+        ip: str = '127.0.0.1',
+        port: int = 5555,
+        legacy_header: bool = False,
+        codec: str = 'json',
+        compression: Optional[str] = None
+    ) -> None:
         """The constructor method.
         """
-        super(FrostClient, self).__init__(ip, port)
+        super(FrostClient, self).__init__(ip, port, legacy_header, codec, compression)
 
         # Load up cogs
         Auth()
+        Errors()
         Msgs()
         Rooms()
 
+        self.subscriptions = Subscriptions()
+        """The callbacks and queues events pushed by the server are delivered to.
+        """
+
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, 'Future'] = dict()
+        self._pending_lock = threading.Lock()
+
         frost_file = Path('.frost')
         if not frost_file.exists():
             with open(str(frost_file), 'w') as f:
@@ -55,24 +93,147 @@ class FrostClient(BaseClient):
         super().connect()
         self._listen()
 
+    def on(self, event: str, callback: Optional[Callable] = None) -> Callable:
+        """Calls a callback with the data of each :code:`'message'`, :code:`'member_joined'` \
+        or :code:`'member_left'` event as soon as it is received. Can be used as a decorator, \
+        see :meth:`frost.client.events.subscriptions.Subscriptions.on`.
+
+        :param event: The event to subscribe to
+        :type event: str
+        :param callback: Called with the event's data, defaults to None
+        :type callback: Optional[Callable], optional
+        :return: The callback, or a decorator if no callback was given
+        :rtype: Callable
+        """
+        return self.subscriptions.on(event, callback)
+
+    def off(self, event: str, callback: Callable) -> None:
+        """Stops calling a callback subscribed with :meth:`on`.
+
+        :param event: The event the callback is subscribed to
+        :type event: str
+        :param callback: The callback
+        :type callback: Callable
+        """
+        self.subscriptions.off(event, callback)
+
+    def _request(self, data: Dict[str, Any]) -> 'Future':
+        """Sends a request with a new :code:`request_id` header.
+
+        :param data: The request
+        :type data: Dict[str, Any]
+        :return: A future resolved with the server's response
+        :rtype: Future
+        """
+        future = Future()
+
+        with self._pending_lock:
+            request_id = next(self._request_ids)
+            self._pending[request_id] = future
+
+        data['headers']['request_id'] = request_id
+
+        try:
+            self.send(data)
+
+        except Exception as e:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+
+            future.set_exception(e)
+
+        return future
+
+    def _resolve(self, data: Dict[str, Any], error: Optional[Exception] = None) -> bool:
+        """Resolves the future of the request a response answers. \
+        Only the first response carrying a status resolves it.
+
+        :param data: Data received from the server
+        :type data: Dict[str, Any]
+        :param error: The exception raised while handling the response, \
+        set on the future instead of the response, defaults to None
+        :type error: Optional[Exception], optional
+        :return: Whether the response answered a request
+        :rtype: bool
+        """
+        try:
+            headers = data['headers']
+            request_id = headers['request_id']
+        except (KeyError, TypeError):
+            return False
+
+        if 'status' not in headers:
+            return False
+
+        with self._pending_lock:
+            future = self._pending.pop(request_id, None)
+
+        if future is None:
+            return False
+
+        if future.set_running_or_notify_cancel():
+            if error is None:
+                future.set_result(data)
+            else:
+                future.set_exception(error)
+
+        return True
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fails the futures of every request still waiting for a response.
+
+        :param error: The exception to set on the futures
+        :type error: Exception
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, dict()
+
+        for future in pending.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
     @threaded(daemon=True)
     def _listen(self) -> None:
-        """Listen for events and handle them.
+        """Listen for events and handle them, deliver them to their subscribers, \
+        then resolve the future of the request they answer. Events without a route \
+        on the client are ignored. An error while handling a response is set on \
+        its request's future, or logged if it answers none. Once the connection is closed, \
+        requests still waiting fail with :class:`ConnectionError`.
         """
         handler = Handler()
 
         while True:
-            handler.handle(self.recieve())
+            try:
+                data = self.recieve()
+            except (ConnectionError, OSError, ValueError) as e:
+                self._fail_pending(ConnectionError(f'Connection closed: {e}'))
+                break
+
+            error = None
+
+            try:
+                handler.handle(data)
+            except UnknownRouteError:
+                pass
+            except Exception as e:
+                error = e
+
+            self.subscriptions.publish(data)
 
-    def login(self, username: str, password: str) -> None:
+            if not self._resolve(data, error) and error is not None:
+                logger.error('Unhandled error while handling an event', exc_info=error)
+
+    def login(self, username: str, password: str) -> 'Future':
         """Login to the server.
 
         :param username: The username of the account
         :type username: str
         :param password: The password of the account
         :type password: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'authentication/login'
             },
@@ -80,15 +241,17 @@ class FrostClient(BaseClient):
             'password': password
         })
 
-    def register(self, username: str, password: str) -> None:
+    def register(self, username: str, password: str) -> 'Future':
         """Register an account on the server.
 
         :param username: The desired username of the account
         :type username: str
         :param password: The desired password of the account
         :type password: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'authentication/register'
             },
@@ -97,7 +260,7 @@ class FrostClient(BaseClient):
         })
 
     @get_auth
-    def send_msg(self, room_id: int, msg: str, token: str, id_: str) -> None:
+    def send_msg(self, room_id: int, msg: str, token: str, id_: str) -> 'Future':
         """Send a message to other users on a server in a specific room.
 
         :param room_id: The ID of the room to send the message to
@@ -108,8 +271,10 @@ class FrostClient(BaseClient):
         :type token: str
         :param id_: The user's ID, auto filled by :meth:`frost.client.auth.get_auth`
         :type id_: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'token': token,
                 'id': id_,
@@ -123,25 +288,45 @@ class FrostClient(BaseClient):
     def get_room_msgs(
         self,
         room_id: int,
-        token: str,
-        id_: str
-    ) -> None:
-        """Get all messages from a specific room in a server.
+        before: Optional[Union[int, str]] = None,
+        after: Optional[Union[int, str]] = None,
+        limit: Optional[int] = None,
+        token: Optional[str] = None,
+        id_: Optional[str] = None
+    ) -> 'Future':
+        """Get messages from a specific room in a server, the latest ones by default. \
+        Older history is paged through by passing the lowest message ID received \
+        as :code:`before`.
 
         :param room_id: The ID of the room to get the messages from
         :type room_id: int
+        :param before: Only get messages with an ID lower than this one, \
+        which may be given as the string it was received as, defaults to None
+        :type before: Optional[Union[int, str]], optional
+        :param after: Only get messages with an ID higher than this one, \
+        which may be given as the string it was received as, defaults to None
+        :type after: Optional[Union[int, str]], optional
+        :param limit: The maximum number of messages to get, \
+        capped by the server, defaults to None
+        :type limit: Optional[int], optional
         :param token: The user's token, auto filled by :meth:`frost.client.auth.get_auth`
         :type token: str
         :param id_: The user's ID, auto filled by :meth:`frost.client.auth.get_auth`
         :type id_: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'messages/get_room_msgs',
                 'token': token,
                 'id': id_
             },
-            'room_id': room_id
+            'room_id': room_id,
+            # Message IDs are received as strings, the server only takes integers
+            'before_id': None if before is None else int(before),
+            'after_id': None if after is None else int(after),
+            'limit': limit
         })
 
     @get_auth
@@ -150,7 +335,7 @@ class FrostClient(BaseClient):
         room_name: str,
         token: str,
         id_: str
-    ) -> None:
+    ) -> 'Future':
         """Create a new room in a server.
 
         :param room_name: The name of the room to create
@@ -159,8 +344,10 @@ class FrostClient(BaseClient):
         :type token: str
         :param id_: The user's ID, auto filled by :meth:`frost.client.auth.get_auth`
         :type id_: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'rooms/create',
                 'token': token,
@@ -175,7 +362,7 @@ class FrostClient(BaseClient):
         invite_code: str,
         token: str,
         id_: str
-    ) -> None:
+    ) -> 'Future':
         """Join a room in a server with an invite code.
 
         :param invite_code: The invite code the room to join
@@ -184,8 +371,10 @@ class FrostClient(BaseClient):
         :type token: str
         :param id_: The user's ID, auto filled by :meth:`frost.client.auth.get_auth`
         :type id_: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'rooms/join',
                 'token': token,
@@ -200,7 +389,7 @@ class FrostClient(BaseClient):
         room_id: int,
         token: str,
         id_: str
-    ) -> None:
+    ) -> 'Future':
         """Leave a joined room in a server.
 
         :param room_id: The ID of the room to leave
@@ -209,8 +398,10 @@ class FrostClient(BaseClient):
         :type token: str
         :param id_: The user's ID, auto filled by :meth:`frost.client.auth.get_auth`
         :type id_: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'rooms/leave',
                 'token': token,
@@ -225,7 +416,7 @@ class FrostClient(BaseClient):
         room_id: int,
         token: str,
         id_: str
-    ) -> None:
+    ) -> 'Future':
         """Get the invite code of a room in a server.
 
         :param room_id: The ID of the room to get an invite code from
@@ -234,8 +425,10 @@ class FrostClient(BaseClient):
         :type token: str
         :param id_: The user's ID, auto filled by :meth:`frost.client.auth.get_auth`
         :type id_: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'rooms/get_invite_code',
                 'token': token,
@@ -249,15 +442,17 @@ class FrostClient(BaseClient):
         self,
         token: str,
         id_: str
-    ) -> None:
+    ) -> 'Future':
         """Get all the joined rooms of the currently logged in user.
 
         :param token: The user's token, auto filled by :meth:`frost.client.auth.get_auth`
         :type token: str
         :param id_: The user's ID, auto filled by :meth:`frost.client.auth.get_auth`
         :type id_: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'rooms/get_all_joined',
                 'token': token,
@@ -271,7 +466,7 @@ class FrostClient(BaseClient):
         room_id: int,
         token: str,
         id_: str
-    ) -> None:
+    ) -> 'Future':
         """Get all the members of a specific room.
 
         :param room_id: The ID of the room to get the members of
@@ -280,8 +475,10 @@ class FrostClient(BaseClient):
         :type token: str
         :param id_: The user's ID, auto filled by :meth:`frost.client.auth.get_auth`
         :type id_: str
+        :return: A future resolved with the server's response
+        :rtype: Future
         """
-        self.send({
+        return self._request({
             'headers': {
                 'path': 'rooms/get_members',
                 'token': token,
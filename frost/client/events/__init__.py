@@ -1,10 +1,13 @@
-from frost.client.events.cogs import Auth, Msgs, Rooms
+from frost.client.events.cogs import Auth, Errors, Msgs, Rooms
 from frost.client.events.events import EventStatus, Messages
+from frost.client.events.subscriptions import Subscriptions
 
 __all__ = (
     'Auth',
+    'Errors',
     'Msgs',
     'Rooms',
     'Messages',
-    'EventStatus'
+    'EventStatus',
+    'Subscriptions'
 )
@@ -160,3 +160,24 @@ class Rooms(Cog, route='rooms'):
         :type data: Dict[str, Any]
         """
         Memory.remove_room_member(data['room_id'], data['user_id'])
+
+
+class Errors(Cog, route='errors'):
+    """Deals with errors sent by the server. :code:`route='errors'`
+    """
+
+    def unknown_route(data: Dict[str, Any]) -> None:
+        """Deals with the response to a request the server has no route for.
+
+        :param data: Data received from the server
+        :type data: Dict[str, Any]
+        """
+        EventStatus.unknown_route = data['route']
+
+    def invalid_auth(data: Dict[str, Any]) -> None:
+        """Deals with the response to a request which needed a valid login.
+
+        :param data: Data received from the server
+        :type data: Dict[str, Any]
+        """
+        EventStatus.invalid_auth = data['route']
@@ -1,3 +1,4 @@
+import threading
 from typing import Dict, Optional, Union
 
 
@@ -10,6 +11,7 @@ class Messages:
     __new = dict()
     """New, unread messages.
     """
+    _lock = threading.Lock()
 
     @classmethod
     def get_new_msgs(cls) -> Dict[int, Dict[str, Dict[str, Union[str, Dict[str, str]]]]]:
@@ -18,10 +20,10 @@ class Messages:
         :return: The new messages
         :rtype: Dict[int, Dict[str, Dict[str, Union[str, Dict[str, str]]]]]
         """
-        try:
-            return cls.__new
-        finally:
-            cls.__new = dict()
+        with cls._lock:
+            new, cls.__new = cls.__new, dict()
+
+        return new
 
     @classmethod
     def add_new_msgs(
@@ -32,24 +34,26 @@ class Messages:
         :param msgs: The messages to save
         :type msgs: Dict[int, Dict[str, Dict[str, Union[str, Dict[str, str]]]]]
         """
-        for msg_id, msg in msgs.items():
+        with cls._lock:
+            for msg_id, msg in msgs.items():
 
-            if msg['room']['id'] in cls.__new:
-                cls.__new[msg['room']['id']].update({msg_id: msg})
-            else:
-                cls.__new[msg['room']['id']] = {msg_id: msg}
+                if msg['room']['id'] in cls.__new:
+                    cls.__new[msg['room']['id']].update({msg_id: msg})
+                else:
+                    cls.__new[msg['room']['id']] = {msg_id: msg}
 
-            if msg['room']['id'] in cls.all:
-                cls.all[msg['room']['id']].update({msg_id: msg})
-            else:
-                cls.all[msg['room']['id']] = {msg_id: msg}
+                if msg['room']['id'] in cls.all:
+                    cls.all[msg['room']['id']].update({msg_id: msg})
+                else:
+                    cls.all[msg['room']['id']] = {msg_id: msg}
 
     @classmethod
     def clear(cls) -> None:
         """Clears :code:`cls.all` and :code:`cls.__new`.
         """
-        cls.all = dict()
-        cls.__new = dict()
+        with cls._lock:
+            cls.all = dict()
+            cls.__new = dict()
 
 
 class EventStatus:
@@ -68,6 +72,9 @@ class EventStatus:
     get_room_members = None
     get_joined_rooms = None
 
+    unknown_route = None
+    invalid_auth = None
+
     @classmethod
     def get_status(cls, item: str) -> Optional[int]:
         """Returns the current status of the specified item \
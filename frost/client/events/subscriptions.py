@@ -0,0 +1,176 @@
+import asyncio
+import inspect
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriptions:
+    """Delivers events pushed by the server to callbacks as soon as the client's listener \
+    has decoded and handled them, instead of them being polled for. \
+    Consumers who would rather pull events can get a thread-safe \
+    :class:`queue.Queue` of them with :meth:`Subscriptions.queue`. \
+    Subscribers are kept in tuples which are replaced rather than changed, \
+    so events are delivered without taking a lock.
+
+    The events are:
+
+    * :code:`'message'`, a new message, with its ID under :code:`'id'`
+    * :code:`'member_joined'`, with the :code:`'room_id'` and the :code:`'user'` who joined
+    * :code:`'member_left'`, with the :code:`'room_id'` and the :code:`'user_id'` who left
+    """
+
+    EVENTS = ('message', 'member_joined', 'member_left')
+    """The events which can be subscribed to.
+    """
+
+    def __init__(self) -> None:
+        """The constructor method.
+        """
+        self._callbacks: Dict[str, Tuple[Callable, ...]] = {event: () for event in self.EVENTS}
+        self._queues: Tuple[Tuple['queue.Queue', frozenset], ...] = ()
+        self._lock = threading.Lock()
+
+    def _check(self, event: str) -> None:
+        """Checks an event can be subscribed to.
+
+        :param event: The event
+        :type event: str
+        :raises ValueError: If the event is not one of :attr:`Subscriptions.EVENTS`
+        """
+        if event not in self.EVENTS:
+            raise ValueError(f'Unknown event "{event}", expected one of {self.EVENTS}')
+
+    def on(self, event: str, callback: Optional[Callable] = None) -> Callable:
+        """Calls a callback with each event's data, on the client's listener. \
+        Can be used as a decorator. The callback should return quickly, \
+        as the client handles nothing else while it runs. A coroutine function \
+        may be used with :class:`frost.client.async_client.AsyncFrostClient`, \
+        it is scheduled as a task.
+
+        :param event: The event to subscribe to
+        :type event: str
+        :param callback: Called with the event's data, defaults to None
+        :type callback: Optional[Callable], optional
+        :raises ValueError: If the event is not one of :attr:`Subscriptions.EVENTS`
+        :return: The callback, or a decorator if no callback was given
+        :rtype: Callable
+        """
+        self._check(event)
+
+        if callback is None:
+            return lambda func: self.on(event, func)
+
+        with self._lock:
+            self._callbacks[event] += (callback,)
+
+        return callback
+
+    def off(self, event: str, callback: Callable) -> None:
+        """Stops calling a callback.
+
+        :param event: The event the callback is subscribed to
+        :type event: str
+        :param callback: The callback
+        :type callback: Callable
+        :raises ValueError: If the event is not one of :attr:`Subscriptions.EVENTS`
+        """
+        self._check(event)
+
+        with self._lock:
+            self._callbacks[event] = tuple(
+                subscribed for subscribed in self._callbacks[event] if subscribed != callback
+            )
+
+    def queue(self, events: Optional[Iterable[str]] = None, maxsize: int = 0) -> 'queue.Queue':
+        """Creates a queue receiving :code:`(event, data)` tuples, for consumers \
+        which would rather pull events. Events are dropped rather than waited \
+        for while a bounded queue is full.
+
+        :param events: The events to receive, defaults to every event
+        :type events: Optional[Iterable[str]], optional
+        :param maxsize: The most events the queue holds, 0 for no limit, defaults to 0
+        :type maxsize: int, optional
+        :raises ValueError: If an event is not one of :attr:`Subscriptions.EVENTS`
+        :return: The queue
+        :rtype: queue.Queue
+        """
+        events = frozenset(self.EVENTS if events is None else events)
+
+        for event in events:
+            self._check(event)
+
+        result = queue.Queue(maxsize)
+
+        with self._lock:
+            self._queues += ((result, events),)
+
+        return result
+
+    def remove_queue(self, result: 'queue.Queue') -> None:
+        """Stops putting events in a queue made by :meth:`Subscriptions.queue`.
+
+        :param result: The queue
+        :type result: queue.Queue
+        """
+        with self._lock:
+            self._queues = tuple(item for item in self._queues if item[0] is not result)
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        """Delivers an event to its callbacks and queues. \
+        Errors raised by callbacks are logged.
+
+        :param event: The event
+        :type event: str
+        :param data: The event's data
+        :type data: Dict[str, Any]
+        """
+        for callback in self._callbacks[event]:
+            try:
+                result = callback(data)
+
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+
+            except Exception:
+                logger.exception(f'Unhandled error in a callback for "{event}"')
+
+        for result, events in self._queues:
+            if event in events:
+                try:
+                    result.put_nowait((event, data))
+                except queue.Full:
+                    pass
+
+    def publish(self, data: Dict[str, Any]) -> None:
+        """Emits the events of data pushed by the server, if it has any. \
+        Malformed data is ignored.
+
+        :param data: Data received from the server
+        :type data: Dict[str, Any]
+        """
+        try:
+            path = data['headers'].get('path')
+
+            if path == 'messages/new':
+                events = [('message', dict(msg, id=id_)) for id_, msg in data['msg'].items()]
+
+            elif path == 'rooms/new_room_member':
+                events = [('member_joined', {'room_id': data['room_id'], 'user': data['user']})]
+
+            elif path == 'rooms/remove_room_member':
+                events = [
+                    ('member_left', {'room_id': data['room_id'], 'user_id': data['user_id']})
+                ]
+
+            else:
+                return
+
+        except (KeyError, TypeError, AttributeError, ValueError):
+            return
+
+        for event, event_data in events:
+            self.emit(event, event_data)
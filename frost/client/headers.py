@@ -15,3 +15,7 @@ class Status(Enum):
     EMPTY_ROOM_NAME: int = 5
     DUPLICATE_ROOM_NAME: int = 6
     INVALID_INVITE: int = 7
+
+    UNKNOWN_ROUTE: int = 8
+    INVALID: int = 9
+    MESSAGE_NOT_SAVED: int = 10
@@ -1,3 +1,4 @@
+import threading
 from typing import Dict, Tuple, Union
 
 
@@ -58,6 +59,7 @@ class Memory:
     """New members which have just joined a room or \
     members who have just left the room, grouped by room.
     """
+    _lock = threading.Lock()
 
     @classmethod
     def add_rooms(cls, *rooms: Tuple[Dict[str, Union[str, int]]]) -> None:
@@ -72,37 +74,48 @@ class Memory:
 
     @classmethod
     def add_room_members(cls, room_id: int, *members: Tuple[Dict[str, Union[str, int]]]) -> None:
-        """Store members within a room stored in :code:`Memory.rooms`.
+        """Store members within a room stored in :code:`Memory.rooms`. \
+        Members of a room which is not stored are ignored.
 
         :param room_id: The ID of the room to store the members in
         :type room_id: int
         """
+        if room_id not in cls.rooms:
+            return
+
         new_members = {
             m['id']: User(m['id'], m['username']) for m in members
         }
-        cls.rooms[room_id].members.update(new_members)
 
-        if cls.member_changes['joined'].get(room_id) is None:
-            cls.member_changes['joined'][room_id] = cls.rooms[room_id]
+        with cls._lock:
+            cls.rooms[room_id].members.update(new_members)
+
+            if cls.member_changes['joined'].get(room_id) is None:
+                cls.member_changes['joined'][room_id] = cls.rooms[room_id]
 
-        cls.member_changes['joined'][room_id]._members_joined.update(new_members)
+            cls.member_changes['joined'][room_id]._members_joined.update(new_members)
 
     @classmethod
     def remove_room_member(cls, room_id: int, user_id: int) -> None:
-        """Remove a room member who left stored in a room.
+        """Remove a room member who left stored in a room. \
+        Members who are not stored are ignored.
 
         :param room_id: The room's ID the user left from
         :type room_id: int
         :param user_id: The ID of the user who left
         :type user_id: int
         """
-        member = cls.rooms[room_id].members[user_id]
-        cls.rooms[room_id].members.pop(user_id)
+        with cls._lock:
+            room = cls.rooms.get(room_id)
+            if room is None or user_id not in room.members:
+                return
 
-        if cls.member_changes['left'].get(room_id) is None:
-            cls.member_changes['left'][room_id] = cls.rooms[room_id]
+            member = room.members.pop(user_id)
 
-        cls.member_changes['left'][room_id]._members_left[user_id] = member
+            if cls.member_changes['left'].get(room_id) is None:
+                cls.member_changes['left'][room_id] = cls.rooms[room_id]
+
+            cls.member_changes['left'][room_id]._members_left[user_id] = member
 
     @classmethod
     def get_room_member_changes(cls) -> Dict[str, Dict[int, 'Room']]:
@@ -111,14 +124,14 @@ class Memory:
         :return: Room member changes
         :rtype: Dict[str, Dict[int, 'Room']]
         """
-        try:
-            return cls.member_changes
-        finally:
-            cls.member_changes = {
+        with cls._lock:
+            changes, cls.member_changes = cls.member_changes, {
                 'left': {},
                 'joined': {}
             }
 
+        return changes
+
     @classmethod
     def set_invite_code(cls, room_id: int, invite_code: str) -> None:
         """Store the invite code of a specific room.
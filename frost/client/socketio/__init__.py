@@ -1,4 +1,5 @@
+from frost.client.socketio.async_base_client import AsyncBaseClient
 from frost.client.socketio.base_client import BaseClient
 from frost.client.socketio.utils import threaded
 
-__all__ = ('BaseClient', 'threaded')
+__all__ = ('AsyncBaseClient', 'BaseClient', 'threaded')
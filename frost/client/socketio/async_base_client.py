@@ -0,0 +1,135 @@
+import asyncio
+from typing import Any, Optional
+
+from frost.ext.exceptions import FrameTooLargeError
+from frost.ext.socketio.codec import CODECS, COMPRESSIONS, JSON, compressed, handshake
+from frost.ext.socketio.framing import (
+    HEADER, LEGACY_HEADER, MAX_FRAME_SIZE, encode, unpack_size
+)
+
+
+class AsyncBaseClient:
+    """An asyncio based client to connect to, send data to and receive data from the server, \
+    so many clients can share a single thread.
+
+    :param ip: The IP address of the server to connect to, defaults to '127.0.0.1'
+    :type ip: str, optional
+    :param port: The port of the server to connect to, defaults to 5555
+    :type port: int, optional
+    :param legacy_header: Whether to frame data with the platform dependent header \
+    expected by older servers, defaults to False
+    :type legacy_header: bool, optional
+    :param codec: The name of the codec to ask the server for when connecting, \
+    see :mod:`frost.ext.socketio.codec`, defaults to 'json'
+    :type codec: str, optional
+    :param compression: The name of the compression to ask the server for when \
+    connecting, or None for no compression, defaults to None
+    :type compression: Optional[str], optional
+    :raises ValueError: If the codec or compression is not available
+    """
+
+    HANDSHAKE_TIMEOUT: float = 10.0
+    """How long in seconds to wait for the server to answer the handshake.
+    """
+
+    MAX_FRAME_SIZE: int = MAX_FRAME_SIZE
+    """The size in bytes of the largest frame accepted from the server, \
+    larger ones raise :class:`frost.ext.exceptions.FrameTooLargeError`.
+    """
+
+    def __init__(
+        self,
+        ip: str = '127.0.0.1',
+        port: int = 5555,
+        legacy_header: bool = False,
+        codec: str = 'json',
+        compression: Optional[str] = None
+    ) -> None:
+        """The constructor method.
+        """
+        if codec not in CODECS:
+            raise ValueError(f'Unknown codec "{codec}", expected one of {tuple(CODECS)}')
+
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(
+                f'Unknown compression "{compression}", expected one of {COMPRESSIONS}'
+            )
+
+        self.ip = ip
+        self.port = port
+        self.legacy_header = legacy_header
+        self.codec = codec
+        self.compression = compression
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._codec = JSON
+
+    async def connect(self) -> None:
+        """Connect and establish a connection to the server.
+
+        :raises asyncio.TimeoutError: If the server does not answer the handshake
+        """
+        self._reader, self._writer = await asyncio.open_connection(self.ip, self.port)
+
+        if self.codec != JSON.name or self.compression is not None:
+            await asyncio.wait_for(self._handshake(), self.HANDSHAKE_TIMEOUT)
+
+    async def _handshake(self) -> None:
+        """Agrees on a codec and compression with the server, falling back to JSON \
+        and no compression if the server does not have the requested ones.
+        """
+        compressions = () if self.compression is None else (self.compression,)
+        await self.send(handshake([self.codec], compressions))
+        answer = await self.recieve()
+
+        self._codec = CODECS.get(answer.get('codec'), JSON)
+
+        if answer.get('compression') in COMPRESSIONS:
+            self._codec = compressed(self._codec)
+
+    async def close(self) -> None:
+        """Close the connection to the server.
+        """
+        if self._writer is not None:
+            self._writer.close()
+
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def recieve(self) -> Any:
+        """Recieve data from the server.
+
+        :raises asyncio.IncompleteReadError: If the connection is closed
+        :raises FrameTooLargeError: If the frame is larger than :attr:`MAX_FRAME_SIZE`, \
+        the connection is closed
+        :raises ValueError: If the frame cannot be decoded, the connection is closed
+        :return: Data received from the server
+        :rtype: Any
+        """
+        header = LEGACY_HEADER if self.legacy_header else HEADER
+
+        try:
+            size = unpack_size(
+                await self._reader.readexactly(header.size),
+                0,
+                self.legacy_header,
+                self.MAX_FRAME_SIZE
+            )
+
+            return self._codec.decode(await self._reader.readexactly(size))
+
+        except (FrameTooLargeError, ValueError):
+            self._writer.close()
+            raise
+
+    async def send(self, data: Any) -> None:
+        """Send data to the server, waiting while the connection is congested.
+
+        :param data: Data to send to the server
+        :type data: Any
+        """
+        self._writer.write(encode(data, self.legacy_header, self._codec))
+        await self._writer.drain()
@@ -1,7 +1,10 @@
-import json
 import socket
-import struct
-from typing import Any
+import threading
+from typing import Any, Optional
+
+from frost.ext.exceptions import FrameTooLargeError
+from frost.ext.socketio.codec import CODECS, COMPRESSIONS, JSON, compressed, handshake
+from frost.ext.socketio.framing import FrameReader, encode
 
 
 class BaseClient:
@@ -11,23 +14,84 @@ class BaseClient:
     :type ip: str, optional
     :param port: The port of the server to connect to, defaults to 5555
     :type port: int, optional
+    :param legacy_header: Whether to frame data with the platform dependent header \
+    expected by older servers, defaults to False
+    :type legacy_header: bool, optional
+    :param codec: The name of the codec to ask the server for when connecting, \
+    see :mod:`frost.ext.socketio.codec`. Servers without support for it, \
+    or older servers, need the default, defaults to 'json'
+    :type codec: str, optional
+    :param compression: The name of the compression to ask the server for when \
+    connecting, such as :code:`'zlib'`, or None for no compression, defaults to None
+    :type compression: Optional[str], optional
+    :raises ValueError: If the codec or compression is not available
+    """
+
+    HANDSHAKE_TIMEOUT: float = 10.0
+    """How long in seconds to wait for the server to answer the handshake.
     """
 
-    def __init__(self, ip: str = '127.0.0.1', port: int = 5555) -> None:
+    def __init__(
+        self,
+        ip: str = '127.0.0.1',
+        port: int = 5555,
+        legacy_header: bool = False,
+        codec: str = 'json',
+        compression: Optional[str] = None
+    ) -> None:
         """The constructor method.
         """
+        if codec not in CODECS:
+            raise ValueError(f'Unknown codec "{codec}", expected one of {tuple(CODECS)}')
+
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(
+                f'Unknown compression "{compression}", expected one of {COMPRESSIONS}'
+            )
+
         self.ip = ip
         self.port = port
+        self.legacy_header = legacy_header
+        self.codec = codec
+        self.compression = compression
         self._socket = socket.socket(
             socket.AF_INET,
             socket.SOCK_STREAM
         )
+        self._reader = FrameReader(legacy=legacy_header)
+        self._codec = JSON
+        self._send_lock = threading.Lock()
 
     def connect(self) -> None:
         """Connect and establish a connect to the server.
+
+        :raises socket.timeout: If the server does not answer the handshake
         """
         self._socket.connect((self.ip, self.port))
 
+        if self.codec != JSON.name or self.compression is not None:
+            self._handshake()
+
+    def _handshake(self) -> None:
+        """Agrees on a codec and compression with the server, falling back to JSON \
+        and no compression if the server does not have the requested ones.
+        """
+        self._socket.settimeout(self.HANDSHAKE_TIMEOUT)
+
+        try:
+            compressions = () if self.compression is None else (self.compression,)
+            self.send(handshake([self.codec], compressions))
+            answer = self.recieve()
+        finally:
+            self._socket.settimeout(None)
+
+        self._codec = CODECS.get(answer.get('codec'), JSON)
+
+        if answer.get('compression') in COMPRESSIONS:
+            self._codec = compressed(self._codec)
+
+        self._reader.codec = self._codec
+
     def close(self) -> None:
         """Close the connection to the server.
         """
@@ -36,30 +100,26 @@ class BaseClient:
     def recieve(self) -> Any:
         """Recieve data from the server.
 
+        :raises ConnectionError: If the connection is closed
+        :raises FrameTooLargeError: If the frame is larger than \
+        :attr:`frost.ext.socketio.framing.FrameReader.MAX_FRAME_SIZE`, the connection is closed
+        :raises ValueError: If the frame cannot be decoded, the connection is closed
         :return: Data received from the server
         :rtype: Any
         """
-        size = struct.calcsize('L')
-        size = self._socket.recv(size)
-        size = socket.ntohl(
-            struct.unpack('L', size)[0]
-        )
-
-        result = b''
-
-        while len(result) < size:
-            result += self._socket.recv(size - len(result))
+        try:
+            return self._reader.recieve(self._socket)
 
-        return json.loads(result)
+        except (FrameTooLargeError, ValueError):
+            self._socket.close()
+            raise
 
     def send(self, data: Any) -> None:
-        """Send data to the server.
+        """Send data to the server. Safe to call from several threads at once, \
+        each frame is sent whole before the next one starts.
 
         :param data: Data to send to the server
         :type data: Any
         """
-        packets = json.dumps(data).encode('utf-8')
-        value = socket.htonl(len(packets))
-        size = struct.pack('L', value)
-        self._socket.send(size)
-        self._socket.send(packets)
+        with self._send_lock:
+            self._socket.sendall(encode(data, self.legacy_header, self._codec))
@@ -1,4 +1,5 @@
 from frost.ext.cog import Cog
+from frost.ext.exceptions import UnknownRouteError
 from frost.ext.handler import Handler
 
-__all__ = ('Cog', 'Handler')
+__all__ = ('Cog', 'Handler', 'UnknownRouteError')
@@ -1,9 +1,14 @@
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Optional
 
 from frost.ext.exceptions import DirectCogInstanceError
 
 _cogs = dict()
 
+_routes: Dict[str, Callable] = dict()
+"""Every routed method by its full path, such as :code:`'messages/send_msg'`, \
+compiled when a cog is instantiated so a path is looked up with a single dict access.
+"""
+
 
 class Cog:
     """Children of this class and its methods are automatically routed and then handled by \
@@ -32,12 +37,16 @@ class Cog:
             ) from None
 
         else:
-            _cogs.update({
-                route: {
-                    k: v for k, v in members
-                    if not k.startswith('_') and k != 'route'
-                }
-            })
+            methods = {
+                k: v for k, v in members
+                if not k.startswith('_') and k != 'route'
+            }
+            _cogs.update({route: methods})
+
+            for path in [path for path in _routes if path.startswith(f'{route}/')]:
+                del _routes[path]
+
+            _routes.update({f'{route}/{k}': v for k, v in methods.items()})
             return self
 
     def __init_subclass__(cls, route: Optional[str] = None, **kwargs: Any) -> None:
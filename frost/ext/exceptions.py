@@ -4,3 +4,14 @@
 class DirectCogInstanceError(Exception):
     """Raised if the Cog class is directly instantiated.
     """
+
+
+class UnknownRouteError(KeyError):
+    """Raised if no cog method is routed to the path of a request.
+    """
+
+
+class FrameTooLargeError(ConnectionError):
+    """Raised if a frame's header announces more data than a reader accepts. \
+    The connection cannot be read past the frame, so it must be closed.
+    """
@@ -1,7 +1,7 @@
-from pathlib import Path
 from typing import Any, Callable, Dict
 
-from frost.ext.cog import _cogs
+from frost.ext.cog import _routes
+from frost.ext.exceptions import UnknownRouteError
 
 
 class Handler:
@@ -14,21 +14,29 @@ class Handler:
 
         :param path: The route's path
         :type path: str
+        :raises UnknownRouteError: If no method is routed to the path
         :return: The resulting function
         :rtype: Callable
         """
-        parts = Path(path).parts
+        try:
+            return _routes[path]
 
-        result = _cogs
-        for part in parts:
-            result = result[part]
+        except (KeyError, TypeError):
+            raise UnknownRouteError(path) from None
 
-        return result
-
-    def handle(self, data: Dict[str, Any], **kwargs) -> None:
+    def handle(self, data: Dict[str, Any], **kwargs) -> Any:
         """Handles the route and executes the resulting method.
 
         :param data: Data received from the server
         :type data: Dict[str, Any]
+        :raises UnknownRouteError: If the data has no path or no method is routed to it
+        :return: What the method returned
+        :rtype: Any
         """
-        self._handle_path(data['headers']['path'])(data, **kwargs)
+        try:
+            path = data['headers']['path']
+
+        except (KeyError, TypeError):
+            raise UnknownRouteError(None) from None
+
+        return self._handle_path(path)(data, **kwargs)
@@ -0,0 +1,4 @@
+from frost.ext.socketio.codec import CODECS, JSON, Codec, CompressedCodec
+from frost.ext.socketio.framing import FrameReader, encode, pack
+
+__all__ = ('Codec', 'CompressedCodec', 'CODECS', 'JSON', 'FrameReader', 'encode', 'pack')
@@ -0,0 +1,487 @@
+import json
+import struct
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+HANDSHAKE_PATH = 'handshake'
+"""The path of the frame a client may open its connection with to agree on a codec.
+"""
+
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+"""The default size in bytes of the largest frame a reader accepts, \
+which also bounds the size compressed data may decompress to.
+"""
+
+
+class Codec:
+    """Turns data into the bytes of a frame and back. Subclass it and pass an instance \
+    to :func:`register` to make another codec available to the handshake.
+    """
+
+    name: str = ''
+    """The name the codec is agreed on by.
+    """
+
+    def encode(self, data: Any) -> bytes:
+        """Encodes data.
+
+        :param data: The data to encode
+        :type data: Any
+        :return: The encoded data
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
+    def decode(self, packets: Union[bytes, memoryview]) -> Any:
+        """Decodes data.
+
+        :param packets: The encoded data
+        :type packets: Union[bytes, memoryview]
+        :raises ValueError: If the data is malformed
+        :return: The decoded data
+        :rtype: Any
+        """
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    """Encodes data as compact UTF-8 JSON, the codec every connection starts with.
+    """
+
+    name = 'json'
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, packets: Union[bytes, memoryview]) -> Any:
+        return json.loads(str(packets, 'utf-8'))
+
+
+_FLOAT = struct.Struct('!d')
+_UNPACKERS = {
+    0xca: (struct.Struct('!f'), 4),
+    0xcb: (_FLOAT, 8),
+    0xcc: (struct.Struct('!B'), 1),
+    0xcd: (struct.Struct('!H'), 2),
+    0xce: (struct.Struct('!I'), 4),
+    0xcf: (struct.Struct('!Q'), 8),
+    0xd0: (struct.Struct('!b'), 1),
+    0xd1: (struct.Struct('!h'), 2),
+    0xd2: (struct.Struct('!i'), 4),
+    0xd3: (struct.Struct('!q'), 8)
+}
+_LENGTHS = {
+    0xc4: (struct.Struct('!B'), 1),
+    0xc5: (struct.Struct('!H'), 2),
+    0xc6: (struct.Struct('!I'), 4),
+    0xd9: (struct.Struct('!B'), 1),
+    0xda: (struct.Struct('!H'), 2),
+    0xdb: (struct.Struct('!I'), 4),
+    0xdc: (struct.Struct('!H'), 2),
+    0xdd: (struct.Struct('!I'), 4),
+    0xde: (struct.Struct('!H'), 2),
+    0xdf: (struct.Struct('!I'), 4)
+}
+
+
+def _pack_length(
+    out: bytearray,
+    n: int,
+    fix: int,
+    fix_max: int,
+    small: Optional[int],
+    wide: int
+) -> None:
+    """Writes the type and length of a string, binary, array or map, using the \
+    :code:`fix` type holding the length itself for lengths below :code:`fix_max`.
+    """
+    if n < fix_max:
+        out.append(fix | n)
+    elif small is not None and n < 0x100:
+        out.append(small)
+        out.append(n)
+    elif n < 0x10000:
+        out.append(wide)
+        out += n.to_bytes(2, 'big')
+    else:
+        out.append(wide + 1)
+        out += n.to_bytes(4, 'big')
+
+
+def _pack_int(out: bytearray, value: int) -> None:
+    """Writes an integer in as few bytes as possible.
+    """
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -0x20 <= value < 0:
+        out.append(value & 0xff)
+    elif value >= 0:
+        for code, size in ((0xcc, 1), (0xcd, 2), (0xce, 4), (0xcf, 8)):
+            if value < 1 << (size * 8):
+                out.append(code)
+                out += value.to_bytes(size, 'big')
+                return
+
+        raise OverflowError('Integer too large for MessagePack')
+    else:
+        for code, size in ((0xd0, 1), (0xd1, 2), (0xd2, 4), (0xd3, 8)):
+            if value >= -(1 << (size * 8 - 1)):
+                out.append(code)
+                out += value.to_bytes(size, 'big', signed=True)
+                return
+
+        raise OverflowError('Integer too large for MessagePack')
+
+
+def _pack(out: bytearray, obj: Any) -> None:
+    """Writes an object in the MessagePack format.
+    """
+    t = type(obj)
+
+    if t is str:
+        data = obj.encode('utf-8')
+        _pack_length(out, len(data), 0xa0, 0x20, 0xd9, 0xda)
+        out += data
+    elif t is int:
+        _pack_int(out, obj)
+    elif t is dict:
+        _pack_length(out, len(obj), 0x80, 0x10, None, 0xde)
+        for key, value in obj.items():
+            _pack(out, key)
+            _pack(out, value)
+    elif t is list or t is tuple:
+        _pack_length(out, len(obj), 0x90, 0x10, None, 0xdc)
+        for item in obj:
+            _pack(out, item)
+    elif obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif t is float:
+        out.append(0xcb)
+        out += _FLOAT.pack(obj)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        _pack_length(out, len(data), 0, 0, 0xc4, 0xc5)
+        out += data
+    elif isinstance(obj, str):
+        _pack(out, str(obj))
+    elif isinstance(obj, int):
+        _pack_int(out, int(obj))
+    elif isinstance(obj, float):
+        _pack(out, float(obj))
+    elif isinstance(obj, dict):
+        _pack(out, dict(obj))
+    elif isinstance(obj, (list, tuple)):
+        _pack(out, list(obj))
+    else:
+        raise TypeError(f'Object of type {t.__name__} is not MessagePack serializable')
+
+
+def _unpack(data: bytes, i: int) -> Tuple[Any, int]:
+    """Reads an object in the MessagePack format.
+
+    :return: The object and the position after it
+    """
+    c = data[i]
+    i += 1
+
+    if c < 0x80:
+        return c, i
+    if c >= 0xe0:
+        return c - 0x100, i
+    if 0xa0 <= c < 0xc0:
+        end = i + (c & 0x1f)
+        if end > len(data):
+            raise ValueError('Truncated MessagePack data')
+        return data[i:end].decode('utf-8'), end
+    if c < 0x90:
+        return _unpack_map(data, i, c & 0x0f)
+    if c < 0xa0:
+        return _unpack_array(data, i, c & 0x0f)
+
+    if c == 0xc0:
+        return None, i
+    if c == 0xc2:
+        return False, i
+    if c == 0xc3:
+        return True, i
+
+    unpacker = _UNPACKERS.get(c)
+    if unpacker is not None:
+        header, size = unpacker
+        if i + size > len(data):
+            raise ValueError('Truncated MessagePack data')
+        return header.unpack_from(data, i)[0], i + size
+
+    length = _LENGTHS.get(c)
+    if length is None:
+        raise ValueError(f'Unsupported MessagePack type 0x{c:02x}')
+
+    header, size = length
+    if i + size > len(data):
+        raise ValueError('Truncated MessagePack data')
+
+    n = header.unpack_from(data, i)[0]
+    i += size
+
+    if c >= 0xde:
+        return _unpack_map(data, i, n)
+    if c >= 0xdc:
+        return _unpack_array(data, i, n)
+
+    end = i + n
+    if end > len(data):
+        raise ValueError('Truncated MessagePack data')
+    if c >= 0xd9:
+        return data[i:end].decode('utf-8'), end
+    return data[i:end], end
+
+
+def _unpack_array(data: bytes, i: int, n: int) -> Tuple[List[Any], int]:
+    """Reads the :code:`n` items of an array.
+    """
+    items = list()
+
+    for _ in range(n):
+        item, i = _unpack(data, i)
+        items.append(item)
+
+    return items, i
+
+
+def _unpack_map(data: bytes, i: int, n: int) -> Tuple[Dict[Any, Any], int]:
+    """Reads the :code:`n` key and value pairs of a map.
+    """
+    items = dict()
+
+    for _ in range(n):
+        key, i = _unpack(data, i)
+        items[key], i = _unpack(data, i)
+
+    return items, i
+
+
+class MsgPackCodec(Codec):
+    """Encodes data as MessagePack, which is smaller than JSON and keeps the type \
+    of dict keys, so a message's integer ID stays an integer. \
+    The C :code:`msgpack` package is used when installed, otherwise \
+    an implementation of the format in Python, slower to encode and decode.
+    """
+
+    name = 'msgpack'
+
+    def encode(self, data: Any) -> bytes:
+        if msgpack is not None:
+            return msgpack.packb(data, use_bin_type=True)
+
+        out = bytearray()
+        _pack(out, data)
+        return bytes(out)
+
+    def decode(self, packets: Union[bytes, memoryview]) -> Any:
+        if msgpack is not None:
+            return msgpack.unpackb(packets, raw=False, strict_map_key=False)
+
+        packets = bytes(packets)
+
+        try:
+            data, end = _unpack(packets, 0)
+        except (IndexError, TypeError, UnicodeDecodeError, RecursionError) as e:
+            raise ValueError(f'Malformed MessagePack data: {e}') from None
+
+        if end != len(packets):
+            raise ValueError('Extra data after MessagePack object')
+
+        return data
+
+
+class CompressedCodec(Codec):
+    """Compresses the data of another codec with zlib when it is at least \
+    :code:`threshold` bytes, so history and member lists take less bandwidth \
+    while small chat messages are not delayed. Every frame starts with a byte telling \
+    whether the rest is compressed, so each side may choose its own threshold. \
+    Each frame is compressed on its own, which lets a broadcast compress its data once \
+    for every connection.
+
+    :param codec: The codec to compress the data of
+    :type codec: Codec
+    :param threshold: The size in bytes from which data is compressed, \
+    defaults to :attr:`CompressedCodec.THRESHOLD`
+    :type threshold: Optional[int], optional
+    :param level: The zlib compression level, from 1 (fastest) to 9 (smallest), \
+    defaults to :attr:`CompressedCodec.LEVEL`
+    :type level: Optional[int], optional
+    :param max_size: The size in bytes compressed data may decompress to, \
+    defaults to :attr:`CompressedCodec.MAX_SIZE`
+    :type max_size: Optional[int], optional
+    """
+
+    COMPRESSION = 'zlib'
+    """The name the compression is agreed on by.
+    """
+
+    THRESHOLD: int = 1024
+    LEVEL: int = 1
+    MAX_SIZE: int = MAX_FRAME_SIZE
+
+    _RAW = b'\x00'
+    _ZLIB = b'\x01'
+
+    def __init__(
+        self,
+        codec: 'Codec',
+        threshold: Optional[int] = None,
+        level: Optional[int] = None,
+        max_size: Optional[int] = None
+    ) -> None:
+        """The constructor method.
+        """
+        self.codec = codec
+        self.name = codec.name
+        self.threshold = self.THRESHOLD if threshold is None else threshold
+        self.level = self.LEVEL if level is None else level
+        self.max_size = self.MAX_SIZE if max_size is None else max_size
+
+    def encode(self, data: Any) -> bytes:
+        packets = self.codec.encode(data)
+
+        if len(packets) < self.threshold:
+            return self._RAW + packets
+
+        return self._ZLIB + zlib.compress(packets, self.level)
+
+    def decode(self, packets: Union[bytes, memoryview]) -> Any:
+        if not packets:
+            raise ValueError('Empty compressed frame')
+
+        flag = packets[0]
+
+        if flag == self._RAW[0]:
+            return self.codec.decode(packets[1:])
+
+        if flag != self._ZLIB[0]:
+            raise ValueError(f'Unknown compression flag 0x{flag:02x}')
+
+        decompressor = zlib.decompressobj()
+
+        try:
+            # Bounded, so a small frame cannot expand into an unbounded amount of memory
+            packets = decompressor.decompress(packets[1:], self.max_size)
+        except zlib.error as e:
+            raise ValueError(f'Malformed compressed data: {e}') from None
+
+        if decompressor.unconsumed_tail:
+            raise ValueError(f'Compressed data exceeds {self.max_size} bytes')
+
+        if not decompressor.eof:
+            raise ValueError('Malformed compressed data: incomplete or truncated stream')
+
+        return self.codec.decode(packets)
+
+
+JSON = JSONCodec()
+"""The codec every connection starts with.
+"""
+
+CODECS: Dict[str, 'Codec'] = {
+    codec.name: codec for codec in (JSON, MsgPackCodec())
+}
+"""Every codec available to the handshake by its name.
+"""
+
+COMPRESSIONS = (CompressedCodec.COMPRESSION,)
+"""Every compression available to the handshake by its name.
+"""
+
+_compressed: Dict['Codec', 'CompressedCodec'] = dict()
+
+
+def compressed(codec: 'Codec') -> 'CompressedCodec':
+    """Gets the :class:`CompressedCodec` with the default threshold and level \
+    for a codec, shared by every connection using it so broadcasts encode once.
+
+    :param codec: The codec to compress the data of
+    :type codec: Codec
+    :return: The compressing codec
+    :rtype: CompressedCodec
+    """
+    result = _compressed.get(codec)
+
+    if result is None:
+        result = _compressed.setdefault(codec, CompressedCodec(codec))
+
+    return result
+
+
+def register(codec: 'Codec') -> None:
+    """Makes a codec available to the handshake.
+
+    :param codec: The codec
+    :type codec: Codec
+    """
+    CODECS[codec.name] = codec
+
+
+def handshake(codecs: Iterable[str], compressions: Iterable[str] = ()) -> Dict[str, Any]:
+    """Builds the frame a client opens its connection with to agree on a codec \
+    and compression.
+
+    :param codecs: The names of the codecs the client supports, most preferred first
+    :type codecs: Iterable[str]
+    :param compressions: The names of the compressions the client supports, \
+    most preferred first, defaults to none
+    :type compressions: Iterable[str], optional
+    :return: The handshake request
+    :rtype: Dict[str, Any]
+    """
+    return {
+        'headers': {
+            'path': HANDSHAKE_PATH
+        },
+        'codecs': list(codecs),
+        'compressions': list(compressions)
+    }
+
+
+def answer_handshake(data: Any) -> Optional[Tuple[Dict[str, Any], 'Codec']]:
+    """Answers the first frame of a connection if it is a handshake, choosing the first \
+    of the client's codecs which is available, or JSON, and the first of its \
+    compressions which is available, or none.
+
+    :param data: The first frame received from the client
+    :type data: Any
+    :return: The answer to send back with :data:`JSON` and the codec to use after it, \
+    or None if the frame is not a handshake
+    :rtype: Optional[Tuple[Dict[str, Any], Codec]]
+    """
+    try:
+        if data['headers']['path'] != HANDSHAKE_PATH:
+            return None
+
+        codec = next((CODECS[name] for name in data.get('codecs') or () if name in CODECS), JSON)
+        compression = next(
+            (name for name in data.get('compressions') or () if name in COMPRESSIONS), None
+        )
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+    reply = {
+        'headers': {
+            'path': HANDSHAKE_PATH
+        },
+        'codec': codec.name,
+        'compression': compression
+    }
+
+    if compression is not None:
+        codec = compressed(codec)
+
+    return reply, codec
@@ -0,0 +1,221 @@
+import socket
+import struct
+from typing import Any, Optional
+
+from frost.ext.exceptions import FrameTooLargeError
+from frost.ext.socketio.codec import JSON, MAX_FRAME_SIZE, Codec
+
+HEADER = struct.Struct('!I')
+"""The header preceding each frame, holding the size of the frame in network byte order.
+"""
+
+LEGACY_HEADER = struct.Struct('L')
+"""The platform dependent header used by older versions, holding the size of the frame \
+converted with :func:`socket.htonl`. Kept for compatibility with older clients and servers.
+"""
+
+
+def pack(packets: bytes, legacy: bool = False) -> bytes:
+    """Prefixes already encoded data with its header, making it a frame.
+
+    :param packets: The encoded data
+    :type packets: bytes
+    :param legacy: Whether to use :data:`LEGACY_HEADER` instead of :data:`HEADER`, \
+    defaults to False
+    :type legacy: bool, optional
+    :return: The header followed by the encoded data
+    :rtype: bytes
+    """
+    if legacy:
+        return LEGACY_HEADER.pack(socket.htonl(len(packets))) + packets
+
+    return HEADER.pack(len(packets)) + packets
+
+
+def encode(data: Any, legacy: bool = False, codec: Optional['Codec'] = None) -> bytes:
+    """Encodes data into a frame, ready to be sent in a single call.
+
+    :param data: The data to encode
+    :type data: Any
+    :param legacy: Whether to use :data:`LEGACY_HEADER` instead of :data:`HEADER`, \
+    defaults to False
+    :type legacy: bool, optional
+    :param codec: The codec to encode the data with, defaults to JSON
+    :type codec: Optional[Codec], optional
+    :return: The header followed by the encoded data
+    :rtype: bytes
+    """
+    return pack((codec or JSON).encode(data), legacy)
+
+
+def is_legacy(prefix: bytes) -> bool:
+    """Checks whether the first frame of a connection was sent with :data:`LEGACY_HEADER`. \
+    Where :data:`LEGACY_HEADER` is 8 bytes, its extra bytes are zeroes, \
+    which a frame's data never starts with.
+
+    :param prefix: The first :code:`HEADER.size + 1` bytes of the connection
+    :type prefix: bytes
+    :return: Whether the connection uses :data:`LEGACY_HEADER`
+    :rtype: bool
+    """
+    if LEGACY_HEADER.size == HEADER.size:
+        # Both headers are packed identically
+        return False
+
+    return HEADER.unpack_from(prefix)[0] == 0 or prefix[HEADER.size] == 0
+
+
+def unpack_size(
+    buffer: bytes,
+    offset: int = 0,
+    legacy: bool = False,
+    limit: int = MAX_FRAME_SIZE
+) -> int:
+    """Reads the size of a frame from its header, \
+    refusing sizes a peer could use to make the reader allocate without bound.
+
+    :param buffer: The data holding the header
+    :type buffer: bytes
+    :param offset: The position of the header in :code:`buffer`, defaults to 0
+    :type offset: int, optional
+    :param legacy: Whether the header is a :data:`LEGACY_HEADER` instead of a \
+    :data:`HEADER`, defaults to False
+    :type legacy: bool, optional
+    :param limit: The largest size accepted in bytes, defaults to :data:`MAX_FRAME_SIZE`
+    :type limit: int, optional
+    :raises FrameTooLargeError: If the size is larger than :code:`limit`
+    :return: The size of the frame in bytes
+    :rtype: int
+    """
+    if legacy:
+        size = LEGACY_HEADER.unpack_from(buffer, offset)[0]
+
+        # Where the header is 8 bytes, a value past 32 bits was never converted by htonl
+        if size <= 0xFFFFFFFF:
+            size = socket.ntohl(size)
+
+    else:
+        size = HEADER.unpack_from(buffer, offset)[0]
+
+    if size > limit:
+        raise FrameTooLargeError(f'Frame of {size} bytes exceeds the limit of {limit} bytes')
+
+    return size
+
+
+class FrameReader:
+    """Reads length-prefixed frames from a socket into a reusable buffer. \
+    Data is received with :code:`recv_into` so a frame is never rebuilt by concatenation, \
+    and several frames received by a single read are decoded without reading again. \
+    One reader must be used per connection.
+
+    :param legacy: Whether frames use :data:`LEGACY_HEADER` instead of :data:`HEADER`, \
+    detected from the first frame if None, defaults to False
+    :type legacy: Optional[bool], optional
+    :param size: The initial size of the buffer in bytes, defaults to 16384
+    :type size: int, optional
+    :param codec: The codec to decode frames with, defaults to JSON
+    :type codec: Optional[Codec], optional
+    """
+
+    MAX_FRAME_SIZE: int = MAX_FRAME_SIZE
+    """The size in bytes of the largest frame accepted, larger ones raise \
+    :class:`frost.ext.exceptions.FrameTooLargeError` before anything is allocated for them.
+    """
+
+    def __init__(
+        self,
+        legacy: Optional[bool] = False,
+        size: int = 16384,
+        codec: Optional['Codec'] = None
+    ) -> None:
+        """The constructor method.
+        """
+        self.legacy = legacy
+        self.codec = codec or JSON
+        """The codec frames are decoded with, changed once a handshake agrees on another.
+        """
+
+        self._size = size
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+
+        self._start = 0
+        self._end = 0
+
+    def _reserve(self, needed: int) -> None:
+        """Makes room for at least :code:`needed` bytes of unread data in the buffer, \
+        moving the unread data to the front and growing the buffer if necessary.
+
+        :param needed: The number of bytes the unread data needs to grow to
+        :type needed: int
+        """
+        unread = self._end - self._start
+
+        if needed > len(self._buffer):
+            buffer = bytearray(needed)
+            buffer[:unread] = self._view[self._start:self._end]
+
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+
+        elif self._start:
+            self._view[:unread] = self._view[self._start:self._end]
+
+        self._start = 0
+        self._end = unread
+
+    def _fill(self, conn: 'socket.socket', needed: int) -> None:
+        """Reads from the socket until at least :code:`needed` bytes are unread.
+
+        :param conn: The socket to read from
+        :type conn: socket.socket
+        :param needed: The number of unread bytes required
+        :type needed: int
+        :raises ConnectionError: If the connection is closed
+        """
+        if self._start + needed > len(self._buffer):
+            self._reserve(needed)
+
+        while self._end - self._start < needed:
+            received = conn.recv_into(self._view[self._end:])
+
+            if not received:
+                raise ConnectionError('Connection closed')
+
+            self._end += received
+
+    def recieve(self, conn: 'socket.socket') -> Any:
+        """Receive the next frame.
+
+        :param conn: The socket to read from
+        :type conn: socket.socket
+        :raises ConnectionError: If the connection is closed
+        :raises FrameTooLargeError: If the frame is larger than :attr:`MAX_FRAME_SIZE`
+        :return: The decoded data of the frame
+        :rtype: Any
+        """
+        if self.legacy is None:
+            self._fill(conn, HEADER.size + 1)
+            self.legacy = is_legacy(self._view[self._start:self._start + HEADER.size + 1])
+
+        header_size = LEGACY_HEADER.size if self.legacy else HEADER.size
+
+        self._fill(conn, header_size)
+        size = unpack_size(self._buffer, self._start, self.legacy, self.MAX_FRAME_SIZE)
+
+        self._fill(conn, header_size + size)
+        start = self._start + header_size
+        self._start = start + size
+
+        data = self.codec.decode(self._view[start:self._start])
+
+        if self._start == self._end:
+            self._start = self._end = 0
+
+            # Let go of a buffer grown for an unusually large frame
+            if len(self._buffer) > self._size:
+                self._buffer = bytearray(self._size)
+                self._view = memoryview(self._buffer)
+
+        return data
@@ -1,14 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Callable
+from typing import Callable, Tuple
 
 from frost.server.headers import Status
 from frost.server.database import managed_session, User
 
 
+class SessionCache:
+    """A thread-safe cache of valid user sessions, so authenticated requests \
+    can skip the database. Sessions expire after :code:`ttl` seconds and the \
+    least recently used session is evicted once :code:`max_size` is reached.
+
+    :param ttl: How long in seconds a session stays cached, defaults to 300
+    :type ttl: float, optional
+    :param max_size: The maximum number of cached sessions, defaults to 10000
+    :type max_size: int, optional
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 10000) -> None:
+        """The constructor method.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.hits = 0
+        """The number of lookups answered by the cache.
+        """
+        self.misses = 0
+        """The number of lookups which had to go to the database.
+        """
+
+        self._sessions: 'OrderedDict[int, Tuple[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, id_: int, token: str) -> bool:
+        """Checks whether a session is cached, counting the hit or miss.
+
+        :param id_: The user's ID
+        :type id_: int
+        :param token: The user's token
+        :type token: str
+        :return: Whether the session is cached and has not expired
+        :rtype: bool
+        """
+        with self._lock:
+            session = self._sessions.get(id_)
+
+            if session is not None and session[0] == token:
+                if session[1] > time.monotonic():
+                    self._sessions.move_to_end(id_)
+                    self.hits += 1
+                    return True
+
+                del self._sessions[id_]
+
+            self.misses += 1
+            return False
+
+    def add(self, id_: int, token: str) -> None:
+        """Caches a valid session, replacing any other session of the user.
+
+        :param id_: The user's ID
+        :type id_: int
+        :param token: The user's token
+        :type token: str
+        """
+        with self._lock:
+            self._sessions[id_] = (token, time.monotonic() + self.ttl)
+            self._sessions.move_to_end(id_)
+
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+
+    def invalidate(self, id_: int) -> None:
+        """Removes a user's session from the cache.
+
+        :param id_: The user's ID
+        :type id_: int
+        """
+        with self._lock:
+            self._sessions.pop(id_, None)
+
+    def clear(self) -> None:
+        """Removes every session and resets the counters.
+        """
+        with self._lock:
+            self._sessions.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+sessions = SessionCache()
+"""The sessions checked by :func:`auth_required`.
+"""
+
+
 def auth_required(func: Callable) -> Callable:
     """A decorator to ensure a client is logged in with valid authentication \
     before running the wrapped function. Automatically passes through \
-    the user's ID (:code:`id_`) and token (:code:`token`) as arguments.
+    the user's ID (:code:`id_`) and token (:code:`token`) as arguments. \
+    Valid sessions are cached in :data:`sessions`.
 
     :param func: The function being wrapped
     :type func: Callable
@@ -20,15 +116,18 @@ def auth_required(func: Callable) -> Callable:
         id_ = args[0]['headers'].get('id')
         token = args[0]['headers'].get('token')
 
-        with managed_session() as session:
-            user = session.query(User).filter(
-                User.id == id_,
-                User.token == token
-            ).first()
+        if not sessions.get(id_, token):
+            with managed_session() as session:
+                user = session.query(User).filter(
+                    User.id == id_,
+                    User.token == token
+                ).first()
+
+            if user is None:
+                return Status.INVALID_AUTH
 
-        if user is not None:
-            return func(*args, **kwargs, id_=id_, token=token)
+            sessions.add(id_, token)
 
-        return Status.INVALID_AUTH
+        return func(*args, **kwargs, id_=id_, token=token)
 
     return execute
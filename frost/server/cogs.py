@@ -1,24 +1,41 @@
 import secrets
+import threading
 import uuid
 from typing import Any, Dict
 
 from sqlalchemy.exc import IntegrityError
-from werkzeug.security import (
-    check_password_hash,
-    generate_password_hash
-)
+from sqlalchemy.orm import joinedload
 
 from frost.ext import Cog
-from frost.server.auth import auth_required
+from frost.server.auth import auth_required, sessions
 from frost.server.headers import Status
 from frost.server.logger import logger
 from frost.server.objects import Memory
 from frost.server.database import (
     Message,
+    MessageWriteError,
     Room,
     User,
     managed_session
 )
+from frost.server.database.models import user_room_association
+
+
+_login_lock = threading.Lock()
+"""Held while a user's token is chosen and their connection is logged in.
+"""
+
+
+def _is_int(value: Any) -> bool:
+    """Checks whether a value received from a client is an integer. \
+    Booleans are not, though Python treats them as one.
+
+    :param value: The value to check
+    :type value: Any
+    :return: Whether the value is an integer
+    :rtype: bool
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
 
 
 class Auth(Cog, route='authentication'):
@@ -32,9 +49,7 @@ class Auth(Cog, route='authentication'):
         :type data: Dict[str, Any]
         """
         username = data['username']
-        password = generate_password_hash(
-            data['password']
-        )
+        password = Memory.hasher.hash(data['password'])
 
         try:
             with managed_session() as session:
@@ -42,10 +57,12 @@ class Auth(Cog, route='authentication'):
                     username=username,
                     password=password
                 )
-                user.joined_rooms.append(
-                    session.query(Room).first()  # Auto join main room
-                )
+                main_room = session.query(Room).first()
+                user.joined_rooms.append(main_room)  # Auto join main room
                 session.add(user)
+                session.flush()
+
+                user_id, main_room_id = user.id, main_room.id
 
         except IntegrityError:
             logger.info(
@@ -59,6 +76,8 @@ class Auth(Cog, route='authentication'):
             })
 
         else:
+            Memory.memberships.add(user_id, main_room_id)
+
             logger.info(f'New user registered: {username}')
             kwargs['client_send']({
                 'headers': {
@@ -77,30 +96,52 @@ class Auth(Cog, route='authentication'):
         password = data['password']
 
         with managed_session() as session:
-            user = session.query(User).filter(User.username == username).first()
+            user = session.query(User.id, User.password).filter(
+                User.username == username
+            ).first()
 
-            if user is not None and check_password_hash(user.password, password):
-                user.token = secrets.token_urlsafe()
+        # The password is hashed without holding on to a database connection
+        if user is not None and Memory.hasher.check(user.password, password):
+            values = dict()
 
-                kwargs['client_send']({
-                    'headers': {
-                        'path': 'authentication/post_login',
-                        'status': Status.SUCCESS.value
-                    },
-                    'token': user.token,
-                    'id': user.id
-                })
+            if Memory.hasher.needs_rehash(user.password):
+                # The hasher's parameters changed since the password was hashed
+                values['password'] = Memory.hasher.hash(password)
 
-                user_obj = Memory.all_users[kwargs['addr']]
-                user_obj.login(user.id, username)
-                Memory.logged_in_users[user.id] = user_obj
+            with _login_lock:
+                with managed_session() as session:
+                    query = session.query(User).filter(User.id == user.id)
+                    token = query.with_entities(User.token).scalar()
 
-                logger.info(f'User "{username}" logged in')
+                    # A user logged in elsewhere keeps their token, so every session stays valid
+                    if token is None or not Memory.connections.is_online(user.id):
+                        token = values['token'] = secrets.token_urlsafe()
 
-                # Send the main room messages
-                data['room_id'] = 1
-                Msgs._get_room_msgs(data, user.token, user.id, **kwargs)
-                return
+                    if values:
+                        query.update(values)
+
+                user_obj = Memory.connections.login(kwargs['addr'], user.id, username)
+
+            if user_obj is None:
+                return  # Disconnected while logging in
+
+            sessions.add(user.id, token)
+
+            kwargs['client_send']({
+                'headers': {
+                    'path': 'authentication/post_login',
+                    'status': Status.SUCCESS.value
+                },
+                'token': token,
+                'id': user.id
+            })
+
+            logger.info(f'User "{username}" logged in')
+
+            # Send the main room messages
+            data['room_id'] = 1
+            Msgs._get_room_msgs(data, token, user.id, **kwargs)
+            return
 
         kwargs['client_send']({
             'headers': {
@@ -122,7 +163,12 @@ class Msgs(Cog, route='messages'):
         id_: str,
         **kwargs: Any
     ) -> None:
-        """Saves the message received from a client and sends it off to other users in the room.
+        """Saves the message received from a client and sends it off to other users in the room. \
+        With write-behind enabled, the message is queued in \
+        :attr:`frost.server.objects.Memory.message_writer` instead of being committed first, \
+        and the user and room are looked up in memory rather than in the database, \
+        and a message the writer reports as lost is neither acknowledged nor sent to the room. \
+        The message is added to the room's cached history, if the room is cached.
 
         :param data: Data received from a client
         :type data: Dict[str, Any]
@@ -133,63 +179,91 @@ class Msgs(Cog, route='messages'):
         """
         raw_msg = data['msg']
         room_id = data['room_id']
-        send = kwargs['send']
+        broadcast = kwargs['broadcast']
 
         if raw_msg:
-            with managed_session() as session:
-                user = session.query(User).filter(User.id == id_).first()
-                room = session.query(Room).filter(Room.id == room_id).first()
+            if not Memory.memberships.is_member(id_, room_id):
+                kwargs['client_send']({
+                    'headers': {
+                        'path': 'messages/post_new',
+                        'status': Status.PERMISSION_DENIED.value
+                    }
+                })
+                return
 
-                if room not in user.joined_rooms:
+            writer = Memory.message_writer
+            user = Memory.connections.get(kwargs['addr'])
+
+            # The request may be authenticated for another user than the connection's
+            username = user.username if user is not None and user.id == id_ else None
+            room_name = Memory.room_names.get(room_id)
+
+            if writer is None or username is None or room_name is None:
+                with managed_session() as session:
+                    if username is None:
+                        username = session.query(User).get(id_).username
+
+                    if room_name is None:
+                        room_name = session.query(Room).get(room_id).name
+
+                    if writer is None:
+                        msg = Message(
+                            message=raw_msg,
+                            user_id=id_,
+                            room_id=room_id
+                        )
+                        session.add(msg)
+                        session.flush()
+
+                        msg_id, timestamp = msg.id, msg.timestamp
+
+            if writer is not None:
+                try:
+                    msg_id, timestamp = writer.add(raw_msg, id_, room_id)
+
+                except MessageWriteError:
                     kwargs['client_send']({
                         'headers': {
                             'path': 'messages/post_new',
-                            'status': Status.PERMISSION_DENIED.value
+                            'status': Status.MESSAGE_NOT_SAVED.value
                         }
                     })
                     return
 
-                msg = Message(
-                    message=raw_msg,
-                    user_id=user.id,
-                    room_id=room_id
-                )
-                session.add(msg)
-                session.flush()
-
-                contents = {
-                    'headers': {
-                        'path': 'messages/new'
-                    },
-                    'msg': {
-                        msg.id: {
-                            'message': raw_msg,
-                            'room': {
-                                'name': room.name,
-                                'id': room_id
-                            },
-                            'from_user': {
-                                'username': user.username,
-                                'id': user.id
-                            },
-                            'timestamp': str(msg.timestamp)
-                        }
+            contents = {
+                'headers': {
+                    'path': 'messages/new'
+                },
+                'msg': {
+                    # Every codec gets string IDs, as JSON only has string keys
+                    str(msg_id): {
+                        'message': raw_msg,
+                        'room': {
+                            'name': room_name,
+                            'id': room_id
+                        },
+                        'from_user': {
+                            'username': username,
+                            'id': id_
+                        },
+                        'timestamp': str(timestamp)
                     }
                 }
-                logger.info(f'[ Message ] {user.username}: {raw_msg}')
+            }
+            logger.info(f'[ Message ] {username}: {raw_msg}')
 
-                kwargs['client_send']({
-                    'headers': {
-                        'path': 'messages/post_new',
-                        'status': Status.SUCCESS.value
-                    }
-                })
+            kwargs['client_send']({
+                'headers': {
+                    'path': 'messages/post_new',
+                    'status': Status.SUCCESS.value
+                }
+            })
 
-                for member in room.users:
-                    user = Memory.logged_in_users.get(member.id)
+            if Memory.history is not None:
+                Memory.history.append(room_id, msg_id, contents['msg'][str(msg_id)])
 
-                    if user is not None:
-                        send(user.conn, contents)
+            members = Memory.memberships.members(room_id)
+            broadcast(Memory.connections.online_conns(members), contents)
 
     @auth_required
     def get_room_msgs(
@@ -199,11 +273,14 @@ class Msgs(Cog, route='messages'):
         max_: int = 100,
         **kwargs: Any
     ) -> None:
-        """Gets up to :code:`max_` previous messages from a specific room.
+        """Gets up to :code:`max_` previous messages from a specific room. \
+        The client can page through the room's history with the optional \
+        :code:`before_id` and :code:`after_id` message IDs and a smaller :code:`limit`. \
+        Without a cursor, the latest messages are sent.
 
         :param data: Data received from the client
         :type data: Dict[str, Any]
-        :param max_: The maximum number of messages to get from a room, defaults to 50
+        :param max_: The maximum number of messages to get from a room, defaults to 100
         :type max_: int, optional
         :param token: The user's token, autofilled by :meth:`frost.server.auth.auth_required`
         :type token: str
@@ -219,11 +296,17 @@ class Msgs(Cog, route='messages'):
         max_: int = 100,
         **kwargs: Any
     ) -> None:
-        """Gets up to :code:`max_` previous messages from a specific room.
+        """Gets up to :code:`max_` previous messages from a specific room. \
+        The client can page through the room's history with the optional \
+        :code:`before_id` and :code:`after_id` message IDs and a smaller :code:`limit`, \
+        which must be integers or the request is answered with :attr:`Status.INVALID`. \
+        Without a cursor, the latest messages are sent. Messages cached in \
+        :attr:`frost.server.objects.Memory.history` are sent without the database, \
+        and the latest messages of a room are cached once they are read from it.
 
         :param data: Data received from the client
         :type data: Dict[str, Any]
-        :param max_: The maximum number of messages to get from a room, defaults to 50
+        :param max_: The maximum number of messages to get from a room, defaults to 100
         :type max_: int, optional
         :param token: The user's token, autofilled by :meth:`frost.server.auth.auth_required`
         :type token: str
@@ -231,10 +314,49 @@ class Msgs(Cog, route='messages'):
         :type id_: str
         """
         room_id = data['room_id']
+        before_id = data.get('before_id')
+        after_id = data.get('after_id')
+        limit = data.get('limit')
+
+        if (
+            limit is not None and not (_is_int(limit) and limit > 0)
+            or before_id is not None and not _is_int(before_id)
+            or after_id is not None and not _is_int(after_id)
+        ):
+            kwargs['client_send']({
+                'headers': {
+                    'path': 'messages/post_room',
+                    'status': Status.INVALID.value
+                }
+            })
+            return
+
+        limit = max_ if limit is None else max(1, min(limit, max_))
+        history = Memory.history
+
+        if history is not None and Memory.memberships.is_member(id_, room_id):
+            msgs = history.get(room_id, limit, before_id, after_id)
+
+            if msgs is not None:
+                Msgs._send_room_msgs(msgs, **kwargs)
+
+                user = Memory.connections.get(kwargs['addr'])
+                logger.info(
+                    f'User "{user.username if user else id_}" was sent {len(msgs)} '
+                    f'cached messages from room {room_id}'
+                )
+                return
+
+        # Taken before reading the messages, so messages sent meanwhile are not missed
+        version = history.version(room_id) if history is not None else 0
+
+        if Memory.message_writer is not None:
+            # Make messages waiting to be written part of the history
+            Memory.message_writer.flush()
 
         with managed_session() as session:
-            room = session.query(Room).filter(Room.id == room_id).first()
-            user = session.query(User).filter(User.id == id_).first()
+            room = session.query(Room).get(room_id)
+            user = session.query(User).get(id_)
 
             if room is None:
                 kwargs['client_send']({
@@ -245,7 +367,7 @@ class Msgs(Cog, route='messages'):
                 })
                 return
 
-            if room not in user.joined_rooms:
+            if not Memory.memberships.is_member(id_, room_id):
                 kwargs['client_send']({
                     'headers': {
                         'path': 'messages/post_room',
@@ -257,7 +379,21 @@ class Msgs(Cog, route='messages'):
                 )
                 return
 
-            msgs = room.messages
+            query = session.query(Message).options(
+                joinedload(Message.user)
+            ).filter(Message.room_id == room_id)
+
+            if before_id is not None:
+                query = query.filter(Message.id < before_id)
+
+            if after_id is not None:
+                query = query.filter(Message.id > after_id)
+
+            if after_id is not None and before_id is None:
+                msgs = query.order_by(Message.id).limit(limit).all()
+            else:
+                msgs = query.order_by(Message.id.desc()).limit(limit).all()[::-1]
+
             msgs = {
                 msg.id: {
                     'message': msg.message,
@@ -273,24 +409,36 @@ class Msgs(Cog, route='messages'):
                 } for msg in msgs
             }
 
-            kwargs['client_send']({
-                'headers': {
-                    'path': 'messages/post_room',
-                    'status': Status.SUCCESS.value
-                }
-            })
+            if history is not None and before_id is None and after_id is None:
+                history.fill(room_id, msgs, len(msgs) < limit, version)
 
-            kwargs['client_send']({
-                'headers': {
-                    'path': 'messages/new'
-                },
-                'msg': msgs
-            })
+            Msgs._send_room_msgs(msgs, **kwargs)
 
             logger.info(
                 f'User "{user.username}" was sent {len(msgs)} messages from room "{room.name}"'
             )
 
+    def _send_room_msgs(msgs: Dict[int, Dict[str, Any]], **kwargs: Any) -> None:
+        """Sends the messages of a room requested by a client, under string IDs \
+        so they are the same with every codec.
+
+        :param msgs: The messages by their IDs
+        :type msgs: Dict[int, Dict[str, Any]]
+        """
+        kwargs['client_send']({
+            'headers': {
+                'path': 'messages/post_room',
+                'status': Status.SUCCESS.value
+            }
+        })
+
+        kwargs['client_send']({
+            'headers': {
+                'path': 'messages/new'
+            },
+            'msg': {str(msg_id): msg for msg_id, msg in msgs.items()}
+        })
+
 
 class Rooms(Cog, route='rooms'):
     """Deals with room within a server. :code:`route='rooms'`
@@ -330,11 +478,12 @@ class Rooms(Cog, route='rooms'):
                     owner_id=id_,
                     invite_code=str(uuid.uuid1())
                 )
+                user = session.query(User).get(id_)
+                room.users.append(user)
                 session.add(room)
-                user = session.query(User).filter(User.id == id_).first()
-                user.joined_rooms.append(room)
+                session.flush()
 
-                username = user.username
+                username, room_id = user.username, room.id
 
         except IntegrityError:
             kwargs['client_send']({
@@ -345,6 +494,9 @@ class Rooms(Cog, route='rooms'):
             })
 
         else:
+            Memory.memberships.add(id_, room_id)
+            Memory.room_names.add(room_id, room_name)
+
             kwargs['client_send']({
                 'headers': {
                     'path': 'rooms/post_create',
@@ -370,7 +522,7 @@ class Rooms(Cog, route='rooms'):
         :type id_: str
         """
         code = data['invite_code']
-        send = kwargs['send']
+        broadcast = kwargs['broadcast']
 
         with managed_session() as session:
             room = session.query(Room).filter(Room.invite_code == code).first()
@@ -384,35 +536,40 @@ class Rooms(Cog, route='rooms'):
                 })
                 return
 
-            user = session.query(User).filter(User.id == id_).first()
-            user.joined_rooms.append(room)
+            user = session.query(User).get(id_)
+            room_id, room_name, username = room.id, room.name, user.username
 
-            kwargs['client_send']({
-                'headers': {
-                    'path': 'rooms/post_join',
-                    'status': Status.SUCCESS.value
-                },
-                'room': {
-                    'id': room.id,
-                    'name': room.name
-                }
-            })
-            logger.info(f'User "{user.username}" joined room "{room.name}"')
+            if not Memory.memberships.is_member(id_, room_id):
+                session.execute(user_room_association.insert().values(
+                    users=id_,
+                    rooms=room_id
+                ))
 
-            for member in room.users:
-                room_user = Memory.logged_in_users.get(member.id)
+        Memory.memberships.add(id_, room_id)
 
-                if room_user is not None:
-                    send(room_user.conn, {
-                        'headers': {
-                            'path': 'rooms/new_room_member'
-                        },
-                        'room_id': room.id,
-                        'user': {
-                            'id': user.id,
-                            'username': user.username
-                        }
-                    })
+        kwargs['client_send']({
+            'headers': {
+                'path': 'rooms/post_join',
+                'status': Status.SUCCESS.value
+            },
+            'room': {
+                'id': room_id,
+                'name': room_name
+            }
+        })
+        logger.info(f'User "{username}" joined room "{room_name}"')
+
+        members = Memory.memberships.members(room_id)
+        broadcast(Memory.connections.online_conns(members), {
+            'headers': {
+                'path': 'rooms/new_room_member'
+            },
+            'room_id': room_id,
+            'user': {
+                'id': id_,
+                'username': username
+            }
+        })
 
     @auth_required
     def leave(
@@ -431,43 +588,45 @@ class Rooms(Cog, route='rooms'):
         :type id_: str
         """
         room_id = data['room_id']
-        send = kwargs['send']
-
-        with managed_session() as session:
-            room = session.query(Room).filter(Room.id == room_id).first()
-            user = session.query(User).filter(User.id == id_).first()
-
-            if room is None or room not in user.joined_rooms:
-                kwargs['client_send']({
-                    'headers': {
-                        'path': 'rooms/post_leave',
-                        'status': Status.ROOM_NOT_FOUND.value
-                    }
-                })
-                return
-
-            user.joined_rooms.remove(room)
-            logger.info(f'User "{user.username}" left room "{room.name}"')
+        broadcast = kwargs['broadcast']
 
+        if not Memory.memberships.is_member(id_, room_id):
             kwargs['client_send']({
                 'headers': {
                     'path': 'rooms/post_leave',
-                    'status': Status.SUCCESS.value
-                },
-                'room_id': room_id
+                    'status': Status.ROOM_NOT_FOUND.value
+                }
             })
+            return
 
-            for member in room.users:
-                room_user = Memory.logged_in_users.get(member.id)
+        with managed_session() as session:
+            room = session.query(Room).get(room_id)
+            user = session.query(User).get(id_)
 
-                if room_user is not None:
-                    send(room_user.conn, {
-                        'headers': {
-                            'path': 'rooms/remove_room_member'
-                        },
-                        'room_id': room.id,
-                        'user_id': user.id
-                    })
+            session.execute(user_room_association.delete().where(
+                (user_room_association.c.users == id_)
+                & (user_room_association.c.rooms == room_id)
+            ))
+            logger.info(f'User "{user.username}" left room "{room.name}"')
+
+        Memory.memberships.remove(id_, room_id)
+
+        kwargs['client_send']({
+            'headers': {
+                'path': 'rooms/post_leave',
+                'status': Status.SUCCESS.value
+            },
+            'room_id': room_id
+        })
+
+        members = Memory.memberships.members(room_id)
+        broadcast(Memory.connections.online_conns(members), {
+            'headers': {
+                'path': 'rooms/remove_room_member'
+            },
+            'room_id': room_id,
+            'user_id': id_
+        })
 
     @auth_required
     def get_invite_code(
@@ -538,9 +697,11 @@ class Rooms(Cog, route='rooms'):
         :type id_: str
         """
         with managed_session() as session:
-            user = session.query(User).filter(User.id == id_).first()
+            user = session.query(User).get(id_)
 
-            rooms = user.joined_rooms
+            rooms = session.query(Room.id, Room.name).filter(
+                Room.id.in_(Memory.memberships.rooms(id_))
+            ).order_by(Room.id)
             rooms = [
                 {
                     'id': room.id,
@@ -575,21 +736,22 @@ class Rooms(Cog, route='rooms'):
         """
         room_id = data['room_id']
 
-        with managed_session() as session:
-            room = session.query(Room).filter(Room.id == room_id).first()
-            members = room.users
-
-            user = session.query(User).filter(User.id == id_).first()
+        if not Memory.memberships.is_member(id_, room_id):
+            kwargs['client_send']({
+                'headers': {
+                    'path': 'rooms/post_members',
+                    'status': Status.PERMISSION_DENIED.value
+                }
+            })
+            return
 
-            if user not in members:
-                kwargs['client_send']({
-                    'headers': {
-                        'path': 'rooms/post_members',
-                        'status': Status.PERMISSION_DENIED.value
-                    }
-                })
-                return
+        with managed_session() as session:
+            room = session.query(Room).get(room_id)
+            user = session.query(User).get(id_)
 
+            members = session.query(User.id, User.username).filter(
+                User.id.in_(Memory.memberships.members(room_id))
+            )
             members = [
                 {
                     'username': member.username,
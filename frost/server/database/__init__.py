@@ -1,9 +1,25 @@
-from frost.server.database.db import Base, managed_session, init_db
+from frost.server.database.db import (
+    Base,
+    configure_engine,
+    get_memberships,
+    get_room_names,
+    init_db,
+    managed_session,
+    migrate_db
+)
+from frost.server.database.exceptions import MessageWriteError
 from frost.server.database.models import Message, Room, User
+from frost.server.database.writer import MessageWriter
 
 __all__ = (
     'init_db',
+    'migrate_db',
+    'configure_engine',
+    'get_memberships',
+    'get_room_names',
     'managed_session',
+    'MessageWriter',
+    'MessageWriteError',
     'Base',
     'User',
     'Room',
@@ -1,12 +1,19 @@
 from contextlib import contextmanager
+from typing import List, Optional, Tuple
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import scoped_session, sessionmaker, Session  # NOQA: F401
+from sqlalchemy.orm import sessionmaker, Session  # NOQA: F401
+from sqlalchemy.pool import QueuePool
 
 
-engine = create_engine('sqlite:///pyfrost.sqlite3', convert_unicode=True)
-"""The SQLAlchemy engine.
+engine: Optional['Engine'] = None
+"""The SQLAlchemy engine, set up by :func:`configure_engine`.
+"""
+
+SessionFactory = sessionmaker(autocommit=False, autoflush=True)
+"""The factory of the sessions handed out by :func:`managed_session`.
 """
 
 Base = declarative_base()
@@ -14,22 +21,87 @@ Base = declarative_base()
 """
 
 
+def configure_engine(
+    url: str = 'sqlite:///pyfrost.sqlite3',
+    pool_size: int = 8,
+    max_overflow: int = 16,
+    journal_mode: Optional[str] = 'WAL',
+    synchronous: Optional[str] = 'NORMAL',
+    mmap_size: Optional[int] = 256 * 1024 * 1024,
+    cache_size: Optional[int] = -64 * 1024
+) -> 'Engine':
+    """Creates the SQLAlchemy engine used by :func:`managed_session`. \
+    Called on import with the default arguments, call it again before the \
+    server runs to change them. A pragma set to None is left at SQLite's default.
+
+    :param url: The database URL, defaults to 'sqlite:///pyfrost.sqlite3'
+    :type url: str, optional
+    :param pool_size: The number of connections kept open, defaults to 8
+    :type pool_size: int, optional
+    :param max_overflow: The number of connections that can be opened on top of \
+    :code:`pool_size` under load, defaults to 16
+    :type max_overflow: int, optional
+    :param journal_mode: The :code:`journal_mode` pragma, WAL lets readers \
+    run alongside a writer, defaults to 'WAL'
+    :type journal_mode: Optional[str], optional
+    :param synchronous: The :code:`synchronous` pragma, NORMAL only syncs \
+    on WAL checkpoints, defaults to 'NORMAL'
+    :type synchronous: Optional[str], optional
+    :param mmap_size: The :code:`mmap_size` pragma in bytes, defaults to 256 MiB
+    :type mmap_size: Optional[int], optional
+    :param cache_size: The :code:`cache_size` pragma, in KiB if negative, \
+    defaults to -65536 (64 MiB)
+    :type cache_size: Optional[int], optional
+    :return: The new engine
+    :rtype: :class:`sqlalchemy.engine.Engine`
+    """
+    global engine
+
+    pragmas = {
+        'journal_mode': journal_mode,
+        'synchronous': synchronous,
+        'mmap_size': mmap_size,
+        'cache_size': cache_size
+    }
+
+    new_engine = create_engine(
+        url,
+        convert_unicode=True,
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args={'check_same_thread': False}
+    )
+
+    @event.listens_for(new_engine, 'connect')
+    def set_pragmas(dbapi_conn, conn_record):
+        cursor = dbapi_conn.cursor()
+
+        for name, value in pragmas.items():
+            if value is not None:
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+        cursor.close()
+
+    if engine is not None:
+        engine.dispose()
+
+    engine = new_engine
+    SessionFactory.configure(bind=engine)
+
+    return engine
+
+
 @contextmanager
 def managed_session() -> 'Session':
     """A context manager for thread-safe database access. \
     Automatically commits if no errors occur, else it is rolled back. \
-    Session is removed after use.
+    Session is closed after use, returning its connection to the pool.
 
-    :yield: An SQLAlchemy scoped_session
+    :yield: An SQLAlchemy session
     :rtype: :class:`sqlalchemy.orm.Session`
     """
-    session = scoped_session(
-        sessionmaker(
-            autocommit=False,
-            autoflush=True,
-            bind=engine
-        )
-    )
+    session = SessionFactory()
     try:
         yield session
         session.commit()
@@ -39,7 +111,7 @@ def managed_session() -> 'Session':
         raise
 
     finally:
-        session.remove()
+        session.close()
 
 
 def init_db() -> None:
@@ -66,3 +138,49 @@ def init_db() -> None:
         u.joined_rooms.append(
             session.query(models.Room).first()
         )
+
+
+def migrate_db() -> None:
+    """Brings an existing database up to date with the pre-defined models, \
+    creating missing tables and indexes.
+    """
+    from frost.server.database import models  # NOQA: F401
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+
+
+def get_memberships() -> List[Tuple[int, int]]:
+    """Gets every membership of a user in a room.
+
+    :return: The memberships as user ID and room ID pairs
+    :rtype: List[Tuple[int, int]]
+    """
+    from frost.server.database import models
+
+    with managed_session() as session:
+        return session.query(
+            models.user_room_association.c.users,
+            models.user_room_association.c.rooms
+        ).distinct().all()
+
+
+def get_room_names() -> List[Tuple[int, str]]:
+    """Gets the name of every room.
+
+    :return: The rooms as room ID and name pairs
+    :rtype: List[Tuple[int, str]]
+    """
+    from frost.server.database import models
+
+    with managed_session() as session:
+        return session.query(models.Room.id, models.Room.name).all()
+
+
+configure_engine()
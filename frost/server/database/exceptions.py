@@ -0,0 +1,7 @@
+# Exceptions
+
+
+class MessageWriteError(Exception):
+    """A message queued by :class:`frost.server.database.writer.MessageWriter` \
+    failed to be written to the database.
+    """
@@ -4,6 +4,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy import (
     Column,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -101,6 +102,9 @@ class Message(Base):
     """The Message model. :code:`__tablename__ = 'messages'`
     """
     __tablename__ = 'messages'
+    __table_args__ = (
+        Index('ix_messages_room_id_id', 'room_id', 'id'),
+    )
 
     id = Column(Integer, primary_key=True)
     """The message's ID.
@@ -0,0 +1,231 @@
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from frost.server.database.db import managed_session
+from frost.server.database.exceptions import MessageWriteError
+from frost.server.database.models import Message
+from frost.server.logger import logger
+
+
+class MessageWriter:
+    """Persists messages in batches on a background thread instead of \
+    committing every message on its own. Message IDs are assigned in memory, \
+    and queued messages are inserted with a single commit every :code:`interval` \
+    seconds, or sooner once :code:`batch_size` messages are queued. \
+    With the :code:`'async'` durability, :meth:`MessageWriter.add` returns straight away \
+    and messages queued when the server crashes are lost. With the :code:`'group'` \
+    durability, it returns once the batch holding the message is committed, \
+    so concurrent senders share a commit without risking any messages, \
+    and raises if the batch failed to be written.
+
+    :param interval: How long in seconds messages may be queued for, \
+    defaults to :attr:`MessageWriter.INTERVAL`
+    :type interval: Optional[float], optional
+    :param batch_size: The number of queued messages which are written straight away, \
+    defaults to :attr:`MessageWriter.BATCH_SIZE`
+    :type batch_size: Optional[int], optional
+    :param durability: Either :code:`'async'` or :code:`'group'`, \
+    defaults to :attr:`MessageWriter.DURABILITY`
+    :type durability: Optional[str], optional
+    :raises ValueError: If the durability is not one of :attr:`MessageWriter.DURABILITIES`
+    """
+
+    DURABILITIES = ('async', 'group')
+    """The durabilities messages can be written with.
+    """
+
+    INTERVAL: float = 0.05
+    BATCH_SIZE: int = 256
+    DURABILITY: str = 'async'
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        durability: Optional[str] = None
+    ) -> None:
+        """The constructor method.
+        """
+        self.interval = self.INTERVAL if interval is None else interval
+        self.batch_size = self.BATCH_SIZE if batch_size is None else batch_size
+        self.durability = self.DURABILITY if durability is None else durability
+
+        if self.durability not in self.DURABILITIES:
+            raise ValueError(
+                f'Unknown durability "{self.durability}", expected one of {self.DURABILITIES}'
+            )
+
+        self.written = 0
+        """The number of messages written to the database.
+        """
+        self.batches = 0
+        """The number of batches committed.
+        """
+        self.failed = 0
+        """The number of messages which failed to be written.
+        """
+
+        self._pending: List[Dict[str, Any]] = list()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+        self._flush_lock = threading.Lock()
+        self._committed_id = 0
+        self._failed: List[List[int]] = list()
+        self._committed = threading.Condition()
+
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Continues the message IDs from the database and starts writing \
+        batches on a daemon thread.
+        """
+        with managed_session() as session:
+            last_id = session.query(func.max(Message.id)).scalar() or 0
+
+        self._next_id = last_id + 1
+        self._committed_id = last_id
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the background thread and writes any queued messages.
+        """
+        with self._lock:
+            self._running = False
+
+        self._wakeup.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self.flush()
+
+    def add(self, message: str, user_id: int, room_id: int) -> Tuple[int, datetime]:
+        """Queues a new message to be written.
+
+        :param message: The message's contents
+        :type message: str
+        :param user_id: The ID of the user who sent the message
+        :type user_id: int
+        :param room_id: The ID of the room the message was sent in
+        :type room_id: int
+        :raises MessageWriteError: With the :code:`'group'` durability, \
+        if the batch holding the message failed to be written, \
+        or if the writer is not running so the message would never be written
+        :return: The message's ID and timestamp
+        :rtype: Tuple[int, datetime]
+        """
+        timestamp = datetime.utcnow()
+
+        with self._lock:
+            if self.durability == 'group' and not self._running:
+                raise MessageWriteError('The writer is not running')
+
+            id_ = self._next_id
+            self._next_id += 1
+
+            self._pending.append({
+                'id': id_,
+                'message': message,
+                'timestamp': timestamp,
+                'user_id': user_id,
+                'room_id': room_id
+            })
+            full = len(self._pending) >= self.batch_size
+
+        if full:
+            self._wakeup.set()
+
+        if self.durability == 'group':
+            with self._committed:
+                # A later batch may be committed first, so failures are checked first
+                self._committed.wait_for(
+                    lambda: self._failed_batch(id_) is not None or self._committed_id >= id_
+                )
+                failed = self._failed_batch(id_)
+
+                if failed is not None:
+                    # Every message of the batch has a waiter, the last one drops the batch
+                    failed[2] -= 1
+                    if not failed[2]:
+                        self._failed.remove(failed)
+
+                    raise MessageWriteError(f'Message {id_} failed to be written')
+
+        return id_, timestamp
+
+    def _failed_batch(self, id_: int) -> Optional[List[int]]:
+        """Finds the failed batch a message was in, whose senders have not all been told. \
+        Must be called while holding :code:`self._committed`.
+
+        :param id_: The message's ID
+        :type id_: int
+        :return: The first and last ID of the batch and the number of senders \
+        still waiting, or None if the message was not in a failed batch
+        :rtype: Optional[List[int]]
+        """
+        for failed in self._failed:
+            if failed[0] <= id_ <= failed[1]:
+                return failed
+
+        return None
+
+    def flush(self) -> int:
+        """Writes the queued messages with a single commit. A batch which fails \
+        to be written is logged and discarded. With the :code:`'group'` durability, \
+        its senders are woken up with a :class:`MessageWriteError`.
+
+        :return: The number of messages in the batch
+        :rtype: int
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, list()
+
+            if not batch:
+                return 0
+
+            try:
+                with managed_session() as session:
+                    session.execute(Message.__table__.insert(), batch)
+
+            except Exception:
+                logger.exception(f'Failed to write a batch of {len(batch)} messages')
+                self.failed += len(batch)
+
+                if self.durability == 'group':
+                    with self._committed:
+                        # IDs are assigned in order, so a batch is a single range of them
+                        self._failed.append([batch[0]['id'], batch[-1]['id'], len(batch)])
+                        self._committed.notify_all()
+
+            else:
+                self.written += len(batch)
+                self.batches += 1
+
+                with self._committed:
+                    self._committed_id = batch[-1]['id']
+                    self._committed.notify_all()
+
+            return len(batch)
+
+    def _run(self) -> None:
+        """Writes a batch every :code:`interval` seconds, \
+        or as soon as :code:`batch_size` messages are queued.
+        """
+        while self._running:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
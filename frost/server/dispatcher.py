@@ -0,0 +1,201 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from frost.server.logger import logger
+
+
+class _Strand:
+    """Runs tasks on an executor one at a time, in the order they were submitted.
+
+    :param executor: The executor to run the tasks on
+    :type executor: ThreadPoolExecutor
+    """
+
+    def __init__(self, executor: 'ThreadPoolExecutor') -> None:
+        """The constructor method.
+        """
+        self._executor = executor
+        self._tasks: Deque[Tuple[Callable, Tuple[Any, ...]]] = deque()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def submit(self, func: Callable, *args: Any) -> None:
+        """Runs a task once every task submitted before it has finished.
+
+        :param func: The task
+        :type func: Callable
+        :param args: Arguments for the task
+        :type args: Any
+        """
+        with self._lock:
+            self._tasks.append((func, args))
+
+            if self._running:
+                return
+
+            self._running = True
+
+        self._schedule()
+
+    def _schedule(self) -> None:
+        """Runs the next task on the executor, discarding every task if it was shut down.
+        """
+        try:
+            self._executor.submit(self._run)
+
+        except RuntimeError:
+            with self._lock:
+                self._tasks.clear()
+                self._running = False
+
+    def clear(self) -> None:
+        """Discards the tasks which have not started yet.
+        """
+        with self._lock:
+            self._tasks.clear()
+
+    def _run(self) -> None:
+        """Runs the next task, then hands the worker back to the pool \
+        so one busy strand cannot hold on to it.
+        """
+        with self._lock:
+            if not self._tasks:
+                self._running = False
+                return
+
+            func, args = self._tasks.popleft()
+
+        try:
+            func(*args)
+        except Exception:
+            logger.exception('Unhandled error while handling a request')
+
+        with self._lock:
+            if not self._tasks:
+                self._running = False
+                return
+
+        self._schedule()
+
+
+class Dispatcher:
+    """Runs cog methods on pools of worker threads instead of the thread \
+    reading from the connection. Requests are assigned to a pool by their full path \
+    or by their cog's route, and to the :code:`'default'` pool otherwise. \
+    Requests from the same connection to the same pool run one at a time, in the order \
+    they were received, while requests to different pools run alongside each other, \
+    so a slow password hash does not hold up a client's messages.
+
+    :param pools: The number of worker threads in each pool by the pool's name, \
+    defaults to :attr:`Dispatcher.POOLS`
+    :type pools: Optional[Dict[str, int]], optional
+    :param routes: The name of the pool for a path, such as :code:`'messages/send_msg'`, \
+    or a route, such as :code:`'authentication'`, defaults to :attr:`Dispatcher.ROUTES`
+    :type routes: Optional[Dict[str, str]], optional
+    :raises ValueError: If there is no :code:`'default'` pool or a route is assigned \
+    to a pool which does not exist
+    """
+
+    POOLS: Dict[str, int] = {
+        'default': 16,
+        'auth': os.cpu_count() or 1
+    }
+    ROUTES: Dict[str, str] = {
+        'authentication': 'auth'
+    }
+
+    def __init__(
+        self,
+        pools: Optional[Dict[str, int]] = None,
+        routes: Optional[Dict[str, str]] = None
+    ) -> None:
+        """The constructor method.
+        """
+        pools = self.POOLS if pools is None else pools
+        self.routes = dict(self.ROUTES if routes is None else routes)
+
+        if 'default' not in pools:
+            raise ValueError('A "default" pool is required')
+
+        for route, pool in self.routes.items():
+            if pool not in pools:
+                raise ValueError(f'Route "{route}" is assigned to unknown pool "{pool}"')
+
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'frost-{name}')
+            for name, size in pools.items()
+        }
+        self._strands: Dict[Any, Dict[str, _Strand]] = dict()
+        self._lock = threading.Lock()
+
+    def pool(self, path: Optional[str]) -> str:
+        """Gets the name of the pool a request is run on.
+
+        :param path: The path of the request
+        :type path: Optional[str]
+        :return: The name of the pool
+        :rtype: str
+        """
+        if not isinstance(path, str):
+            return 'default'
+
+        pool = self.routes.get(path)
+
+        if pool is None:
+            pool = self.routes.get(path.split('/', 1)[0], 'default')
+
+        return pool
+
+    def submit(self, conn: Any, data: Any, func: Callable, *args: Any) -> None:
+        """Runs the handling of a request on its pool, after the connection's earlier \
+        requests to the same pool.
+
+        :param conn: The connection the request was received from
+        :type conn: Any
+        :param data: Data received from the client
+        :type data: Any
+        :param func: Handles the request
+        :type func: Callable
+        :param args: Arguments for :code:`func`
+        :type args: Any
+        """
+        try:
+            path = data['headers']['path']
+        except (KeyError, TypeError):
+            path = None
+
+        pool = self.pool(path)
+
+        with self._lock:
+            strands = self._strands.setdefault(conn, dict())
+            strand = strands.get(pool)
+
+            if strand is None:
+                strand = strands[pool] = _Strand(self._pools[pool])
+
+        strand.submit(func, *args)
+
+    def close(self, conn: Any) -> None:
+        """Discards the requests of a disconnected client which have not started yet.
+
+        :param conn: The client's connection
+        :type conn: Any
+        """
+        with self._lock:
+            strands = self._strands.pop(conn, dict())
+
+        for strand in strands.values():
+            strand.clear()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts down every pool.
+
+        :param wait: Whether to wait for the requests already submitted to finish, \
+        defaults to True
+        :type wait: bool, optional
+        """
+        for executor in self._pools.values():
+            executor.shutdown(wait=wait)
@@ -0,0 +1,186 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash
+)
+
+
+class Hasher:
+    """The interface of a password hashing backend. \
+    Subclass it and assign an instance to :attr:`frost.server.objects.Memory.hasher` \
+    to change how passwords are hashed.
+    """
+
+    def hash(self, password: str) -> str:
+        """Hashes a password.
+
+        :param password: The password to hash
+        :type password: str
+        :return: The password's hash
+        :rtype: str
+        """
+        raise NotImplementedError
+
+    def check(self, pwhash: str, password: str) -> bool:
+        """Checks a password against a hash.
+
+        :param pwhash: The hash to check against
+        :type pwhash: str
+        :param password: The password to check
+        :type password: str
+        :return: Whether the password matches the hash
+        :rtype: bool
+        """
+        raise NotImplementedError
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """Checks whether a hash was made with other parameters than the hasher's, \
+        so the password should be hashed again the next time it is known.
+
+        :param pwhash: The hash to check
+        :type pwhash: str
+        :return: Whether the password should be hashed again
+        :rtype: bool
+        """
+        return False
+
+    def start(self) -> None:
+        """Prepares the hasher before the server starts serving clients.
+        """
+
+    def shutdown(self) -> None:
+        """Releases the hasher's resources when the server stops.
+        """
+
+
+class Pbkdf2Hasher(Hasher):
+    """Hashes passwords with werkzeug's PBKDF2, optionally in a pool of processes \
+    so hashing does not hold the GIL of the server. At most :code:`max_concurrency` \
+    passwords are hashed or checked at once, any more wait for their turn.
+
+    :param iterations: The cost of a hash, defaults to :attr:`Pbkdf2Hasher.ITERATIONS`
+    :type iterations: Optional[int], optional
+    :param hash_name: The hash function PBKDF2 uses, defaults to 'sha256'
+    :type hash_name: str, optional
+    :param salt_length: The length of the salt, defaults to 16
+    :type salt_length: int, optional
+    :param processes: The number of processes to hash in, \
+    0 to hash on the calling thread, defaults to 0
+    :type processes: int, optional
+    :param max_concurrency: The number of passwords hashed or checked at once, \
+    defaults to the number of processes, or the number of CPUs when hashing on \
+    the calling thread
+    :type max_concurrency: Optional[int], optional
+    """
+
+    ITERATIONS: int = DEFAULT_PBKDF2_ITERATIONS
+
+    def __init__(
+        self,
+        iterations: Optional[int] = None,
+        hash_name: str = 'sha256',
+        salt_length: int = 16,
+        processes: int = 0,
+        max_concurrency: Optional[int] = None
+    ) -> None:
+        """The constructor method.
+        """
+        self.iterations = self.ITERATIONS if iterations is None else iterations
+        self.method = f'pbkdf2:{hash_name}:{self.iterations}'
+        self.salt_length = salt_length
+        self.processes = processes
+
+        if max_concurrency is None:
+            max_concurrency = processes or os.cpu_count() or 1
+
+        self._limit = threading.BoundedSemaphore(max_concurrency)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> Optional['ProcessPoolExecutor']:
+        """Gets the pool of processes, creating it if needed.
+
+        :return: The pool, or None when hashing on the calling thread
+        :rtype: Optional[ProcessPoolExecutor]
+        """
+        if not self.processes:
+            return None
+
+        with self._pool_lock:
+            if self._pool is None:
+                # Forking does not import the server's script again in every process
+                context = None
+                if 'fork' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('fork')
+
+                self._pool = ProcessPoolExecutor(self.processes, mp_context=context)
+
+            return self._pool
+
+    def hash(self, password: str) -> str:
+        """Hashes a password.
+
+        :param password: The password to hash
+        :type password: str
+        :return: The password's hash
+        :rtype: str
+        """
+        pool = self._get_pool()
+
+        with self._limit:
+            if pool is None:
+                return generate_password_hash(password, self.method, self.salt_length)
+
+            return pool.submit(
+                generate_password_hash, password, self.method, self.salt_length
+            ).result()
+
+    def check(self, pwhash: str, password: str) -> bool:
+        """Checks a password against a hash.
+
+        :param pwhash: The hash to check against
+        :type pwhash: str
+        :param password: The password to check
+        :type password: str
+        :return: Whether the password matches the hash
+        :rtype: bool
+        """
+        pool = self._get_pool()
+
+        with self._limit:
+            if pool is None:
+                return check_password_hash(pwhash, password)
+
+            return pool.submit(check_password_hash, pwhash, password).result()
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """Checks whether a hash was made with another method or cost than the hasher's.
+
+        :param pwhash: The hash to check
+        :type pwhash: str
+        :return: Whether the password should be hashed again
+        :rtype: bool
+        """
+        return pwhash.split('$', 1)[0] != self.method
+
+    def start(self) -> None:
+        """Starts the pool of processes, before the server starts any threads.
+        """
+        pool = self._get_pool()
+
+        if pool is not None:
+            pool.submit(int).result()
+
+    def shutdown(self) -> None:
+        """Stops the pool of processes, which is started again if the hasher is used.
+        """
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
@@ -1,5 +1,12 @@
+import json
 import socket
-from typing import Optional, Tuple
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from frost.server.database import MessageWriter
+from frost.server.hashing import Hasher, Pbkdf2Hasher
+from frost.server.socketio.outbound import OutboundQueue
 
 
 class UserObj:
@@ -13,14 +20,19 @@ class UserObj:
     :type id_: Optional[int]
     :param username: The user's username, defaults to None
     :type username: Optional[str]
+    :param outbound: The queue of data waiting to be sent to the user, defaults to None
+    :type outbound: Optional[OutboundQueue]
     """
 
+    __slots__ = ('addr', 'conn', 'id', 'username', 'outbound')
+
     def __init__(
         self,
         addr: Tuple[str, int],
         conn: 'socket.socket',
         id_: Optional[int] = None,
-        username: Optional[str] = None
+        username: Optional[str] = None,
+        outbound: Optional['OutboundQueue'] = None
     ) -> None:
         """The constructor method.
         """
@@ -28,6 +40,16 @@ class UserObj:
         self.conn = conn
         self.id = id_
         self.username = username
+        self.outbound = outbound
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the number of bytes waiting to be sent to the user.
+
+        :return: The number of bytes waiting to be sent to the user
+        :rtype: int
+        """
+        return 0 if self.outbound is None else self.outbound.size
 
     @property
     def is_logged_in(self) -> bool:
@@ -50,12 +72,563 @@ class UserObj:
         self.username = username
 
 
+class Memberships:
+    """A thread-safe index of which users have joined which rooms, \
+    so membership checks and the members of a room never need the database. \
+    It must be kept in sync with the database whenever a user joins or leaves a room.
+    """
+
+    def __init__(self) -> None:
+        """The constructor method.
+        """
+        self._room_members: Dict[int, Set[int]] = dict()
+        self._user_rooms: Dict[int, Set[int]] = dict()
+        self._lock = threading.Lock()
+
+    def load(self, pairs: Iterable[Tuple[int, int]]) -> None:
+        """Replaces the index with the given memberships.
+
+        :param pairs: The memberships as user ID and room ID pairs
+        :type pairs: Iterable[Tuple[int, int]]
+        """
+        room_members: Dict[int, Set[int]] = dict()
+        user_rooms: Dict[int, Set[int]] = dict()
+
+        for user_id, room_id in pairs:
+            room_members.setdefault(room_id, set()).add(user_id)
+            user_rooms.setdefault(user_id, set()).add(room_id)
+
+        with self._lock:
+            self._room_members = room_members
+            self._user_rooms = user_rooms
+
+    def add(self, user_id: int, room_id: int) -> None:
+        """Adds a user to a room.
+
+        :param user_id: The user's ID
+        :type user_id: int
+        :param room_id: The room's ID
+        :type room_id: int
+        """
+        with self._lock:
+            self._room_members.setdefault(room_id, set()).add(user_id)
+            self._user_rooms.setdefault(user_id, set()).add(room_id)
+
+    def remove(self, user_id: int, room_id: int) -> None:
+        """Removes a user from a room.
+
+        :param user_id: The user's ID
+        :type user_id: int
+        :param room_id: The room's ID
+        :type room_id: int
+        """
+        with self._lock:
+            self._room_members.get(room_id, set()).discard(user_id)
+            self._user_rooms.get(user_id, set()).discard(room_id)
+
+    def is_member(self, user_id: int, room_id: int) -> bool:
+        """Checks whether a user has joined a room.
+
+        :param user_id: The user's ID
+        :type user_id: int
+        :param room_id: The room's ID
+        :type room_id: int
+        :return: Whether the user has joined the room
+        :rtype: bool
+        """
+        return user_id in self._room_members.get(room_id, ())
+
+    def members(self, room_id: int) -> FrozenSet[int]:
+        """Gets the IDs of the users who have joined a room.
+
+        :param room_id: The room's ID
+        :type room_id: int
+        :return: A snapshot of the room's members
+        :rtype: FrozenSet[int]
+        """
+        with self._lock:
+            return frozenset(self._room_members.get(room_id, ()))
+
+    def rooms(self, user_id: int) -> FrozenSet[int]:
+        """Gets the IDs of the rooms a user has joined.
+
+        :param user_id: The user's ID
+        :type user_id: int
+        :return: A snapshot of the user's rooms
+        :rtype: FrozenSet[int]
+        """
+        with self._lock:
+            return frozenset(self._user_rooms.get(user_id, ()))
+
+
+class RoomNames:
+    """A thread-safe index of the name of every room, \
+    so sending a message never needs the database to look the room up. \
+    It must be kept in sync with the database whenever a room is created.
+    """
+
+    def __init__(self) -> None:
+        """The constructor method.
+        """
+        self._names: Dict[int, str] = dict()
+        self._lock = threading.Lock()
+
+    def load(self, pairs: Iterable[Tuple[int, str]]) -> None:
+        """Replaces the index with the given room names.
+
+        :param pairs: The rooms as room ID and name pairs
+        :type pairs: Iterable[Tuple[int, str]]
+        """
+        names = dict(pairs)
+
+        with self._lock:
+            self._names = names
+
+    def add(self, room_id: int, name: str) -> None:
+        """Adds a room.
+
+        :param room_id: The room's ID
+        :type room_id: int
+        :param name: The room's name
+        :type name: str
+        """
+        with self._lock:
+            self._names[room_id] = name
+
+    def get(self, room_id: int) -> Optional[str]:
+        """Gets the name of a room.
+
+        :param room_id: The room's ID
+        :type room_id: int
+        :return: The room's name, or None if the room is not indexed
+        :rtype: Optional[str]
+        """
+        return self._names.get(room_id)
+
+
+class _CachedRoom:
+    """The latest messages of a room kept by :class:`RoomHistory`, \
+    as message ID, message and size tuples in order of their IDs.
+    """
+
+    __slots__ = ('msgs', 'complete', 'bytes')
+
+    def __init__(self) -> None:
+        """The constructor method.
+        """
+        self.msgs: Deque[Tuple[int, Dict[str, Any], int]] = deque()
+        self.complete = False
+        """Whether the messages are every message of the room.
+        """
+        self.bytes = 0
+
+
+class RoomHistory:
+    """A thread-safe cache of the latest messages of recently used rooms, \
+    kept as they are sent to clients, so history requests can be answered \
+    without the database. A room is cached once its latest messages are read \
+    from the database and given to :meth:`RoomHistory.fill`, then every new message \
+    is added with :meth:`RoomHistory.append`, so a room always holds its latest \
+    messages without gaps. Each room keeps up to :code:`size` messages. \
+    Once the cached messages take more than :code:`max_bytes` when encoded as JSON, \
+    the least recently used rooms are dropped.
+
+    :param size: The number of messages kept for each room, \
+    defaults to :attr:`RoomHistory.SIZE`
+    :type size: Optional[int], optional
+    :param max_bytes: The size of the cached messages to keep to, \
+    defaults to :attr:`RoomHistory.MAX_BYTES`
+    :type max_bytes: Optional[int], optional
+    """
+
+    SIZE: int = 200
+    MAX_BYTES: int = 16 * 1024 * 1024
+
+    def __init__(self, size: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """The constructor method.
+        """
+        self.size = self.SIZE if size is None else size
+        self.max_bytes = self.MAX_BYTES if max_bytes is None else max_bytes
+
+        self.hits = 0
+        """The number of requests answered from the cache.
+        """
+        self.misses = 0
+        """The number of requests which needed the database.
+        """
+        self.evictions = 0
+        """The number of rooms dropped to stay within :code:`max_bytes`.
+        """
+
+        self._rooms: 'OrderedDict[int, _CachedRoom]' = OrderedDict()
+        self._versions: Dict[int, int] = dict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def version(self, room_id: int) -> int:
+        """Gets the number of messages added to a room so far, to be passed to \
+        :meth:`RoomHistory.fill` along with messages read from the database afterwards.
+
+        :param room_id: The room's ID
+        :type room_id: int
+        :return: The room's version
+        :rtype: int
+        """
+        with self._lock:
+            return self._versions.get(room_id, 0)
+
+    def fill(
+        self,
+        room_id: int,
+        msgs: Dict[int, Dict[str, Any]],
+        complete: bool,
+        version: int
+    ) -> None:
+        """Caches the latest messages of a room, read from the database. \
+        Nothing is cached if the room is already cached or a message was added \
+        to it since :code:`version` was taken, as the messages could be missing it.
+
+        :param room_id: The room's ID
+        :type room_id: int
+        :param msgs: The latest messages of the room by their IDs, in order
+        :type msgs: Dict[int, Dict[str, Any]]
+        :param complete: Whether the messages are every message of the room
+        :type complete: bool
+        :param version: The room's :meth:`RoomHistory.version` before the messages were read
+        :type version: int
+        """
+        items = list(msgs.items())[-self.size:]
+        sizes = [len(json.dumps(msg, default=str)) for _, msg in items]
+
+        with self._lock:
+            if room_id in self._rooms or self._versions.get(room_id, 0) != version:
+                return
+
+            room = self._rooms[room_id] = _CachedRoom()
+            room.complete = complete and len(items) == len(msgs)
+
+            for (msg_id, msg), size in zip(items, sizes):
+                room.msgs.append((msg_id, msg, size))
+                room.bytes += size
+
+            self._bytes += room.bytes
+            self._evict()
+
+    def append(self, room_id: int, msg_id: int, msg: Dict[str, Any]) -> None:
+        """Adds a new message to a room, if the room is cached.
+
+        :param room_id: The room's ID
+        :type room_id: int
+        :param msg_id: The message's ID
+        :type msg_id: int
+        :param msg: The message, as it is sent to clients
+        :type msg: Dict[str, Any]
+        """
+        size = len(json.dumps(msg, default=str))
+
+        with self._lock:
+            self._versions[room_id] = self._versions.get(room_id, 0) + 1
+            room = self._rooms.get(room_id)
+
+            if room is None:
+                return
+
+            # Messages sent at the same time may be added out of order
+            index = len(room.msgs)
+            while index and room.msgs[index - 1][0] >= msg_id:
+                index -= 1
+
+                if room.msgs[index][0] == msg_id:
+                    return
+
+            if index == 0 and room.msgs and not room.complete:
+                return  # Older than every cached message
+
+            room.msgs.insert(index, (msg_id, msg, size))
+            room.bytes += size
+            self._bytes += size
+
+            if len(room.msgs) > self.size:
+                self._drop_oldest(room)
+
+            self._rooms.move_to_end(room_id)
+            self._evict()
+
+    def get(
+        self,
+        room_id: int,
+        limit: int,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None
+    ) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Gets messages of a room like :meth:`frost.server.cogs.Msgs.get_room_msgs`, \
+        if every message asked for is cached.
+
+        :param room_id: The room's ID
+        :type room_id: int
+        :param limit: The maximum number of messages to get
+        :type limit: int
+        :param before_id: Only get messages with an ID lower than this one, defaults to None
+        :type before_id: Optional[int], optional
+        :param after_id: Only get messages with an ID higher than this one, \
+        the earliest ones instead of the latest ones if there is no :code:`before_id`, \
+        defaults to None
+        :type after_id: Optional[int], optional
+        :return: The messages by their IDs, in order, or None if they are not all cached
+        :rtype: Optional[Dict[int, Dict[str, Any]]]
+        """
+        with self._lock:
+            room = self._rooms.get(room_id)
+
+            if room is None or limit < 1:
+                self.misses += 1
+                return None
+
+            # The cached messages are the latest ones, so only older ones can be missing
+            covered = room.complete or (
+                after_id is not None and bool(room.msgs) and room.msgs[0][0] <= after_id
+            )
+
+            msgs = [
+                (msg_id, msg) for msg_id, msg, _ in room.msgs
+                if (before_id is None or msg_id < before_id)
+                and (after_id is None or msg_id > after_id)
+            ]
+
+            if after_id is not None and before_id is None:
+                msgs = msgs[:limit] if covered else None
+            else:
+                msgs = msgs[-limit:] if covered or len(msgs) >= limit else None
+
+            if msgs is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._rooms.move_to_end(room_id)
+
+        return dict(msgs)
+
+    def remove(self, room_id: int) -> None:
+        """Drops a room from the cache.
+
+        :param room_id: The room's ID
+        :type room_id: int
+        """
+        with self._lock:
+            room = self._rooms.pop(room_id, None)
+
+            if room is not None:
+                self._bytes -= room.bytes
+
+    def clear(self) -> None:
+        """Drops every room from the cache.
+        """
+        with self._lock:
+            self._rooms.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Gets statistics about the cache.
+
+        :return: The number of :code:`'hits'`, :code:`'misses'` and :code:`'evictions'`, \
+        the :code:`'hit_rate'`, and the number of cached :code:`'rooms'`, :code:`'messages'` \
+        and their :code:`'bytes'`
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'rooms': len(self._rooms),
+                'messages': sum(len(room.msgs) for room in self._rooms.values()),
+                'bytes': self._bytes
+            }
+
+    def _drop_oldest(self, room: _CachedRoom) -> None:
+        """Drops the oldest message of a room.
+
+        :param room: The room
+        :type room: _CachedRoom
+        """
+        size = room.msgs.popleft()[2]
+        room.bytes -= size
+        self._bytes -= size
+        room.complete = False
+
+    def _evict(self) -> None:
+        """Drops the least recently used rooms until the cache is within \
+        :code:`max_bytes`. The oldest messages of the last room left are dropped \
+        if it is still too large.
+        """
+        while self._bytes > self.max_bytes and len(self._rooms) > 1:
+            self._bytes -= self._rooms.popitem(last=False)[1].bytes
+            self.evictions += 1
+
+        for room in self._rooms.values():
+            while self._bytes > self.max_bytes and room.msgs:
+                self._drop_oldest(room)
+
+
+class Connections:
+    """A thread-safe registry of connected users, indexed by their address \
+    and, once logged in, by their ID. A user can be logged in from several \
+    connections at once. The connections of a user are kept in a tuple which is \
+    replaced rather than changed, so they can be read without taking a lock.
+    """
+
+    def __init__(self) -> None:
+        """The constructor method.
+        """
+        self._by_addr: Dict[Tuple[str, int], UserObj] = dict()
+        self._by_id: Dict[int, Tuple[UserObj, ...]] = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_addr)
+
+    def add(self, user: 'UserObj') -> None:
+        """Registers a newly connected user.
+
+        :param user: The connected user
+        :type user: UserObj
+        """
+        with self._lock:
+            self._by_addr[user.addr] = user
+
+    def get(self, addr: Tuple[str, int]) -> Optional['UserObj']:
+        """Gets a connected user by their address.
+
+        :param addr: The user's IP address and port
+        :type addr: Tuple[str, int]
+        :return: The user, or None if they are not connected
+        :rtype: Optional[UserObj]
+        """
+        return self._by_addr.get(addr)
+
+    def login(self, addr: Tuple[str, int], id_: int, username: str) -> Optional['UserObj']:
+        """Logs in the user connected from an address.
+
+        :param addr: The user's IP address and port
+        :type addr: Tuple[str, int]
+        :param id_: The user's ID
+        :type id_: int
+        :param username: The user's username
+        :type username: str
+        :return: The user, or None if they disconnected
+        :rtype: Optional[UserObj]
+        """
+        with self._lock:
+            user = self._by_addr.get(addr)
+
+            if user is None:
+                return None
+
+            if user.id is not None:
+                self._discard(user)
+
+            user.login(id_, username)
+            self._by_id[id_] = self._by_id.get(id_, ()) + (user,)
+
+            return user
+
+    def remove(self, addr: Tuple[str, int]) -> Optional['UserObj']:
+        """Removes a disconnected user.
+
+        :param addr: The user's IP address and port
+        :type addr: Tuple[str, int]
+        :return: The user, or None if they were not connected
+        :rtype: Optional[UserObj]
+        """
+        with self._lock:
+            user = self._by_addr.pop(addr, None)
+
+            if user is not None and user.id is not None:
+                self._discard(user)
+
+            return user
+
+    def _discard(self, user: 'UserObj') -> None:
+        """Removes a connection from its user's connections, the lock must be held.
+
+        :param user: The logged in connection
+        :type user: UserObj
+        """
+        sessions = tuple(
+            session for session in self._by_id.get(user.id, ()) if session is not user
+        )
+
+        if sessions:
+            self._by_id[user.id] = sessions
+        else:
+            self._by_id.pop(user.id, None)
+
+    def sessions(self, id_: int) -> Tuple['UserObj', ...]:
+        """Gets every connection a user is logged in from.
+
+        :param id_: The user's ID
+        :type id_: int
+        :return: The user's connections
+        :rtype: Tuple[UserObj, ...]
+        """
+        return self._by_id.get(id_, ())
+
+    def is_online(self, id_: int) -> bool:
+        """Checks whether a user is logged in from any connection.
+
+        :param id_: The user's ID
+        :type id_: int
+        :return: Whether the user is logged in
+        :rtype: bool
+        """
+        return id_ in self._by_id
+
+    def online_conns(self, ids: Iterable[int]) -> List[Any]:
+        """Gets the connections of the given users who are logged in, \
+        including every connection of a user logged in more than once.
+
+        :param ids: The IDs of the users
+        :type ids: Iterable[int]
+        :return: The connections of the logged in users
+        :rtype: List[Any]
+        """
+        by_id = self._by_id
+        conns = list()
+
+        for id_ in ids:
+            for user in by_id.get(id_, ()):
+                conns.append(user.conn)
+
+        return conns
+
+
 class Memory:
     """Stores information that needs to be passed around and easily accessible.
     """
-    all_users = dict()
+    connections = Connections()
     """All connected users.
     """
-    logged_in_users = dict()
-    """All logged in users.
+    memberships = Memberships()
+    """Which users have joined which rooms, \
+    loaded from the database by :class:`frost.server.server.FrostServer`.
+    """
+    room_names = RoomNames()
+    """The name of every room, \
+    loaded from the database by :class:`frost.server.server.FrostServer`.
+    """
+    message_writer: Optional['MessageWriter'] = None
+    """Writes messages in batches when write-behind is enabled \
+    with :attr:`frost.server.server.FrostServer.write_behind`.
+    """
+    history: Optional['RoomHistory'] = RoomHistory()
+    """The latest messages of recently used rooms, replace it before the server runs \
+    to change its size, or set it to None to always read history from the database.
+    """
+    hasher: 'Hasher' = Pbkdf2Hasher()
+    """Hashes and checks passwords, replace it before the server runs \
+    to change the hashing backend or its parameters.
     """
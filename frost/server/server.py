@@ -1,31 +1,68 @@
+import asyncio
 import socket
 from pathlib import Path
-from typing import Any, Callable, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
-from frost.ext import Handler
+from frost.ext import Handler, UnknownRouteError
+from frost.server.auth import sessions
 from frost.server.cogs import Auth, Msgs, Rooms
+from frost.server.database import MessageWriter
+from frost.server.dispatcher import Dispatcher
+from frost.server.headers import Status
+from frost.server.logger import logger
 from frost.server.objects import Memory, UserObj
-from frost.server.socketio import BaseServer, threaded
+from frost.server.socketio import AsyncBaseServer, BaseServer, threaded
 
 
-def send_partial(send_func: Callable, conn: 'socket.socket') -> Callable:
+def send_partial(
+    send_func: Callable,
+    conn: 'socket.socket',
+    request_id: Optional[Union[int, str]] = None
+) -> Callable:
     """A partial function to auto fill the :code:`conn` parameter of \
-    :meth:`frost.server.socketio.base_server.BaseServer`
+    :meth:`frost.server.socketio.base_server.BaseServer`. With a :code:`request_id`, \
+    it is echoed in the headers of the data sent so the client can tell which \
+    of its requests the data answers.
 
     :param send_func: The send function that sends data to the client
     :type send_func: Callable
     :param conn: A specific client's connection
     :type conn: socket.socket
+    :param request_id: The ID the client gave its request, defaults to None
+    :type request_id: Optional[Union[int, str]], optional
     :return: The inner execute function
     :rtype: Callable
     """
 
-    def execute(*args: Any, **kwargs: Any) -> Any:
-        return send_func(conn, *args, **kwargs)
+    def execute(data: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        if request_id is not None:
+            data = dict(data, headers=dict(data['headers'], request_id=request_id))
+
+        return send_func(conn, data, *args, **kwargs)
 
     return execute
 
 
+def get_request_id(data: Any) -> Optional[Union[int, str]]:
+    """Gets the ID a client gave its request, if any.
+
+    :param data: Data received from the client
+    :type data: Any
+    :return: The request ID, or None if the request has none or it is not \
+    an integer or string
+    :rtype: Optional[Union[int, str]]
+    """
+    try:
+        request_id = data['headers'].get('request_id')
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+    if isinstance(request_id, (int, str)) and not isinstance(request_id, bool):
+        return request_id
+
+    return None
+
+
 class FrostServer(BaseServer):
     """The Frost server.
 
@@ -33,6 +70,10 @@ class FrostServer(BaseServer):
     :type file: str
     """
 
+    ENGINES = ('threaded', 'asyncio')
+    """The engines the server can be run with.
+    """
+
     def __init__(self, file: str) -> None:
         super(FrostServer, self).__init__()
 
@@ -47,57 +88,253 @@ class FrostServer(BaseServer):
         self._dir = path.parent
 
         self.func = self.on_user_connect
+        self._async_server: Optional[AsyncBaseServer] = None
+
+        self.write_behind: Optional[Dict[str, Any]] = None
+        """Keyword arguments for a :class:`frost.server.database.writer.MessageWriter` \
+        to write messages in batches, None to commit every message on its own.
+        """
+        self.workers: Optional[Dict[str, Any]] = None
+        """Keyword arguments for a :class:`frost.server.dispatcher.Dispatcher` \
+        to run cog methods on pools of worker threads, None to run them \
+        on the thread reading from the client.
+        """
+        self._dispatcher: Optional[Dispatcher] = None
 
         db = Path('pyfrost.sqlite3')
         if not db.exists():
             from frost.server.database import init_db
             init_db()
+        else:
+            from frost.server.database import migrate_db
+            migrate_db()
+
+        from frost.server.database import get_memberships, get_room_names
+        Memory.memberships.load(get_memberships())
+        Memory.room_names.load(get_room_names())
+
+    @staticmethod
+    def _add_user(
+        conn: Any,
+        addr: Tuple[str, int],
+        server: Union['BaseServer', 'AsyncBaseServer']
+    ) -> None:
+        """Stores a newly connected client in :class:`frost.server.objects.Memory`.
+
+        :param conn: The client's connection
+        :type conn: Any
+        :param addr: The user's IP address and port
+        :type addr: Tuple[str, int]
+        :param server: The server engine the client is connected to
+        :type server: Union[BaseServer, AsyncBaseServer]
+        """
+        Memory.connections.add(UserObj(addr, conn, outbound=server.outbound(conn)))
+
+    @staticmethod
+    def _remove_user(addr: Tuple[str, int]) -> None:
+        """Removes a disconnected client from :class:`frost.server.objects.Memory`.
+
+        :param addr: The user's IP address and port
+        :type addr: Tuple[str, int]
+        """
+        user = Memory.connections.remove(addr)
+
+        if user is not None and user.id is not None and not Memory.connections.is_online(user.id):
+            # The user's last connection is gone
+            sessions.invalidate(user.id)
+
+    @staticmethod
+    def _handle(
+        handler: 'Handler',
+        data: Dict[str, Any],
+        conn: Any,
+        addr: Tuple[str, int],
+        server: Union['BaseServer', 'AsyncBaseServer']
+    ) -> None:
+        """Routes data received from a client to its cog method. \
+        A request for an unknown route, or one rejected by \
+        :func:`frost.server.auth.auth_required`, is answered with an error instead. \
+        Every response to the request echoes its :code:`request_id` header.
+
+        :param handler: The client's handler
+        :type handler: Handler
+        :param data: Data received from the client
+        :type data: Dict[str, Any]
+        :param conn: The client's connection
+        :type conn: Any
+        :param addr: The user's IP address and port
+        :type addr: Tuple[str, int]
+        :param server: The server engine the client is connected to
+        :type server: Union[BaseServer, AsyncBaseServer]
+        """
+        client_send = send_partial(server.send, conn, get_request_id(data))
+
+        try:
+            result = handler.handle(
+                data,
+                addr=addr,
+                send=server.send,
+                broadcast=server.broadcast,
+                client_send=client_send
+            )
+
+        except UnknownRouteError as e:
+            logger.info(f'{addr} requested an unknown route: {e.args[0]}')
+            client_send({
+                'headers': {
+                    'path': 'errors/unknown_route',
+                    'status': Status.UNKNOWN_ROUTE.value
+                },
+                'route': e.args[0]
+            })
+
+        else:
+            if result is Status.INVALID_AUTH:
+                client_send({
+                    'headers': {
+                        'path': 'errors/invalid_auth',
+                        'status': Status.INVALID_AUTH.value
+                    },
+                    'route': data['headers']['path']
+                })
 
     @threaded()
     def on_user_connect(self, conn: 'socket.socket', addr: Tuple[str, int]) -> None:
-        """Handles the connection of a client and executes tasks accordingly.
+        """Handles the connection of a client and executes tasks accordingly. \
+        With :attr:`FrostServer.workers` set, cog methods are handed off to \
+        the dispatcher so the client's next request is read straight away. \
+        An error raised by a cog method is logged, and the client stays connected.
 
         :param conn: The client's connection
         :type conn: 'socket.socket'
         :param addr: The user's IP address and port
         :type addr: Tuple[str, int]
         """
-        user = UserObj(addr, conn)
-        Memory.all_users[addr] = user
+        self._add_user(conn, addr, self)
+        handler = Handler()
+        dispatcher = self._dispatcher
+
+        try:
+            while True:
+                try:
+                    data = self.recieve(conn)
+                except Exception:
+                    break
+
+                try:
+                    if dispatcher is None:
+                        self._handle(handler, data, conn, addr, self)
+                    else:
+                        dispatcher.submit(
+                            conn, data, self._handle, handler, data, conn, addr, self
+                        )
+
+                except Exception:
+                    # A failing request must not end the connection
+                    logger.exception('Unhandled error while handling a request')
+
+        finally:
+            if dispatcher is not None:
+                dispatcher.close(conn)
+
+            self._remove_user(addr)
+
+    async def on_user_connect_async(
+        self,
+        conn: 'asyncio.StreamWriter',
+        addr: Tuple[str, int]
+    ) -> None:
+        """Handles the connection of a client when running on the asyncio engine. \
+        Cog methods are run in the event loop's default executor, \
+        one at a time per client, so idle clients do not hold a thread. \
+        With :attr:`FrostServer.workers` set, they are handed off to the dispatcher instead. \
+        An error raised by a cog method is logged, and the client stays connected.
+
+        :param conn: The client's connection
+        :type conn: asyncio.StreamWriter
+        :param addr: The user's IP address and port
+        :type addr: Tuple[str, int]
+        """
+        server = self._async_server
+        loop = asyncio.get_running_loop()
 
+        self._add_user(conn, addr, server)
         handler = Handler()
+        dispatcher = self._dispatcher
 
-        while True:
-            try:
-                data = self.recieve(conn)
+        try:
+            while True:
+                try:
+                    data = await server.recieve(conn)
+                except Exception:
+                    break
 
-            except Exception:
-                Memory.all_users.pop(addr)
+                try:
+                    if dispatcher is None:
+                        await loop.run_in_executor(
+                            None, self._handle, handler, data, conn, addr, server
+                        )
+                    else:
+                        dispatcher.submit(
+                            conn, data, self._handle, handler, data, conn, addr, server
+                        )
 
-                for id_, auth_user in Memory.logged_in_users.items():
-                    if auth_user.addr == addr:
-                        Memory.logged_in_users.pop(id_)
-                        break
+                except Exception:
+                    # A failing request must not end the connection
+                    logger.exception('Unhandled error while handling a request')
 
-                break
+        finally:
+            if dispatcher is not None:
+                dispatcher.close(conn)
 
-            else:
-                handler.handle(
-                    data,
-                    addr=addr,
-                    send=self.send,
-                    client_send=send_partial(self.send, conn)
-                )
-
-    def run(self, ip: str = '127.0.0.1', port: int = 5555) -> None:
+            self._remove_user(addr)
+
+    def run(self, ip: str = '127.0.0.1', port: int = 5555, engine: str = 'threaded') -> None:
         """Runs the FrostServer.
 
         :param ip: The IP for the server to bind to, defaults to '127.0.0.1'
         :type ip: str, optional
         :param port: The port for the server to bind to, defaults to 5555
         :type port: int, optional
+        :param engine: The engine to serve clients with, either :code:`'threaded'` \
+        for a thread per client or :code:`'asyncio'` for a single event loop, \
+        defaults to 'threaded'
+        :type engine: str, optional
+        :raises ValueError: If the engine is not one of :attr:`FrostServer.ENGINES`
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f'Unknown engine "{engine}", expected one of {self.ENGINES}')
+
         self.ip = ip
         self.port = port
 
-        self.start()
+        Memory.hasher.start()
+
+        if self.write_behind is not None:
+            Memory.message_writer = MessageWriter(**self.write_behind)
+            Memory.message_writer.start()
+
+        if self.workers is not None:
+            self._dispatcher = Dispatcher(**self.workers)
+
+        try:
+            if engine == 'asyncio':
+                self._async_server = AsyncBaseServer(ip, port)
+                self._async_server.func = self.on_user_connect_async
+                self._async_server.outbound_limits = self.outbound_limits
+                self._async_server.start()
+
+            else:
+                self.start()
+
+        finally:
+            if self._dispatcher is not None:
+                self._dispatcher.shutdown()
+                self._dispatcher = None
+
+            if Memory.message_writer is not None:
+                # Write the messages still queued before shutting down
+                Memory.message_writer.stop()
+                Memory.message_writer = None
+
+            Memory.hasher.shutdown()
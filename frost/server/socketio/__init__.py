@@ -1,4 +1,5 @@
+from frost.server.socketio.async_server import AsyncBaseServer
 from frost.server.socketio.base_server import BaseServer
 from frost.server.socketio.utils import threaded
 
-__all__ = ('BaseServer', 'threaded')
+__all__ = ('AsyncBaseServer', 'BaseServer', 'threaded')
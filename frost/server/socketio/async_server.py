@@ -0,0 +1,303 @@
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from frost.server.logger import logger
+from frost.ext.socketio.codec import JSON, Codec, answer_handshake
+from frost.ext.socketio.framing import (
+    HEADER, LEGACY_HEADER, MAX_FRAME_SIZE, encode, is_legacy, pack, unpack_size
+)
+from frost.server.socketio.outbound import OutboundQueue
+
+
+class AsyncBaseServer:
+    """An asyncio based socket server to send and receive data from many clients \
+    without a thread per connection. Assign self.func to a coroutine function with \
+    :code:`conn, addr` as parameters to handle new user connections, as shown in \
+    :meth:`frost.server.server.FrostServer.on_user_connect_async`. \
+    A client's connection is its :class:`asyncio.StreamWriter`.
+
+    :param ip: The IP address for the server to bind to, defaults to '127.0.0.1'
+    :type ip: str, optional
+    :param port: The port for the server to bind to, defaults to 5555
+    :type port: int, optional
+    """
+
+    EVICT_INTERVAL: float = 0.5
+    """How often in seconds a congested client is checked for disconnection.
+    """
+
+    MAX_FRAME_SIZE: int = MAX_FRAME_SIZE
+    """The size in bytes of the largest frame accepted from a client, \
+    larger ones raise :class:`frost.ext.exceptions.FrameTooLargeError`, \
+    which ends the connection.
+    """
+
+    def __init__(self, ip: str = '127.0.0.1', port: int = 5555) -> None:
+        """The constructor method.
+        """
+        self.ip = ip
+        self.port = port
+        self.func: Optional[Callable] = None
+        self.outbound_limits: Dict[str, Any] = dict()
+        """Keyword arguments for the :class:`frost.server.socketio.outbound.OutboundQueue` \
+        of every client.
+        """
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._readers: Dict['asyncio.StreamWriter', 'asyncio.StreamReader'] = dict()
+        self._legacy: Dict['asyncio.StreamWriter', Optional[bool]] = dict()
+        self._codecs: Dict['asyncio.StreamWriter', Codec] = dict()
+        self._outbound: Dict['asyncio.StreamWriter', OutboundQueue] = dict()
+        self._wakeups: Dict['asyncio.StreamWriter', asyncio.Event] = dict()
+
+    def send(self, conn: 'asyncio.StreamWriter', data: Any) -> None:
+        """Send data to a specific connected client. \
+        Safe to call from both the event loop and worker threads. Never blocks, \
+        data is queued in the client's :class:`frost.server.socketio.outbound.OutboundQueue`.
+
+        :param conn: The connected client's stream writer
+        :type conn: asyncio.StreamWriter
+        :param data: The data to send to the client
+        :type data: Any
+        """
+        frame = encode(data, bool(self._legacy.get(conn)), self._codecs.get(conn))
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._write(conn, frame)
+        else:
+            self._call_soon(self._write, conn, frame)
+
+    def broadcast(self, conns: Iterable['asyncio.StreamWriter'], data: Any) -> None:
+        """Send the same data to many connected clients, encoding it only once per codec. \
+        Safe to call from both the event loop and worker threads.
+
+        :param conns: The connected clients' stream writers
+        :type conns: Iterable[asyncio.StreamWriter]
+        :param data: The data to send to the clients
+        :type data: Any
+        """
+        encoded = dict()
+        frames = dict()
+        writes = list()
+
+        for conn in conns:
+            legacy = bool(self._legacy.get(conn))
+            codec = self._codecs.get(conn, JSON)
+
+            frame = frames.get((legacy, codec))
+            if frame is None:
+                packets = encoded.get(codec)
+                if packets is None:
+                    packets = encoded[codec] = codec.encode(data)
+
+                frame = frames[legacy, codec] = pack(packets, legacy)
+
+            writes.append((conn, frame))
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._write_all(writes)
+        else:
+            self._call_soon(self._write_all, writes)
+
+    def _call_soon(self, callback: Callable, *args: Any) -> None:
+        """Schedules a callback on the event loop from a worker thread, \
+        dropping it if the server has already shut down.
+
+        :param callback: The callback to schedule
+        :type callback: Callable
+        :param args: Arguments for the callback
+        :type args: Any
+        """
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # The event loop is closed
+
+    def _write_all(self, writes: List[Tuple['asyncio.StreamWriter', bytes]]) -> None:
+        """Queues frames for many clients.
+
+        :param writes: The clients' stream writers paired with the frames to queue
+        :type writes: List[Tuple[asyncio.StreamWriter, bytes]]
+        """
+        for conn, frame in writes:
+            self._write(conn, frame)
+
+    def _write(self, conn: 'asyncio.StreamWriter', frame: bytes) -> None:
+        """Queues a frame for a client, ignoring closed connections.
+
+        :param conn: The connected client's stream writer
+        :type conn: asyncio.StreamWriter
+        :param frame: The encoded frame to queue
+        :type frame: bytes
+        """
+        queue = self._outbound.get(conn)
+
+        if queue is not None and queue.put(frame):
+            self._wakeups[conn].set()
+
+    async def _drain(self, conn: 'asyncio.StreamWriter') -> None:
+        """Writes a client's queued frames to its transport, waiting whenever the transport \
+        is full, and disconnects the client if it stays congested for too long.
+
+        :param conn: The connected client's stream writer
+        :type conn: asyncio.StreamWriter
+        """
+        queue = self._outbound[conn]
+        wakeup = self._wakeups[conn]
+        transport = conn.transport
+
+        while True:
+            await wakeup.wait()
+            wakeup.clear()
+
+            while queue:
+                frame = queue.peek()
+                queue.advance(len(frame))
+                conn.write(frame)
+
+                while transport.get_write_buffer_size() > transport.get_write_buffer_limits()[1]:
+                    try:
+                        await asyncio.wait_for(conn.drain(), self.EVICT_INTERVAL)
+
+                    except asyncio.TimeoutError:
+                        if queue.expired:
+                            logger.info(
+                                f'Disconnecting {conn.get_extra_info("peername")}, '
+                                'its outbound queue is congested'
+                            )
+                            queue.close()
+                            transport.abort()
+                            return
+
+                    except ConnectionError:
+                        queue.close()
+                        return
+
+    def outbound(self, conn: 'asyncio.StreamWriter') -> 'OutboundQueue':
+        """Get the queue of data waiting to be sent to a specific client.
+
+        :param conn: The connected client's stream writer
+        :type conn: asyncio.StreamWriter
+        :return: The client's outbound queue
+        :rtype: OutboundQueue
+        """
+        return self._outbound[conn]
+
+    async def recieve(self, conn: 'asyncio.StreamWriter') -> Any:
+        """Receive data from a specific client. A handshake the client opens its \
+        connection with is answered here, see :mod:`frost.ext.socketio.codec`.
+
+        :param conn: The connected client's stream writer
+        :type conn: asyncio.StreamWriter
+        :return: The data received from the client
+        :rtype: Any
+        """
+        first = self._legacy[conn] is None
+        data = await self._read_frame(conn)
+
+        if first:
+            answer = answer_handshake(data)
+
+            if answer is not None:
+                # The answer is encoded before the codec changes
+                reply, codec = answer
+                self.send(conn, reply)
+                self._codecs[conn] = codec
+
+                data = await self._read_frame(conn)
+
+        return data
+
+    async def _read_frame(self, conn: 'asyncio.StreamWriter') -> Any:
+        """Reads and decodes the next frame from a client.
+
+        :param conn: The connected client's stream writer
+        :type conn: asyncio.StreamWriter
+        :raises FrameTooLargeError: If the frame is larger than :attr:`MAX_FRAME_SIZE`
+        :return: The data received from the client
+        :rtype: Any
+        """
+        reader = self._readers[conn]
+        legacy = self._legacy[conn]
+        prefix = b''
+
+        if legacy is None:
+            prefix = await reader.readexactly(HEADER.size + 1)
+            legacy = self._legacy[conn] = is_legacy(prefix)
+
+        header = LEGACY_HEADER if legacy else HEADER
+        prefix += await reader.readexactly(max(header.size - len(prefix), 0))
+
+        size = unpack_size(prefix, 0, legacy, self.MAX_FRAME_SIZE)
+
+        packets = prefix[header.size:]
+        return self._codecs[conn].decode(packets + await reader.readexactly(size - len(packets)))
+
+    async def _on_connect(
+        self,
+        reader: 'asyncio.StreamReader',
+        writer: 'asyncio.StreamWriter'
+    ) -> None:
+        """Hands a newly connected client off to :code:`self.func`.
+
+        :param reader: The client's stream reader
+        :type reader: asyncio.StreamReader
+        :param writer: The client's stream writer
+        :type writer: asyncio.StreamWriter
+        """
+        addr = writer.get_extra_info('peername')
+        logger.info(f'Connection established to {addr}')
+
+        self._readers[writer] = reader
+        self._legacy[writer] = None
+        self._codecs[writer] = JSON
+        self._outbound[writer] = OutboundQueue(**self.outbound_limits)
+        self._wakeups[writer] = asyncio.Event()
+        drain = asyncio.ensure_future(self._drain(writer))
+
+        try:
+            if self.func is not None:
+                await self.func(writer, addr)
+        finally:
+            drain.cancel()
+            self._outbound.pop(writer).close()
+            self._wakeups.pop(writer)
+            self._readers.pop(writer)
+            self._legacy.pop(writer)
+            self._codecs.pop(writer)
+            writer.close()
+
+    async def _serve(self) -> None:
+        """Binds the server and serves clients until cancelled.
+        """
+        self._loop = asyncio.get_running_loop()
+
+        try:
+            server = await asyncio.start_server(self._on_connect, self.ip, self.port)
+
+        except OSError as e:
+            print(e)
+
+        else:
+            logger.info('Server is online!')
+
+            async with server:
+                await server.serve_forever()
+
+    def start(self) -> None:
+        """Starts the asyncio, multi-client server.
+        """
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            pass
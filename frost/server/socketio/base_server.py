@@ -1,25 +1,13 @@
-import json
+import selectors
 import socket
-import struct
-import time
-from dataclasses import dataclass
-from typing import Any, Callable, Optional, Tuple
+import weakref
+from typing import Any, Callable, Dict, Iterable, Optional
 
 from frost.server.logger import logger
-from frost.server.socketio.utils import threaded
-
-
-@dataclass
-class ConnectionData:
-    """An object used to store connection data accross threads.
-
-    :param conn: The client's connection, defaults to None
-    :type conn: Optional[socket.socket]
-    :param addr: The client's IP address and port, defaults to None
-    :type addr: Optional[Tuple[str, int]]
-    """
-    conn: Optional['socket.socket'] = None
-    addr: Optional[Tuple[str, int]] = None
+from frost.ext.exceptions import FrameTooLargeError
+from frost.ext.socketio.codec import JSON, answer_handshake
+from frost.ext.socketio.framing import FrameReader, encode, pack
+from frost.server.socketio.outbound import OutboundQueue, Sender
 
 
 class BaseServer:
@@ -34,6 +22,10 @@ class BaseServer:
     :type port: int, optional
     """
 
+    SELECT_TIMEOUT: float = 0.5
+    """The maximum time in seconds the accept loop waits before checking if it was stopped.
+    """
+
     def __init__(self, ip: str = '127.0.0.1', port: int = 5555) -> None:
         """The constructor method.
         """
@@ -44,53 +36,143 @@ class BaseServer:
             socket.SOCK_STREAM
         )
         self.func: Optional[Callable] = None
+        self.outbound_limits: Dict[str, Any] = dict()
+        """Keyword arguments for the :class:`frost.server.socketio.outbound.OutboundQueue` \
+        of every client, applied when the server starts.
+        """
+
+        self._running = False
+        self._sender = Sender()
+        self._readers: 'weakref.WeakKeyDictionary[socket.socket, FrameReader]' = \
+            weakref.WeakKeyDictionary()
+
+    def outbound(self, conn: 'socket.socket') -> 'OutboundQueue':
+        """Get the queue of data waiting to be sent to a specific client.
+
+        :param conn: The connected client socket
+        :type conn: socket.socket
+        :return: The client's outbound queue
+        :rtype: OutboundQueue
+        """
+        return self._sender.queue(conn)
 
     def send(self, conn: 'socket.socket', data: Any) -> None:
-        """Send data to a specific connected client.
+        """Send data to a specific connected client. The frame is sent with the same \
+        header the client has been sending with, see :mod:`frost.ext.socketio.framing`, \
+        and the codec agreed on in the handshake. \
+        Never blocks, data the client is not ready for is queued in its \
+        :class:`frost.server.socketio.outbound.OutboundQueue`.
 
         :param conn: The connected client socket
         :type conn: socket.socket
         :param data: The data to send to the client
         :type data: Any
         """
-        packets = json.dumps(data).encode('utf-8')
-        value = socket.htonl(len(packets))
-        size = struct.pack('L', value)
+        reader = self._readers.get(conn)
+
+        if reader is None:
+            frame = encode(data)
+        else:
+            frame = encode(data, bool(reader.legacy), reader.codec)
+
+        self._sender.send(conn, frame)
+
+    def broadcast(self, conns: Iterable['socket.socket'], data: Any) -> None:
+        """Send the same data to many connected clients, encoding it only once per codec. \
+        Never blocks, see :meth:`send`.
+
+        :param conns: The connected client sockets
+        :type conns: Iterable[socket.socket]
+        :param data: The data to send to the clients
+        :type data: Any
+        """
+        encoded = dict()
+        frames = dict()
+
+        for conn in conns:
+            reader = self._readers.get(conn)
+
+            if reader is None:
+                legacy, codec = False, JSON
+            else:
+                legacy, codec = bool(reader.legacy), reader.codec
+
+            frame = frames.get((legacy, codec))
+            if frame is None:
+                packets = encoded.get(codec)
+                if packets is None:
+                    packets = encoded[codec] = codec.encode(data)
+
+                frame = frames[legacy, codec] = pack(packets, legacy)
 
-        conn.send(size)
-        conn.send(packets)
+            self._sender.send(conn, frame)
 
     def recieve(self, conn: 'socket.socket') -> Any:
-        """Receive data from a specific client.
+        """Receive data from a specific client. A handshake the client opens its \
+        connection with is answered here, see :mod:`frost.ext.socketio.codec`. \
+        The connection is closed if the client sends a frame larger than \
+        :attr:`frost.ext.socketio.framing.FrameReader.MAX_FRAME_SIZE`.
 
         :param conn: The connected client socket
         :type conn: socket.socket
+        :raises ConnectionError: If the connection is closed
         :return: The data received from the client
         :rtype: Any
         """
-        size = struct.calcsize('L')
-        size = conn.recv(size)
-        size = socket.ntohl(struct.unpack('L', size)[0])
+        try:
+            return self._recieve(conn)
 
-        result = b''
+        except FrameTooLargeError:
+            logger.info(f'Disconnecting {conn.getpeername()}, it sent a frame that is too large')
+            conn.close()
+            raise
 
-        while len(result) < size:
-            result += conn.recv(size - len(result))
+    def _recieve(self, conn: 'socket.socket') -> Any:
+        """Receive data from a specific client, see :meth:`recieve`.
 
-        return json.loads(result)
+        :param conn: The connected client socket
+        :type conn: socket.socket
+        :return: The data received from the client
+        :rtype: Any
+        """
+        reader = self._readers.get(conn)
+
+        if reader is None:
+            reader = self._readers[conn] = FrameReader(legacy=None)
+            data = reader.recieve(conn)
+
+            answer = answer_handshake(data)
+            if answer is None:
+                return data
 
-    @threaded(daemon=True)
-    def _accept_conn(self, conn_data_cls: 'ConnectionData') -> None:
-        """Waits for a connection on a separate thread and accepts them. \
-        Done this way to be able to stop the server.
+            # The answer is encoded before the codec changes
+            reply, codec = answer
+            self.send(conn, reply)
+            reader.codec = codec
 
-        :param conn_data_cls: Where to save the client socket data on accept.
-        :type conn_data_cls: ConnectionData
+        return reader.recieve(conn)
+
+    def _accept_all(self) -> None:
+        """Accepts every pending connection on the listening socket \
+        and hands each one off to :code:`self.func`.
         """
-        conn_data_cls.conn, conn_data_cls.addr = self._socket.accept()
+        while True:
+            try:
+                conn, addr = self._socket.accept()
+            except BlockingIOError:
+                return
+
+            conn.setblocking(True)
+            # Frames are written whole, so there is nothing for Nagle's algorithm to coalesce
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            logger.info(f'Connection established to {addr}')
+
+            if self.func is not None:
+                self.func(conn, addr)
 
     def start(self) -> None:
-        """Starts the threaded, multi-client server.
+        """Starts the threaded, multi-client server. \
+        Blocks until :meth:`stop` is called or the server is interrupted.
         """
         try:
             self._socket.bind((self.ip, self.port))
@@ -99,24 +181,30 @@ class BaseServer:
             print(e)
 
         else:
-            self._socket.listen()
+            self._socket.listen(socket.SOMAXCONN)
+            self._socket.setblocking(False)
+
+            self._sender.limits.update(self.outbound_limits)
+            self._sender.start()
             logger.info('Server is online!')
 
-            run = True
-            while run:
-                conn_data = ConnectionData()
-                self._accept_conn(conn_data)
+            self._running = True
+            with selectors.DefaultSelector() as selector:
+                selector.register(self._socket, selectors.EVENT_READ)
 
-                # Makes the server stoppable
-                while conn_data.conn is None or conn_data.addr is None:
-                    try:
-                        time.sleep(0.1)
-                    except KeyboardInterrupt:
-                        run = False
-                        break
+                try:
+                    while self._running:
+                        # Times out periodically to notice calls to stop()
+                        if selector.select(timeout=self.SELECT_TIMEOUT):
+                            self._accept_all()
 
-                conn, addr = conn_data.conn, conn_data.addr
-                logger.info(f'Connection established to {addr}')
+                except KeyboardInterrupt:
+                    pass
 
-                if self.func is not None:
-                    self.func(conn, addr)
+            self._running = False
+            self._socket.close()
+
+    def stop(self) -> None:
+        """Stops accepting new connections and makes :meth:`start` return.
+        """
+        self._running = False
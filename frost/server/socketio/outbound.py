@@ -0,0 +1,337 @@
+import selectors
+import socket
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Optional, Union
+
+from frost.server.logger import logger
+
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+"""Makes a single send non-blocking on a blocking socket. \
+Not available on every platform, where sends fall back to blocking.
+"""
+
+
+class OutboundQueue:
+    """A bounded queue of frames waiting to be sent to a client. \
+    Once more than :code:`high_water` bytes are queued, the client is congested \
+    until the queue drains to :code:`low_water` bytes or less. \
+    With the :code:`'drop'` policy, frames queued while congested are dropped. \
+    With the :code:`'disconnect'` policy, a client congested for longer than \
+    :code:`timeout` seconds is disconnected.
+
+    :param high_water: The queued bytes above which the client is congested, \
+    defaults to :attr:`OutboundQueue.HIGH_WATER`
+    :type high_water: Optional[int], optional
+    :param low_water: The queued bytes at or below which the client is no longer congested, \
+    defaults to :attr:`OutboundQueue.LOW_WATER`
+    :type low_water: Optional[int], optional
+    :param policy: What to do with a congested client, either :code:`'drop'` \
+    or :code:`'disconnect'`, defaults to :attr:`OutboundQueue.POLICY`
+    :type policy: Optional[str], optional
+    :param timeout: How long in seconds a client may stay congested before being \
+    disconnected, defaults to :attr:`OutboundQueue.TIMEOUT`
+    :type timeout: Optional[float], optional
+    :raises ValueError: If the policy is not one of :attr:`OutboundQueue.POLICIES`
+    """
+
+    POLICIES = ('drop', 'disconnect')
+    """The policies for congested clients.
+    """
+
+    HIGH_WATER: int = 1024 * 1024
+    LOW_WATER: int = 256 * 1024
+    POLICY: str = 'drop'
+    TIMEOUT: float = 10.0
+
+    def __init__(
+        self,
+        high_water: Optional[int] = None,
+        low_water: Optional[int] = None,
+        policy: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> None:
+        """The constructor method.
+        """
+        self.high_water = self.HIGH_WATER if high_water is None else high_water
+        self.low_water = self.LOW_WATER if low_water is None else low_water
+        self.policy = self.POLICY if policy is None else policy
+        self.timeout = self.TIMEOUT if timeout is None else timeout
+
+        if self.policy not in self.POLICIES:
+            raise ValueError(f'Unknown policy "{self.policy}", expected one of {self.POLICIES}')
+
+        self.lock = threading.Lock()
+        """Held while the queue is written to or drained.
+        """
+
+        self.size = 0
+        """The number of bytes queued.
+        """
+        self.dropped = 0
+        """The number of frames dropped while congested.
+        """
+        self.closed = False
+
+        self._frames: Deque[Union[bytes, memoryview]] = deque()
+        self._congested_since: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def congested(self) -> bool:
+        """Whether the client is congested.
+
+        :return: Whether the client is congested
+        :rtype: bool
+        """
+        return self._congested_since is not None
+
+    @property
+    def expired(self) -> bool:
+        """Whether the client should be disconnected for staying congested.
+
+        :return: Whether the client should be disconnected
+        :rtype: bool
+        """
+        return (
+            self.policy == 'disconnect'
+            and self._congested_since is not None
+            and time.monotonic() - self._congested_since > self.timeout
+        )
+
+    def put(self, frame: Union[bytes, memoryview], force: bool = False) -> bool:
+        """Queues a frame to be sent.
+
+        :param frame: The frame to queue
+        :type frame: Union[bytes, memoryview]
+        :param force: Whether to queue the frame even if it would be dropped, \
+        used for the rest of a partially sent frame, defaults to False
+        :type force: bool, optional
+        :return: Whether the frame was queued
+        :rtype: bool
+        """
+        if self.closed:
+            return False
+
+        if self.congested and self.policy == 'drop' and not force:
+            self.dropped += 1
+            return False
+
+        self._frames.append(frame)
+        self.size += len(frame)
+
+        if self.size > self.high_water and self._congested_since is None:
+            self._congested_since = time.monotonic()
+
+        return True
+
+    def peek(self) -> Union[bytes, memoryview]:
+        """Gets the frame, or the rest of the frame, to send next.
+
+        :return: The next frame
+        :rtype: Union[bytes, memoryview]
+        """
+        return self._frames[0]
+
+    def advance(self, sent: int) -> None:
+        """Removes sent bytes from the front of the queue.
+
+        :param sent: The number of bytes sent from the next frame
+        :type sent: int
+        """
+        frame = self._frames[0]
+
+        if sent >= len(frame):
+            self._frames.popleft()
+        else:
+            self._frames[0] = memoryview(frame)[sent:]
+
+        self.size -= sent
+
+        if self.size <= self.low_water:
+            self._congested_since = None
+
+    def close(self) -> None:
+        """Discards all queued frames and stops accepting new ones.
+        """
+        self.closed = True
+        self._frames.clear()
+        self.size = 0
+        self._congested_since = None
+
+
+class Sender:
+    """Drains the outbound queues of many blocking sockets from a single thread, \
+    so a client that stops reading never blocks the thread sending to it. \
+    A frame for an idle client is sent straight away when the socket can take it.
+
+    :param limits: Keyword arguments for every :class:`OutboundQueue`
+    :type limits: Any
+    """
+
+    EVICT_INTERVAL: float = 0.5
+    """How often in seconds congested clients are checked for disconnection.
+    """
+
+    def __init__(self, **limits: Any) -> None:
+        """The constructor method.
+        """
+        self.limits = limits
+
+        self._queues: 'weakref.WeakKeyDictionary[socket.socket, OutboundQueue]' = \
+            weakref.WeakKeyDictionary()
+        self._pending: Deque['socket.socket'] = deque()
+
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._waker.setblocking(False)
+
+        self._thread: Optional[threading.Thread] = None
+
+    def queue(self, conn: 'socket.socket') -> 'OutboundQueue':
+        """Gets the outbound queue of a socket, creating it if needed.
+
+        :param conn: The connected client socket
+        :type conn: socket.socket
+        :return: The socket's outbound queue
+        :rtype: OutboundQueue
+        """
+        queue = self._queues.get(conn)
+
+        if queue is None:
+            queue = self._queues.setdefault(conn, OutboundQueue(**self.limits))
+
+        return queue
+
+    def send(self, conn: 'socket.socket', frame: bytes) -> None:
+        """Queues a frame to be sent to a socket.
+
+        :param conn: The connected client socket
+        :type conn: socket.socket
+        :param frame: The frame to send
+        :type frame: bytes
+        """
+        queue = self.queue(conn)
+
+        with queue.lock:
+            if queue.closed:
+                return
+
+            if queue:
+                queue.put(frame)
+                return
+
+            try:
+                sent = conn.send(frame, MSG_DONTWAIT)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                queue.close()
+                return
+
+            if sent == len(frame) or not queue.put(memoryview(frame)[sent:], force=True):
+                return
+
+        self._pending.append(conn)
+        self._wake()
+
+    def start(self) -> None:
+        """Starts draining queues on a daemon thread.
+        """
+        if self._thread is None:
+            self._selector.register(self._wakeup, selectors.EVENT_READ)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _wake(self) -> None:
+        """Wakes up the draining thread.
+        """
+        try:
+            self._waker.send(b'\0')
+        except BlockingIOError:
+            pass  # Already has a wake up pending
+
+    def _run(self) -> None:
+        """Drains queues as their sockets become writable.
+        """
+        last_evict = time.monotonic()
+
+        while True:
+            for key, _ in self._selector.select(timeout=self.EVICT_INTERVAL):
+                if key.fileobj is self._wakeup:
+                    self._register_pending()
+                else:
+                    self._flush(key.fileobj)
+
+            if time.monotonic() - last_evict > self.EVICT_INTERVAL:
+                self._evict()
+                last_evict = time.monotonic()
+
+    def _register_pending(self) -> None:
+        """Starts watching sockets which have frames left to send.
+        """
+        try:
+            while self._wakeup.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        while self._pending:
+            conn = self._pending.popleft()
+
+            try:
+                self._selector.register(conn, selectors.EVENT_WRITE)
+            except KeyError:
+                pass  # Already registered
+            except ValueError:
+                self.queue(conn).close()  # Closed socket
+
+    def _flush(self, conn: 'socket.socket') -> None:
+        """Sends as much of a socket's queue as it can take without blocking.
+
+        :param conn: The connected client socket
+        :type conn: socket.socket
+        """
+        queue = self.queue(conn)
+
+        with queue.lock:
+            while queue:
+                try:
+                    sent = conn.send(queue.peek(), MSG_DONTWAIT)
+                except BlockingIOError:
+                    return
+                except OSError:
+                    queue.close()
+                    break
+
+                queue.advance(sent)
+
+            self._selector.unregister(conn)
+
+    def _evict(self) -> None:
+        """Disconnects clients which stayed congested for too long.
+        """
+        for key in list(self._selector.get_map().values()):
+            if key.fileobj is self._wakeup:
+                continue
+
+            conn = key.fileobj
+            queue = self.queue(conn)
+
+            with queue.lock:
+                if not queue.expired:
+                    continue
+
+                queue.close()
+                self._selector.unregister(conn)
+
+            try:
+                logger.info(f'Disconnecting {conn.getpeername()}, its outbound queue is congested')
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
@@ -1,5 +1,17 @@
 from frost.server.storage.base import Base
+from frost.server.storage.engines import Engine, FileEngine, JournalEngine
 from frost.server.storage.exceptions import DuplicateValueError
+from frost.server.storage.mapped import MappedEngine
 from frost.server.storage.models import Message, Room, User
 
-__all__ = ('Base', 'User', 'Room', 'Message', 'DuplicateValueError')
+__all__ = (
+    'Base',
+    'User',
+    'Room',
+    'Message',
+    'DuplicateValueError',
+    'Engine',
+    'FileEngine',
+    'JournalEngine',
+    'MappedEngine'
+)
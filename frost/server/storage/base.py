@@ -1,11 +1,27 @@
-import json
-from typing import Any, Dict, Optional
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from frost.server.storage.engines import Engine, JournalEngine
 from frost.server.storage.exceptions import DuplicateValueError
+from frost.server.storage.transaction import Transaction
+
+_local = threading.local()
 
 
 class Base:
-    """The base model for data storage.
+    """The base model for data storage. The data is held by :attr:`Base.engine`.
+    """
+
+    __indexes__: Tuple[str, ...] = ()
+    """The fields :meth:`Base.find_by` looks up through the engine's indexes, \
+    such as :class:`frost.server.storage.base.Unique` fields. \
+    Other fields are found by scanning the table.
+    """
+
+    engine: Engine = JournalEngine()
+    """The storage engine holding every table, \
+    see :mod:`frost.server.storage.engines`.
     """
 
     @classmethod
@@ -19,6 +35,33 @@ class Base:
         """
         return Base._get_table(cls).get(item)
 
+    @classmethod
+    def find_by(cls, **fields: Any) -> Dict[str, Any]:
+        """Finds the entries with every given field set to the given value, \
+        such as :code:`User.find_by(username='Den4200')`.
+
+        :param fields: The fields to match and their values
+        :type fields: Any
+        :return: The matching entries under their IDs
+        :rtype: Dict[str, Any]
+        """
+        table_name = Base._get_table_name(cls)
+        entries = Base._get_table(cls)
+        ids = None
+
+        for field, value in fields.items():
+            if field in cls.__indexes__:
+                found = set(Base._find(table_name, field, value))
+                ids = found if ids is None else ids & found
+
+        if ids is None:
+            ids = (id_ for id_ in entries if id_ != 'meta')
+
+        return {
+            id_: entries[id_] for id_ in ids
+            if all(entries[id_].get(field) == value for field, value in fields.items())
+        }
+
     @classmethod
     def add(cls, item: Any) -> str:
         """Adds an item under the given specific table.
@@ -49,6 +92,22 @@ class Base:
 
         return str(id_)
 
+    @classmethod
+    def add_many(cls, items: Iterable[Any]) -> List[str]:
+        """Adds many items under the given specific table in a single \
+        :meth:`Base.transaction`, so either all of them are saved or none of them are.
+
+        :param items: The items to add
+        :type items: Iterable[Any]
+        :raises KeyError: If an item under a given ID already exists
+        :raises DuplicateValueError: If a unique value of an item already exists, \
+        including in an earlier item
+        :return: The IDs of the given items stored under the given table.
+        :rtype: List[str]
+        """
+        with Base.transaction():
+            return [cls.add(item) for item in items]
+
     @classmethod
     def update(cls, item: Any) -> None:
         """Updates the given item's data. \
@@ -79,37 +138,90 @@ class Base:
         id_ = str(Base._get_id(contents, table_name, data))
         commit_data = dict()
 
-        commit = True
         for k, v in data.items():
 
             if k != 'id':
 
                 if isinstance(v, Unique):
-                    items = contents[table_name].items()
+                    if any(key != id_ for key in Base._find(table_name, k, v.data)):
+                        raise DuplicateValueError(
+                            f'{v.data} already exists in {k}'
+                        )
 
-                    for key, val in items:
+                    commit_data[k] = v.data
 
-                        if key != 'meta':
+                else:
+                    commit_data[k] = v
 
-                            if val[k] == str(v.data) and key != id_:
-                                commit = False
-                                raise DuplicateValueError(
-                                    f'{v.data} already exists in {k}'
-                                )
+        transaction = Base._transaction()
 
-                        else:
-                            commit_data[k] = v.data
+        if transaction is not None:
+            transaction.put(table_name, id_, commit_data)
+        else:
+            Base.engine.put(table_name, id_, commit_data)
 
-                else:
-                    commit_data[k] = v
+    @staticmethod
+    @contextmanager
+    def transaction() -> Iterator[None]:
+        """Stages the items added and updated by the current thread within \
+        the :code:`with` block, then saves all of them at once when it ends, \
+        so either all of them are saved or none of them are. Nothing is saved \
+        if the block raises. Lookups within the block see the staged items and \
+        unique values are checked against them. A transaction within another \
+        one is part of the outer one.
+
+        Usage::
+
+            with Base.transaction():
+                User.add(User('Den4200', password))
+                Room.add(Room('General', owner_id))
+        """
+        if Base._transaction() is not None:
+            yield
+            return
+
+        _local.transaction = Transaction(Base.engine.data())
+
+        try:
+            yield
+            rows = _local.transaction.rows()
+
+        finally:
+            _local.transaction = None
+
+        if rows:
+            Base.engine.put_many(rows)
+
+    @staticmethod
+    def _transaction() -> Optional[Transaction]:
+        """Gets the current thread's transaction.
+
+        :return: The transaction, or None if the thread is not in one
+        :rtype: Optional[Transaction]
+        """
+        return getattr(_local, 'transaction', None)
 
-        if commit:
-            contents[table_name][id_] = commit_data
-            contents[table_name]['meta']['last_id'] = str(len(
-                contents[table_name]
-            ) - 1)
+    @staticmethod
+    def _find(table_name: str, field: str, value: Any) -> List[str]:
+        """Finds the entries of a table with a field set to a value, \
+        including the entries staged by the current thread's transaction.
+
+        :param table_name: The name of the table
+        :type table_name: str
+        :param field: The field to match
+        :type field: str
+        :param value: The value of the field
+        :type value: Any
+        :return: The IDs of the matching entries
+        :rtype: List[str]
+        """
+        found = Base.engine.find(table_name, field, value)
+        transaction = Base._transaction()
+
+        if transaction is not None:
+            return transaction.find(table_name, field, value, found)
 
-            Base.commit(contents)
+        return found
 
     @staticmethod
     def _get_id(contents, table_name, data):
@@ -141,8 +253,13 @@ class Base:
         :return: The entries under the specified table
         :rtype: Dict[str, Any]
         """
-        contents = Base.data()
-        table = contents.get(Base._get_table_name(cls))
+        transaction = Base._transaction()
+        table_name = Base._get_table_name(cls)
+
+        if transaction is not None:
+            table = transaction.table(table_name)
+        else:
+            table = Base.engine.table(table_name)
 
         if table is not None:
             return table
@@ -151,23 +268,27 @@ class Base:
 
     @staticmethod
     def commit(data: Dict[str, Any]) -> None:
-        """Commits and saves the data.
+        """Commits and saves all of the data, replacing the saved data.
 
         :param data: The data to be saved
         :type data: Dict[str, Any]
         """
-        with open('storage.json', 'w') as f:
-            json.dump(data, f, indent=2)
+        Base.engine.replace(data)
 
     @staticmethod
     def data() -> Dict[str, Any]:
         """Gets the contents of the saved data.
 
-        :return: The contents of the saved data
+        :return: The contents of the saved data, with the items staged by \
+        the current thread's transaction
         :rtype: Dict[str, Any]
         """
-        with open('storage.json') as f:
-            return json.load(f)
+        transaction = Base._transaction()
+
+        if transaction is not None:
+            return transaction.data()
+
+        return Base.engine.data()
 
     @classmethod
     def entries(cls) -> Dict[str, Any]:
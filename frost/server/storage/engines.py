@@ -0,0 +1,454 @@
+import copy
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple
+
+from frost.server.logger import logger
+from frost.server.storage.defaults import DEFAULT_FORMAT
+
+
+class Engine:
+    """The interface of a storage engine, which holds the tables of \
+    :class:`frost.server.storage.base.Base`. Subclass it and assign an instance \
+    to :attr:`frost.server.storage.base.Base.engine` to change how data is stored.
+    """
+
+    def data(self) -> Dict[str, Any]:
+        """Gets the contents of the saved data.
+
+        :return: The contents of the saved data
+        :rtype: Dict[str, Any]
+        """
+        raise NotImplementedError
+
+    def table(self, name: str) -> Optional[Dict[str, Any]]:
+        """Gets the entries under a table.
+
+        :param name: The name of the table
+        :type name: str
+        :return: The entries under the table, or None if it does not exist
+        :rtype: Optional[Dict[str, Any]]
+        """
+        return self.data().get(name)
+
+    def find(self, table: str, field: str, value: Any) -> List[str]:
+        """Finds the entries of a table with a field set to a value. \
+        Scans the whole table, engines which keep indexes override it.
+
+        :param table: The name of the table
+        :type table: str
+        :param field: The field to match
+        :type field: str
+        :param value: The value of the field
+        :type value: Any
+        :return: The IDs of the matching entries
+        :rtype: List[str]
+        """
+        key = index_key(value)
+
+        return [
+            id_ for id_, record in self.table(table).items()
+            if id_ != 'meta' and index_key(record.get(field)) == key
+        ]
+
+    def put(self, table: str, id_: str, record: Dict[str, Any]) -> None:
+        """Saves an entry, replacing the entry with the same ID, and updates \
+        the table's :code:`last_id`.
+
+        :param table: The name of the table
+        :type table: str
+        :param id_: The ID of the entry
+        :type id_: str
+        :param record: The entry's data
+        :type record: Dict[str, Any]
+        """
+        raise NotImplementedError
+
+    def put_many(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Saves many entries together, so an interrupted engine saves either \
+        all of them or none of them. Puts them one by one by default, \
+        engines which can save them together override it.
+
+        :param rows: The table, ID and data of each entry
+        :type rows: Iterable[Tuple[str, str, Dict[str, Any]]]
+        """
+        for table, id_, record in rows:
+            self.put(table, id_, record)
+
+    def replace(self, data: Dict[str, Any]) -> None:
+        """Saves all of the data, replacing the saved data.
+
+        :param data: The data to be saved
+        :type data: Dict[str, Any]
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Releases the engine's resources, saving anything not saved yet.
+        """
+
+
+def index_key(value: Any) -> Hashable:
+    """Gets the key a value is indexed under. Strings are their own key, \
+    other values are keyed by their JSON, so lists and dicts can be indexed too.
+
+    :param value: The value
+    :type value: Any
+    :return: The key of the value
+    :rtype: Hashable
+    """
+    if isinstance(value, str):
+        return value
+
+    return ('json', json.dumps(value, sort_keys=True, default=str))
+
+
+class Indexes:
+    """Hash indexes of the fields of tables, each built the first time its field \
+    is looked up and kept up to date as entries change. Used by the engines, \
+    which hold their own lock around it.
+    """
+
+    def __init__(self) -> None:
+        """The constructor method.
+        """
+        self._tables: Dict[str, Dict[str, Dict[Hashable, Set[str]]]] = dict()
+
+    def find(self, entries: Mapping[str, Any], table: str, field: str, value: Any) -> List[str]:
+        """Finds the entries of a table with a field set to a value, \
+        indexing the field first if it is not indexed yet.
+
+        :param entries: The entries under the table
+        :type entries: Mapping[str, Any]
+        :param table: The name of the table
+        :type table: str
+        :param field: The field to match
+        :type field: str
+        :param value: The value of the field
+        :type value: Any
+        :return: The IDs of the matching entries
+        :rtype: List[str]
+        """
+        fields = self._tables.setdefault(table, dict())
+        index = fields.get(field)
+
+        if index is None:
+            index = fields[field] = dict()
+
+            for id_, record in entries.items():
+                if id_ != 'meta':
+                    index.setdefault(index_key(record.get(field)), set()).add(id_)
+
+        return list(index.get(index_key(value), ()))
+
+    def indexed(self, table: str) -> bool:
+        """Checks whether any field of a table is indexed.
+
+        :param table: The name of the table
+        :type table: str
+        :return: Whether any field of the table is indexed
+        :rtype: bool
+        """
+        return bool(self._tables.get(table))
+
+    def update(
+        self,
+        table: str,
+        id_: str,
+        old: Optional[Dict[str, Any]],
+        record: Dict[str, Any]
+    ) -> None:
+        """Moves an entry to the keys of its new values in the table's indexes.
+
+        :param table: The name of the table
+        :type table: str
+        :param id_: The ID of the entry
+        :type id_: str
+        :param old: The entry's previous data, or None if it is new
+        :type old: Optional[Dict[str, Any]]
+        :param record: The entry's new data
+        :type record: Dict[str, Any]
+        """
+        for field, index in self._tables.get(table, dict()).items():
+            if old is not None:
+                key = index_key(old.get(field))
+                ids = index.get(key)
+
+                if ids is not None:
+                    ids.discard(id_)
+                    if not ids:
+                        del index[key]
+
+            index.setdefault(index_key(record.get(field)), set()).add(id_)
+
+    def clear(self) -> None:
+        """Drops every index.
+        """
+        self._tables = dict()
+
+
+def _set(contents: Dict[str, Any], table: str, id_: str, record: Dict[str, Any]) -> None:
+    """Sets an entry in a table, updating the table's :code:`last_id`.
+    """
+    entries = contents[table]
+    entries[id_] = record
+    entries['meta']['last_id'] = str(len(entries) - 1)
+
+
+def sync_dir(path: str) -> None:
+    """Syncs the directory of a file, so a rename onto the file survives a crash. \
+    Skipped on platforms which cannot open a directory.
+
+    :param path: The path of the file
+    :type path: str
+    """
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class FileEngine(Engine):
+    """Stores the data as a single JSON file, which is read again for every lookup \
+    and written again for every change. Slow, but always reflects the file, \
+    even if it is changed by another process.
+
+    :param path: The path of the file, defaults to 'storage.json'
+    :type path: str, optional
+    """
+
+    def __init__(self, path: str = 'storage.json') -> None:
+        """The constructor method.
+        """
+        self.path = path
+
+    def data(self) -> Dict[str, Any]:
+        with open(self.path) as f:
+            return json.load(f)
+
+    def put(self, table: str, id_: str, record: Dict[str, Any]) -> None:
+        self.put_many([(table, id_, record)])
+
+    def put_many(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        contents = self.data()
+
+        for table, id_, record in rows:
+            _set(contents, table, id_, record)
+
+        self.replace(contents)
+
+    def replace(self, data: Dict[str, Any]) -> None:
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+class JournalEngine(Engine):
+    """Keeps the tables in memory, loaded once from a snapshot and a journal. \
+    Every change is appended to the journal as a single line, so its cost does not \
+    depend on the size of the tables. Entries saved together with \
+    :meth:`JournalEngine.put_many` share a line. Once the journal grows larger than \
+    :code:`compact_ratio` times the snapshot, the tables are compacted into a new \
+    snapshot, which is written to a temporary file, synced to disk and renamed over \
+    the old one before the journal is emptied. A crash at any point leaves \
+    a snapshot and a journal which together hold every change written, \
+    apart from a line torn by the crash, which is discarded when loading. \
+    Lookups return the engine's own data, which must be changed through \
+    :class:`frost.server.storage.base.Base` rather than directly. \
+    A hash index is built for each field :meth:`JournalEngine.find` is used on \
+    and kept up to date by every change, so later lookups take constant time.
+
+    :param path: The path of the snapshot, defaults to 'storage.json'
+    :type path: str, optional
+    :param journal: The path of the journal, defaults to :code:`path` \
+    followed by :code:`'.journal'`
+    :type journal: Optional[str], optional
+    :param fsync: Whether to sync the journal to disk after every change, so changes \
+    survive the machine crashing as well as the process, defaults to False
+    :type fsync: bool, optional
+    :param compact_ratio: How many times larger than the snapshot the journal grows \
+    before it is compacted, defaults to :attr:`JournalEngine.COMPACT_RATIO`
+    :type compact_ratio: Optional[float], optional
+    """
+
+    COMPACT_RATIO: float = 1.0
+    MIN_COMPACT_SIZE: int = 64 * 1024
+    """The size in bytes the journal may always grow to before being compacted.
+    """
+
+    def __init__(
+        self,
+        path: str = 'storage.json',
+        journal: Optional[str] = None,
+        fsync: bool = False,
+        compact_ratio: Optional[float] = None
+    ) -> None:
+        """The constructor method.
+        """
+        self.path = path
+        self.journal = path + '.journal' if journal is None else journal
+        self.fsync = fsync
+        self.compact_ratio = self.COMPACT_RATIO if compact_ratio is None else compact_ratio
+
+        self.compactions = 0
+        """The number of times the journal was compacted.
+        """
+
+        self._data: Optional[Dict[str, Any]] = None
+        self._indexes = Indexes()
+        self._file: Optional[BinaryIO] = None
+        self._snapshot_size = 0
+        self._journal_size = 0
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, Any]:
+        """Loads the snapshot and replays the journal on top of it, the first time \
+        the data is needed.
+
+        :return: The contents of the saved data
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            if self._data is not None:
+                return self._data
+
+            try:
+                with open(self.path, 'rb') as f:
+                    snapshot = f.read()
+            except FileNotFoundError:
+                data = copy.deepcopy(DEFAULT_FORMAT)
+            else:
+                data = json.loads(snapshot)
+                self._snapshot_size = len(snapshot)
+
+            valid = 0
+
+            try:
+                with open(self.journal, 'rb') as f:
+                    for line in f:
+                        try:
+                            if not line.endswith(b'\n'):
+                                raise ValueError('Unterminated line')
+
+                            change = json.loads(line)
+
+                            # Entries saved together are a list of changes on a single line
+                            changes = change if change and isinstance(change[0], list) \
+                                else [change]
+                            changes = [(table, id_, record) for table, id_, record in changes]
+
+                        except (ValueError, TypeError, KeyError):
+                            logger.warning(
+                                f'Discarding a torn change at byte {valid} of {self.journal}'
+                            )
+                            break
+
+                        for table, id_, record in changes:
+                            _set(data, table, id_, record)
+
+                        valid += len(line)
+
+            except FileNotFoundError:
+                pass
+
+            self._file = open(self.journal, 'ab')
+            self._file.truncate(valid)
+            self._journal_size = valid
+
+            self._data = data
+            return data
+
+    def data(self) -> Dict[str, Any]:
+        return self._data if self._data is not None else self._load()
+
+    def table(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.data().get(name)
+
+    def find(self, table: str, field: str, value: Any) -> List[str]:
+        data = self.data()
+
+        with self._lock:
+            return self._indexes.find(data[table], table, field, value)
+
+    def put(self, table: str, id_: str, record: Dict[str, Any]) -> None:
+        self.put_many([(table, id_, record)])
+
+    def put_many(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        rows = [[table, id_, record] for table, id_, record in rows]
+
+        if not rows:
+            return
+
+        data = self.data()
+        change = rows[0] if len(rows) == 1 else rows
+        line = json.dumps(change, separators=(',', ':')).encode('utf-8') + b'\n'
+
+        with self._lock:
+            for table, id_, record in rows:
+                self._indexes.update(table, id_, data[table].get(id_), record)
+                _set(data, table, id_, record)
+
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+            self._journal_size += len(line)
+
+            limit = max(self.MIN_COMPACT_SIZE, self._snapshot_size * self.compact_ratio)
+            if self._journal_size > limit:
+                self.compact()
+
+    def replace(self, data: Dict[str, Any]) -> None:
+        self.data()
+
+        with self._lock:
+            self._data = data
+            self._indexes.clear()
+            self.compact()
+
+    def compact(self) -> None:
+        """Writes the tables to a new snapshot and empties the journal.
+        """
+        data = self.data()
+        tmp = self.path + '.tmp'
+
+        with self._lock:
+            snapshot = json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+            with open(tmp, 'wb') as f:
+                f.write(snapshot)
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(tmp, self.path)
+            sync_dir(self.path)
+
+            # The journal is only emptied once the snapshot holding its changes is in place
+            self._file.truncate(0)
+
+            self._snapshot_size = len(snapshot)
+            self._journal_size = 0
+            self.compactions += 1
+
+    def close(self) -> None:
+        """Compacts the journal and closes it. The data is loaded again if it is needed.
+        """
+        with self._lock:
+            if self._data is None:
+                return
+
+            if self._journal_size:
+                self.compact()
+
+            self._file.close()
+            self._file = None
+            self._data = None
+            self._indexes.clear()
@@ -0,0 +1,453 @@
+import json
+import mmap
+import os
+import threading
+from array import array
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from frost.server.logger import logger
+from frost.server.storage.defaults import DEFAULT_FORMAT
+from frost.server.storage.engines import Engine, Indexes, sync_dir
+
+
+def _prefix(table: str, id_: str) -> bytes:
+    """Gets the start of a row's line, its table and ID followed by tabs. \
+    Tabs are escaped inside JSON strings, so the first two tabs of a line \
+    always end its table and ID.
+    """
+    return f'{json.dumps(table)}\t{json.dumps(id_)}\t'.encode('utf-8')
+
+
+class MappedTable(Mapping):
+    """The entries of a table of a :class:`MappedEngine`. Only the offset \
+    of each entry in the engine's file is kept, the entry is decoded every time \
+    it is read. Entries with a numeric ID take 8 bytes of memory each. \
+    The table's :code:`meta` holds its number of entries as :code:`last_id`.
+
+    :param engine: The engine holding the table
+    :type engine: MappedEngine
+    """
+
+    def __init__(self, engine: 'MappedEngine') -> None:
+        """The constructor method.
+        """
+        self._engine = engine
+        self._numeric = array('q')
+        self._other: Dict[str, int] = dict()
+        self._count = 0
+
+    def offset(self, id_: Any) -> int:
+        """Gets the offset of an entry's data in the engine's file.
+
+        :param id_: The ID of the entry
+        :type id_: Any
+        :return: The offset, or -1 if the table has no entry with the ID
+        :rtype: int
+        """
+        if not isinstance(id_, str):
+            return -1
+
+        if id_.isascii() and id_.isdigit():
+            index = int(id_)
+
+            if index < len(self._numeric) and str(index) == id_:
+                offset = self._numeric[index]
+                if offset >= 0:
+                    return offset
+
+        return self._other.get(id_, -1)
+
+    def set_offset(self, id_: str, offset: int) -> None:
+        """Sets the offset of an entry's data in the engine's file.
+
+        :param id_: The ID of the entry
+        :type id_: str
+        :param offset: The offset
+        :type offset: int
+        """
+        if self.offset(id_) < 0:
+            self._count += 1
+
+        if id_.isascii() and id_.isdigit() and str(int(id_)) == id_:
+            index = int(id_)
+            size = len(self._numeric)
+
+            # IDs far beyond the others would leave large holes in the array
+            if size <= index <= size * 2 + 1024:
+                self._numeric.extend(array('q', [-1]) * (index - size + 1))
+
+            if index < len(self._numeric):
+                self._other.pop(id_, None)
+                self._numeric[index] = offset
+                return
+
+        self._other[id_] = offset
+
+    def __getitem__(self, id_: Any) -> Any:
+        if id_ == 'meta':
+            return {'last_id': str(self._count)}
+
+        offset = self.offset(id_)
+
+        if offset < 0:
+            raise KeyError(id_)
+
+        return self._engine.read(offset)
+
+    def __contains__(self, id_: Any) -> bool:
+        return id_ == 'meta' or self.offset(id_) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        yield 'meta'
+
+        for index, offset in enumerate(self._numeric):
+            if offset >= 0:
+                yield str(index)
+
+        yield from list(self._other)
+
+    def __len__(self) -> int:
+        return self._count + 1
+
+
+class MappedEngine(Engine):
+    """Stores every entry as a line of the file, holding its table, its ID and its data, \
+    which is memory mapped and read through an index of where each entry is. \
+    Entries are only decoded when they are read, so memory use stays flat as tables \
+    grow to millions of entries. Every change is appended to the file, \
+    replacing the entry's earlier line. Entries saved together with \
+    :meth:`MappedEngine.put_many` follow a line holding their number. \
+    Once the replaced lines outnumber :code:`compact_ratio` times the entries, \
+    the lines still in use are copied to a temporary file, which is synced to disk \
+    and renamed over the old one. A line torn by a crash is discarded when loading. Tables are \
+    :class:`MappedTable` mappings rather than dicts and are changed through \
+    :class:`frost.server.storage.base.Base`.
+
+    :param path: The path of the file, defaults to 'storage.jsonl'
+    :type path: str, optional
+    :param fsync: Whether to sync the file to disk after every change, so changes \
+    survive the machine crashing as well as the process, defaults to False
+    :type fsync: bool, optional
+    :param compact_ratio: How many replaced lines to allow for each entry before \
+    the file is compacted, defaults to :attr:`MappedEngine.COMPACT_RATIO`
+    :type compact_ratio: Optional[float], optional
+    """
+
+    COMPACT_RATIO: float = 1.0
+    MIN_COMPACT_LINES: int = 1024
+    """The number of replaced lines the file may always hold before being compacted.
+    """
+
+    def __init__(
+        self,
+        path: str = 'storage.jsonl',
+        fsync: bool = False,
+        compact_ratio: Optional[float] = None
+    ) -> None:
+        """The constructor method.
+        """
+        self.path = path
+        self.fsync = fsync
+        self.compact_ratio = self.COMPACT_RATIO if compact_ratio is None else compact_ratio
+
+        self.compactions = 0
+        """The number of times the file was compacted.
+        """
+
+        self._tables: Optional[Dict[str, MappedTable]] = None
+        self._indexes = Indexes()
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._size = 0
+        self._lines = 0
+        self._lock = threading.RLock()
+
+    def _new_tables(self, names: Iterable[str]) -> Dict[str, MappedTable]:
+        """Creates empty tables.
+
+        :param names: The names of the tables
+        :type names: Iterable[str]
+        :return: The tables under their names
+        :rtype: Dict[str, MappedTable]
+        """
+        return {name: MappedTable(self) for name in names}
+
+    def _load(self) -> Dict[str, MappedTable]:
+        """Indexes the file, the first time the data is needed. \
+        Only the table and ID of each line are decoded.
+
+        :return: The tables under their names
+        :rtype: Dict[str, MappedTable]
+        """
+        with self._lock:
+            if self._tables is not None:
+                return self._tables
+
+            tables = self._new_tables(DEFAULT_FORMAT)
+            valid = 0
+            lines = 0
+
+            # The entries of a batch saved together, kept until all of them are read
+            pending: List[Tuple[str, str, int]] = list()
+            remaining = 0
+            start = 0
+
+            try:
+                with open(self.path, 'rb') as f:
+                    for line in f:
+                        try:
+                            if not line.endswith(b'\n'):
+                                raise ValueError('Unterminated line')
+
+                            table, id_, _ = line.split(b'\t', 2)
+                            offset = valid + len(table) + len(id_) + 2
+                            table, id_ = json.loads(table), json.loads(id_)
+
+                            if table is None and (remaining or not isinstance(id_, int)):
+                                raise ValueError('Malformed batch')
+
+                        except ValueError:
+                            logger.warning(
+                                f'Discarding a torn change at byte {valid} of {self.path}'
+                            )
+                            break
+
+                        if table is None:
+                            start, remaining = valid, id_
+
+                        else:
+                            pending.append((table, id_, offset))
+                            remaining = max(remaining - 1, 0)
+
+                            if not remaining:
+                                for table, id_, offset in pending:
+                                    if table not in tables:
+                                        tables[table] = MappedTable(self)
+
+                                    tables[table].set_offset(id_, offset)
+
+                                pending = list()
+
+                        valid += len(line)
+                        lines += 1
+
+            except FileNotFoundError:
+                pass
+
+            if remaining:
+                logger.warning(
+                    f'Discarding an unfinished batch of changes at byte {start} of {self.path}'
+                )
+                valid = start
+                lines -= len(pending) + 1
+
+            self._open(valid)
+            self._lines = lines
+
+            self._tables = tables
+            return tables
+
+    def _open(self, size: int) -> None:
+        """Opens the file for appending, cutting it to the given size, and maps it.
+
+        :param size: The size of the valid lines of the file
+        :type size: int
+        """
+        # Appending, but readable so it can be mapped
+        self._file = open(self.path, 'a+b')
+        self._file.truncate(size)
+        self._size = size
+        self._remap()
+
+    def _remap(self) -> None:
+        """Maps the whole file, after lines were appended to it.
+        """
+        if self._map is not None:
+            self._map.close()
+
+        # An empty file cannot be mapped
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if self._size else None
+
+    def read(self, offset: int) -> Any:
+        """Decodes the data of an entry.
+
+        :param offset: The offset of the entry's data in the file
+        :type offset: int
+        :return: The entry's data
+        :rtype: Any
+        """
+        with self._lock:
+            end = self._map.find(b'\n', offset) if self._map is not None else -1
+
+            if end < 0:
+                self._remap()
+                end = self._map.find(b'\n', offset)
+
+            return json.loads(self._map[offset:end])
+
+    def data(self) -> Dict[str, Any]:
+        return self._tables if self._tables is not None else self._load()
+
+    def table(self, name: str) -> Optional[MappedTable]:
+        return self.data().get(name)
+
+    def find(self, table: str, field: str, value: Any) -> List[str]:
+        tables = self.data()
+
+        with self._lock:
+            return self._indexes.find(tables[table], table, field, value)
+
+    def put(self, table: str, id_: str, record: Dict[str, Any]) -> None:
+        self.put_many([(table, id_, record)])
+
+    def put_many(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        rows = list(rows)
+
+        if not rows:
+            return
+
+        tables = self.data()
+        encoded = [
+            (_prefix(table, id_), json.dumps(record, separators=(',', ':')).encode('utf-8'))
+            for table, id_, record in rows
+        ]
+
+        # Entries saved together follow a line holding their number,
+        # so they are discarded together if the file ends before all of them
+        marker = f'null\t{len(rows)}\t\n'.encode('utf-8') if len(rows) > 1 else b''
+
+        with self._lock:
+            buffer = bytearray(marker)
+            offsets = list()
+
+            for prefix, record in encoded:
+                offsets.append(self._size + len(buffer) + len(prefix))
+                buffer += prefix + record + b'\n'
+
+            self._file.write(buffer)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+            self._size += len(buffer)
+            self._lines += len(rows) + bool(marker)
+
+            for (table, id_, record), offset in zip(rows, offsets):
+                if table not in tables:
+                    tables[table] = MappedTable(self)
+
+                entries = tables[table]
+
+                if self._indexes.indexed(table):
+                    self._indexes.update(table, id_, entries.get(id_), record)
+
+                entries.set_offset(id_, offset)
+
+            replaced = self._replaced()
+            limit = max(self.MIN_COMPACT_LINES, (self._lines - replaced) * self.compact_ratio)
+            if replaced > limit:
+                self.compact()
+
+    def _replaced(self) -> int:
+        """Counts the lines of the file which were replaced by a later change.
+
+        :return: The number of replaced lines
+        :rtype: int
+        """
+        return self._lines - sum(len(entries) - 1 for entries in self._tables.values())
+
+    def replace(self, data: Dict[str, Any]) -> None:
+        self.data()
+
+        def rows() -> Iterator[Tuple[str, str, bytes]]:
+            for table, entries in data.items():
+                for id_, record in entries.items():
+                    if id_ != 'meta':
+                        record = json.dumps(record, separators=(',', ':'))
+                        yield table, id_, record.encode('utf-8')
+
+        with self._lock:
+            self._rewrite(list(data), rows())
+            self._indexes.clear()
+
+    def compact(self) -> None:
+        """Copies the lines still in use to a new file, dropping the replaced ones. \
+        The entries are not decoded.
+        """
+        tables = self.data()
+
+        def rows() -> Iterator[Tuple[str, str, bytes]]:
+            for table, entries in tables.items():
+                for id_ in entries:
+                    if id_ != 'meta':
+                        offset = entries.offset(id_)
+                        yield table, id_, self._map[offset:self._map.find(b'\n', offset)]
+
+        with self._lock:
+            self._remap()
+            self._rewrite(list(tables), rows())
+
+    def _rewrite(self, names: List[str], rows: Iterable[Tuple[str, str, bytes]]) -> None:
+        """Writes the rows to a temporary file, syncs it to disk and renames it over \
+        the file, then maps the new file.
+
+        :param names: The names of the tables
+        :type names: List[str]
+        :param rows: The table, ID and encoded data of each entry
+        :type rows: Iterable[Tuple[str, str, bytes]]
+        """
+        tmp = self.path + '.tmp'
+        tables = self._new_tables(names)
+        size = 0
+        lines = 0
+
+        with open(tmp, 'wb') as f:
+            for table, id_, record in rows:
+                prefix = _prefix(table, id_)
+
+                if table not in tables:
+                    tables[table] = MappedTable(self)
+
+                tables[table].set_offset(id_, size + len(prefix))
+                f.write(prefix + record + b'\n')
+                size += len(prefix) + len(record) + 1
+                lines += 1
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._close_file()
+        os.replace(tmp, self.path)
+        sync_dir(self.path)
+
+        self._open(size)
+        self._lines = lines
+        self._tables = tables
+        self.compactions += 1
+
+    def _close_file(self) -> None:
+        """Unmaps and closes the file.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        """Compacts the file if it holds replaced lines and closes it. \
+        The file is indexed again if the data is needed.
+        """
+        with self._lock:
+            if self._tables is None:
+                return
+
+            if self._replaced():
+                self.compact()
+
+            self._close_file()
+            self._tables = None
+            self._indexes.clear()
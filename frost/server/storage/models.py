@@ -16,6 +16,7 @@ class User(Base):
     :type token: str, optional
     """
     __tablename__ = 'users'
+    __indexes__ = ('username', 'token')
 
     def __init__(
         self,
@@ -45,6 +46,7 @@ class Room(Base):
     :type members: list, optional
     """
     __tablename__ = 'rooms'
+    __indexes__ = ('name', 'owner_id')
 
     def __init__(
         self,
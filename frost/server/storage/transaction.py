@@ -0,0 +1,144 @@
+from typing import Any, Dict, Iterator, List, Mapping, Tuple
+
+from frost.server.storage.engines import Indexes
+
+
+class StagedTable(Mapping):
+    """The entries of a table as seen inside a :class:`Transaction`, \
+    the saved entries with the transaction's changes on top of them.
+
+    :param entries: The saved entries under the table
+    :type entries: Mapping[str, Any]
+    :param staged: The entries changed by the transaction
+    :type staged: Dict[str, Any]
+    :param added: The number of entries the transaction added, in a list \
+    so it is shared with the transaction
+    :type added: List[int]
+    """
+
+    def __init__(
+        self,
+        entries: Mapping[str, Any],
+        staged: Dict[str, Any],
+        added: List[int]
+    ) -> None:
+        """The constructor method.
+        """
+        self._entries = entries
+        self._staged = staged
+        self._added = added
+
+    def __getitem__(self, id_: Any) -> Any:
+        if id_ == 'meta':
+            last_id = int(self._entries['meta']['last_id']) + self._added[0]
+            return {'last_id': str(last_id)}
+
+        if id_ in self._staged:
+            return self._staged[id_]
+
+        return self._entries[id_]
+
+    def __contains__(self, id_: Any) -> bool:
+        return id_ in self._staged or id_ in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._entries
+        yield from (id_ for id_ in list(self._staged) if id_ not in self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries) + self._added[0]
+
+
+class Transaction:
+    """Changes staged by :meth:`frost.server.storage.base.Base.transaction`, \
+    which are saved together once it ends.
+
+    :param contents: The saved data when the transaction began
+    :type contents: Dict[str, Any]
+    """
+
+    def __init__(self, contents: Dict[str, Any]) -> None:
+        """The constructor method.
+        """
+        self._contents = contents
+        self._staged: Dict[str, Dict[str, Any]] = dict()
+        self._added: Dict[str, List[int]] = dict()
+        self._indexes = Indexes()
+
+    def table(self, name: str) -> Any:
+        """Gets the entries under a table, with the staged changes.
+
+        :param name: The name of the table
+        :type name: str
+        :return: The entries under the table, or None if it does not exist
+        :rtype: Any
+        """
+        entries = self._contents.get(name)
+
+        if entries is None:
+            return None
+
+        return StagedTable(
+            entries,
+            self._staged.setdefault(name, dict()),
+            self._added.setdefault(name, [0])
+        )
+
+    def data(self) -> Dict[str, Any]:
+        """Gets the contents of the saved data, with the staged changes.
+
+        :return: The contents of the data
+        :rtype: Dict[str, Any]
+        """
+        return {name: self.table(name) for name in self._contents}
+
+    def find(self, table: str, field: str, value: Any, saved: List[str]) -> List[str]:
+        """Finds the entries of a table with a field set to a value, \
+        with the staged changes.
+
+        :param table: The name of the table
+        :type table: str
+        :param field: The field to match
+        :type field: str
+        :param value: The value of the field
+        :type value: Any
+        :param saved: The IDs of the saved entries which match
+        :type saved: List[str]
+        :return: The IDs of the matching entries
+        :rtype: List[str]
+        """
+        staged = self._staged.get(table, dict())
+
+        # Staged entries are matched against their staged data only
+        found = [id_ for id_ in saved if id_ not in staged]
+        return found + self._indexes.find(staged, table, field, value)
+
+    def put(self, table: str, id_: str, record: Dict[str, Any]) -> None:
+        """Stages an entry, replacing the entry with the same ID.
+
+        :param table: The name of the table
+        :type table: str
+        :param id_: The ID of the entry
+        :type id_: str
+        :param record: The entry's data
+        :type record: Dict[str, Any]
+        """
+        staged = self._staged.setdefault(table, dict())
+
+        if id_ not in staged and id_ not in self._contents[table]:
+            self._added.setdefault(table, [0])[0] += 1
+
+        self._indexes.update(table, id_, staged.get(id_), record)
+        staged[id_] = record
+
+    def rows(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Gets the staged entries.
+
+        :return: The table, ID and data of each staged entry
+        :rtype: List[Tuple[str, str, Dict[str, Any]]]
+        """
+        return [
+            (table, id_, record)
+            for table, staged in self._staged.items()
+            for id_, record in staged.items()
+        ]
@@ -32,5 +32,5 @@ setuptools.setup(
         'Werkzeug==1.0.0',
         'wrapt==1.11.2'
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
 )
@@ -1,6 +1,13 @@
 import sys  # NOQA: F401
 from sys import argv
 
+USAGE = (
+    'Usage: python -m tests '
+    '<server / client / init_db / bench_accept / bench_framing / bench_db / '
+    'bench_dispatch / bench_codec / bench_compression / bench_clients / bench_storage / '
+    'bench_history / test_codec>'
+)
+
 
 def main():
     if len(argv) == 2:
@@ -13,15 +20,55 @@ def main():
             from tests.run_client import run_client
             run_client()
 
+        elif argv[1] == 'bench_accept':
+            from tests.bench_accept import run_bench_accept
+            run_bench_accept()
+
+        elif argv[1] == 'bench_framing':
+            from tests.bench_framing import run_bench_framing
+            run_bench_framing()
+
+        elif argv[1] == 'bench_db':
+            from tests.bench_db import run_bench_db
+            run_bench_db()
+
+        elif argv[1] == 'bench_dispatch':
+            from tests.bench_dispatch import run_bench_dispatch
+            run_bench_dispatch()
+
+        elif argv[1] == 'bench_codec':
+            from tests.bench_codec import run_bench_codec
+            run_bench_codec()
+
+        elif argv[1] == 'bench_compression':
+            from tests.bench_compression import run_bench_compression
+            run_bench_compression()
+
+        elif argv[1] == 'bench_clients':
+            from tests.bench_clients import run_bench_clients
+            run_bench_clients()
+
+        elif argv[1] == 'bench_storage':
+            from tests.bench_storage import run_bench_storage
+            run_bench_storage()
+
+        elif argv[1] == 'bench_history':
+            from tests.bench_history import run_bench_history
+            run_bench_history()
+
+        elif argv[1] == 'test_codec':
+            from tests.test_codec import run_test_codec
+            run_test_codec()
+
         elif argv[1] == 'init_db':
             from frost.server.database import init_db
             init_db()
 
         else:
-            print('Usage: python -m tests <server / client / init_db>')
+            print(USAGE)
 
     else:
-        print('Usage: python -m tests <server / client / init_db>')
+        print(USAGE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+import socket
+import threading
+import time
+
+from frost.server.socketio import BaseServer
+
+
+def _connect_many(ip: str, port: int, count: int) -> None:
+    for _ in range(count):
+        conn = socket.create_connection((ip, port))
+        conn.close()
+
+
+def run_bench_accept(
+    ip: str = '127.0.0.1',
+    port: int = 5556,
+    clients: int = 8,
+    connects: int = 1000
+) -> None:
+    accepted = threading.Semaphore(0)
+
+    server = BaseServer(ip, port)
+    server.func = lambda conn, addr: (conn.close(), accepted.release())
+    threading.Thread(target=server.start, daemon=True).start()
+    time.sleep(0.5)
+
+    total = clients * connects
+    start = time.perf_counter()
+
+    workers = [
+        threading.Thread(target=_connect_many, args=(ip, port, connects))
+        for _ in range(clients)
+    ]
+    for worker in workers:
+        worker.start()
+
+    for _ in range(total):
+        accepted.acquire()
+
+    elapsed = time.perf_counter() - start
+    server.stop()
+
+    print(f'{total} connects from {clients} clients in {elapsed:.3f}s')
+    print(f'{total / elapsed:.0f} connects/s')
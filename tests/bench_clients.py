@@ -0,0 +1,81 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Tuple
+
+from frost.client import AsyncFrostClient
+
+# The server runs in its own process, as it has cogs on the same routes as the client
+SERVER = '''
+import sys
+from frost.server import FrostServer, Memory
+from frost.server.hashing import Pbkdf2Hasher
+
+Memory.hasher = Pbkdf2Hasher(iterations=1000)
+FrostServer('bench_clients').run(port=int(sys.argv[1]), engine='asyncio')
+'''
+
+
+def _start_server(port: int) -> 'subprocess.Popen':
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent.parent))
+    server = subprocess.Popen(
+        [sys.executable, '-c', SERVER, str(port)],
+        cwd=tempfile.mkdtemp(),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port)).close()
+            return server
+        except ConnectionError:
+            time.sleep(0.1)
+
+    server.terminate()
+    raise RuntimeError('The server did not start')
+
+
+async def _session(port: int, name: str, messages: int) -> Tuple[float, float]:
+    async with AsyncFrostClient(port=port) as client:
+        await client.register(name, 'password')
+        await client.login(name, 'password')
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client.send_msg(1, f'{name}: {i}') for i in range(messages)))
+
+        return start, time.perf_counter()
+
+
+async def _run(port: int, sessions: int, messages: int) -> None:
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(_session(port, f'bench{i}', messages) for i in range(sessions))
+    )
+    elapsed = time.perf_counter() - start
+
+    sending = max(end for _, end in results) - min(begin for begin, _ in results)
+    sent = sessions * messages
+
+    print(f'{sessions} sessions in {elapsed:.2f}s on {threading.active_count()} thread(s)')
+    print(
+        f'{sent} messages in {sending:.2f}s, {sent / sending:.0f} messages/s, '
+        f'{sent * sessions / sending:.0f} deliveries/s'
+    )
+
+
+def run_bench_clients(port: int = 5557, sessions: int = 100, messages: int = 5) -> None:
+    server = _start_server(port)
+
+    try:
+        asyncio.run(_run(port, sessions, messages))
+    finally:
+        server.terminate()
+        server.wait()
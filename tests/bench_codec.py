@@ -0,0 +1,84 @@
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from frost.ext.socketio.codec import CODECS, Codec, msgpack
+
+COUNT = 2000
+
+
+def _message(id_: int) -> Dict[str, Any]:
+    return {
+        'message': f'Message number {id_}, a fairly ordinary line of chat.',
+        'id': id_,
+        'timestamp': datetime(2020, 6, 1, 12, 0, id_ % 60).isoformat(),
+        'from_user': {
+            'username': f'user{id_ % 8}',
+            'id': id_ % 8 + 1
+        }
+    }
+
+
+PAYLOADS = {
+    'messages/new': {
+        'headers': {'path': 'messages/new'},
+        'msg': _message(1),
+        'room_id': 1
+    },
+    'history (100)': {
+        'headers': {'path': 'rooms/get_room_msgs'},
+        'room_id': 1,
+        'messages': {id_: _message(id_) for id_ in range(1, 101)}
+    },
+    'members (50)': {
+        'headers': {'path': 'rooms/get_members'},
+        'room_id': 1,
+        'members': {id_: {'username': f'user{id_}'} for id_ in range(1, 51)}
+    }
+}
+
+
+class _DefaultJSON(Codec):
+    """JSON with the default separators, as frames were encoded before codecs, \
+    kept for comparison.
+    """
+
+    name = 'json (old)'
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data).encode('utf-8')
+
+    def decode(self, packets: bytes) -> Any:
+        return json.loads(str(packets, 'utf-8'))
+
+
+def _time(func: Callable, arg: Any, count: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(count):
+        func(arg)
+
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def run_bench_codec() -> None:
+    codecs = [_DefaultJSON(), *CODECS.values()]
+    implementation = 'C' if msgpack is not None else 'Python'
+
+    print(f'MessagePack implementation: {implementation}')
+
+    for name, payload in PAYLOADS.items():
+        print(f'{name}:')
+
+        for codec in codecs:
+            packets = codec.encode(payload)
+            count = max(COUNT * 1000 // len(packets), 10)
+
+            encode = _time(codec.encode, payload, count)
+            decode = _time(codec.decode, packets, count)
+
+            print(
+                f'  {codec.name:<11} {len(packets):>6} bytes, '
+                f'encode {encode:8.1f} us, decode {decode:8.1f} us'
+            )
@@ -0,0 +1,44 @@
+from typing import Any, Tuple
+
+from frost.ext.socketio.codec import CODECS, Codec, CompressedCodec
+from tests.bench_codec import PAYLOADS, _time
+
+COUNT = 1000
+LEVELS = (1, 6, 9)
+
+
+def _cost(codec: 'Codec', payload: Any) -> Tuple[int, float]:
+    packets = codec.encode(payload)
+    count = max(COUNT * 1000 // len(packets), 10)
+
+    encode = _time(codec.encode, payload, count)
+    decode = _time(codec.decode, packets, count)
+
+    return len(packets), encode + decode
+
+
+def _row(name: str, size: int, cpu: float, base_size: int, base_cpu: float) -> str:
+    row = f'    {name:<8} {size:>6} bytes ({size / base_size:6.1%}), {cpu:8.1f} us'
+
+    saved = base_size - size
+    spent = cpu - base_cpu
+
+    if saved > 0 and spent > 0:
+        # Below this link speed the bytes saved take longer to send than compressing them
+        row += f', pays off below {saved * 8 / spent:8.1f} Mbit/s'
+
+    return row
+
+
+def run_bench_compression() -> None:
+    for name, payload in PAYLOADS.items():
+        print(f'{name}:')
+
+        for codec in CODECS.values():
+            size, cpu = _cost(codec, payload)
+            print(f'  {codec.name}:')
+            print(_row('none', size, cpu, size, cpu))
+
+            for level in LEVELS:
+                compressed = CompressedCodec(codec, threshold=0, level=level)
+                print(_row(f'zlib -{level}', *_cost(compressed, payload), size, cpu))
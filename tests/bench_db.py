@@ -0,0 +1,67 @@
+import os
+import tempfile
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from frost.server.database import Message, configure_engine, init_db, managed_session
+from frost.server.database import db
+
+THREADS = 8
+SENDS = 250
+
+
+def _old_session(engine):
+    """Opens a session the way :func:`managed_session` used to, kept for comparison.
+    """
+    return scoped_session(sessionmaker(autocommit=False, autoflush=True, bind=engine))
+
+
+def _send_old(engine) -> None:
+    for _ in range(SENDS):
+        session = _old_session(engine)
+        try:
+            session.add(Message(message='benchmark', user_id=1, room_id=1))
+            session.flush()
+            session.commit()
+        finally:
+            session.remove()
+
+
+def _send_new(engine) -> None:
+    for _ in range(SENDS):
+        with managed_session() as session:
+            session.add(Message(message='benchmark', user_id=1, room_id=1))
+            session.flush()
+
+
+def _time(send: Callable, engine) -> float:
+    workers = [threading.Thread(target=send, args=(engine,)) for _ in range(THREADS)]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return THREADS * SENDS / (time.perf_counter() - start)
+
+
+def run_bench_db() -> None:
+    os.chdir(tempfile.mkdtemp())
+
+    configure_engine('sqlite:///old.sqlite3', journal_mode=None, synchronous=None,
+                     mmap_size=None, cache_size=None)
+    init_db()
+    old = _time(_send_old, create_engine('sqlite:///old.sqlite3', convert_unicode=True))
+
+    configure_engine('sqlite:///new.sqlite3')
+    init_db()
+    new = _time(_send_new, db.engine)
+
+    print(f'{THREADS} threads x {SENDS} sends')
+    print(f'new session per send, default pragmas: {old:8.0f} sends/s')
+    print(f'pooled sessions, tuned pragmas:        {new:8.0f} sends/s')
@@ -0,0 +1,64 @@
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from frost.ext import Cog, Handler
+from frost.ext.cog import _cogs
+
+COUNT = 200000
+PATHS = ('bench_auth/login', 'bench_msgs/send_msg', 'bench_rooms/get_members')
+
+
+class BenchAuth(Cog, route='bench_auth'):
+
+    def login(data: Dict[str, Any], **kwargs: Any) -> None:
+        pass
+
+
+class BenchMsgs(Cog, route='bench_msgs'):
+
+    def send_msg(data: Dict[str, Any], **kwargs: Any) -> None:
+        pass
+
+
+class BenchRooms(Cog, route='bench_rooms'):
+
+    def get_members(data: Dict[str, Any], **kwargs: Any) -> None:
+        pass
+
+
+def _walk_path(path: str) -> Callable:
+    """The route lookup used before the route table, kept for comparison.
+    """
+    result = _cogs
+    for part in Path(path).parts:
+        result = result[part]
+
+    return result
+
+
+def _time(dispatch: Callable) -> float:
+    frames = [{'headers': {'path': path}} for path in PATHS]
+    count = COUNT // len(frames)
+
+    start = time.perf_counter()
+
+    for _ in range(count):
+        for data in frames:
+            dispatch(data)
+
+    return (time.perf_counter() - start) / (count * len(frames)) * 1e9
+
+
+def run_bench_dispatch() -> None:
+    BenchAuth()
+    BenchMsgs()
+    BenchRooms()
+
+    handler = Handler()
+
+    walked = _time(lambda data: _walk_path(data['headers']['path'])(data))
+    table = _time(handler.handle)
+
+    print(f'Path walking: {walked:8.1f} ns/dispatch')
+    print(f'Route table:  {table:8.1f} ns/dispatch ({walked / table:.1f}x)')
@@ -0,0 +1,63 @@
+import json
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable
+
+from frost.ext.socketio.framing import FrameReader, encode
+
+SIZES = (1024, 64 * 1024, 8 * 1024 * 1024)
+TOTAL_BYTES = 64 * 1024 * 1024
+
+
+def _frame(size: int, legacy: bool) -> bytes:
+    return encode({'msg': 'x' * (size - 11)}, legacy)
+
+
+def _concat_recieve(conn: 'socket.socket') -> Any:
+    """The receive path used before :class:`FrameReader`, kept for comparison.
+    """
+    size = struct.calcsize('L')
+    size = conn.recv(size)
+    size = socket.ntohl(struct.unpack('L', size)[0])
+
+    result = b''
+
+    while len(result) < size:
+        result += conn.recv(size - len(result))
+
+    return json.loads(result)
+
+
+def _time(recieve: Callable, size: int, legacy: bool = False) -> float:
+    frame = _frame(size, legacy)
+    count = max(TOTAL_BYTES // size, 8)
+    sender, reciever = socket.socketpair()
+
+    writer = threading.Thread(target=sender.sendall, args=(frame * count,))
+    start = time.perf_counter()
+    writer.start()
+
+    for _ in range(count):
+        recieve(reciever)
+
+    elapsed = time.perf_counter() - start
+    writer.join()
+    sender.close()
+    reciever.close()
+
+    return count * len(frame) / elapsed / 1024 / 1024
+
+
+def run_bench_framing() -> None:
+    for size in SIZES:
+        reader = FrameReader()
+
+        concat = _time(_concat_recieve, size, legacy=True)
+        framed = _time(reader.recieve, size)
+
+        print(
+            f'{size // 1024:>5} KB frames: concatenation {concat:8.1f} MB/s, '
+            f'FrameReader {framed:8.1f} MB/s'
+        )
@@ -0,0 +1,80 @@
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import Optional
+
+from frost.server.cogs import Msgs
+from frost.server.database import Message, Room, configure_engine, init_db, managed_session
+from frost.server.logger import logger
+from frost.server.objects import Memory, RoomHistory
+
+ROOMS = 20
+MESSAGES = 200
+REQUESTS = 2000
+
+
+def _setup() -> None:
+    os.chdir(tempfile.mkdtemp())
+    configure_engine('sqlite:///bench.sqlite3')
+    init_db()
+
+    with managed_session() as session:
+        session.add_all([
+            Room(name=f'Room {room_id}', invite_code=f'room{room_id}', owner_id=1)
+            for room_id in range(2, ROOMS + 1)
+        ])
+
+    with managed_session() as session:
+        session.add_all([
+            Message(message=f'Message number {i}', user_id=1, room_id=room_id)
+            for room_id in range(1, ROOMS + 1)
+            for i in range(MESSAGES)
+        ])
+
+    for room_id in range(1, ROOMS + 1):
+        Memory.memberships.add(1, room_id)
+
+
+def _time(history: Optional[RoomHistory]) -> float:
+    Memory.history = history
+    rooms = random.Random(0).choices(range(1, ROOMS + 1), k=REQUESTS)
+
+    start = time.perf_counter()
+
+    for room_id in rooms:
+        Msgs._get_room_msgs(
+            {'room_id': room_id},
+            'token',
+            1,
+            client_send=lambda data: None,
+            addr=('127.0.0.1', 0)
+        )
+
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def run_bench_history() -> None:
+    logger.setLevel(logging.WARNING)
+    _setup()
+
+    history = Memory.history
+
+    try:
+        print(f'{REQUESTS} history requests over {ROOMS} rooms of {MESSAGES} messages')
+        print(f'database:             {_time(None):8.0f} requests/s')
+
+        for max_bytes in (RoomHistory.MAX_BYTES, 64 * 1024):
+            cache = RoomHistory(max_bytes=max_bytes)
+            rate = _time(cache)
+            stats = cache.stats()
+
+            print(
+                f'cache of {max_bytes // 1024:>5} KiB: {rate:8.0f} requests/s, '
+                f'hit rate {stats["hit_rate"]:.0%}, {stats["evictions"]} evictions, '
+                f'{stats["rooms"]} rooms, {stats["bytes"] // 1024} KiB'
+            )
+
+    finally:
+        Memory.history = history
@@ -0,0 +1,159 @@
+import copy
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from frost.server.storage import (
+    Base,
+    Engine,
+    FileEngine,
+    JournalEngine,
+    MappedEngine,
+    Message,
+    User
+)
+from frost.server.storage.defaults import DEFAULT_FORMAT
+
+SIZES = (100, 1000, 10000)
+WRITES = 200
+HISTORY_SIZES = (10000, 100000)
+IMPORT_SIZE = 1000
+
+
+def _contents(size: int) -> Dict[str, Any]:
+    contents = copy.deepcopy(DEFAULT_FORMAT)
+    messages = contents['messages']
+
+    for id_ in range(1, size + 1):
+        messages[str(id_)] = {
+            'message': f'Message number {id_}',
+            'from_user': {'id': '1', 'username': 'bench'},
+            'timestamp': '2020-06-01 12:00:00'
+        }
+
+    messages['meta']['last_id'] = str(size)
+
+    users = contents['users']
+
+    for id_ in range(1, size + 1):
+        users[str(id_)] = {'username': f'user{id_}', 'password': 'hash', 'token': None}
+
+    users['meta']['last_id'] = str(size)
+
+    return contents
+
+
+def _save(engine: Engine, size: int) -> None:
+    engine.replace(_contents(size))
+    engine.close()
+
+
+def _add_message(i: int) -> None:
+    Message.add(Message(f'New message {i}', '2020-06-01 12:00:00', {'id': '1'}))
+    Message.search(str(i + 1))
+
+
+def _add_user(i: int) -> None:
+    User.add(User(f'new{i}', 'hash'))
+    User.find_by(username=f'user{i + 1}')
+
+
+def _time(
+    engine_factory: Callable[[str], Engine],
+    size: int,
+    write: Callable[[int], None]
+) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'storage.json')
+        _save(engine_factory(path), size)
+        Base.engine = engine_factory(path)
+
+        # Load the data and build the indexes before timing
+        Message.search('1')
+        User.find_by(username='user1')
+        start = time.perf_counter()
+
+        for i in range(WRITES):
+            write(i)
+
+        elapsed = time.perf_counter() - start
+        Base.engine.close()
+
+    return elapsed / WRITES * 1e6
+
+
+def _import(engine_factory: Callable[[str], Engine], many: bool) -> float:
+    users = [User(f'imported{i}', 'hash') for i in range(IMPORT_SIZE)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'storage.json')
+        _save(engine_factory(path), 0)
+        Base.engine = engine_factory(path)
+
+        start = time.perf_counter()
+
+        if many:
+            User.add_many(users)
+        else:
+            for user in users:
+                User.add(user)
+
+        elapsed = time.perf_counter() - start
+        Base.engine.close()
+
+    return elapsed * 1e3
+
+
+def _memory(engine_factory: Callable[[str], Engine], size: int) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'storage.json')
+        _save(engine_factory(path), size)
+
+        tracemalloc.start()
+        Base.engine = engine_factory(path)
+        Message.search('1')
+
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        Base.engine.close()
+
+    return used / 2 ** 20
+
+
+def run_bench_storage() -> None:
+    engine = Base.engine
+
+    try:
+        for name, write in (('messages', _add_message), ('users', _add_user)):
+            for size in SIZES:
+                whole = _time(FileEngine, size, write)
+                journal = _time(JournalEngine, size, write)
+                mapped = _time(MappedEngine, size, write)
+
+                print(
+                    f'{size:>6} {name:<8}: whole file {whole:10.1f} us/write, '
+                    f'journal {journal:6.1f} us/write, mapped {mapped:6.1f} us/write'
+                )
+
+        for engine_factory in (FileEngine, JournalEngine, MappedEngine):
+            single = _import(engine_factory, False)
+            many = _import(engine_factory, True)
+
+            print(
+                f'{IMPORT_SIZE} users imported by {engine_factory.__name__:<13}: '
+                f'one by one {single:8.1f} ms, add_many {many:6.1f} ms'
+            )
+
+        for size in HISTORY_SIZES:
+            journal = _memory(JournalEngine, size)
+            mapped = _memory(MappedEngine, size)
+
+            print(
+                f'{size:>7} messages loaded: journal {journal:7.1f} MiB, '
+                f'mapped {mapped:5.1f} MiB'
+            )
+
+    finally:
+        Base.engine = engine
@@ -1,25 +1,16 @@
 import time
+from concurrent.futures import Future
 
 from frost import FrostClient
 from frost.client.objects import Memory
 from frost.client import Status, threaded
-from frost.client.events import Messages, EventStatus
+from frost.client.events import Messages
 
 
-@threaded(daemon=True)
-def check_msgs() -> None:
-    while True:
-        msgs = Messages.get_new_msgs()
-
-        if msgs:
-            print(msgs)
-
-        member_changes = Memory.get_room_member_changes()
-
-        if member_changes['left'] or member_changes['joined']:
-            print(member_changes)
-
-        time.sleep(0.25)
+def check_msgs(client: 'FrostClient') -> None:
+    client.on('message', print)
+    client.on('member_joined', print)
+    client.on('member_left', print)
 
 
 @threaded()
@@ -29,22 +20,16 @@ def send_msg(client: 'FrostClient'):
         client.send_msg(2, msg)
 
 
-def get_status(name):
-    status = None
-    while status is None:
-        status = EventStatus.get_status(name)
-
-    return status
+def get_status(future: 'Future') -> int:
+    return future.result(timeout=10)['headers']['status']
 
 
 def create_room(client: 'FrostClient', name: str):
-    client.create_room(name)
-    print(get_status('create_room'))
+    print(get_status(client.create_room(name)))
 
 
 def get_invite_code(client: 'FrostClient', room_id: int):
-    client.get_invite_code(room_id)
-    status = get_status('get_invite_code')
+    status = get_status(client.get_invite_code(room_id))
 
     if status == Status.SUCCESS.value:
         print(Memory.rooms[room_id].invite_code)
@@ -54,8 +39,7 @@ def get_invite_code(client: 'FrostClient', room_id: int):
 
 
 def get_joined_rooms(client: 'FrostClient'):
-    client.get_joined_rooms()
-    status = get_status('get_joined_rooms')
+    status = get_status(client.get_joined_rooms())
 
     if status == Status.SUCCESS.value:
         print(Memory.rooms)
@@ -65,23 +49,19 @@ def get_joined_rooms(client: 'FrostClient'):
 
 
 def join_room(client: 'FrostClient', invite_code: str):
-    client.join_room(invite_code)
-    print(get_status('join_room'))
+    print(get_status(client.join_room(invite_code)))
 
 
 def leave_room(client: 'FrostClient', room_id: int):
-    client.leave_room(room_id)
-    print(get_status('leave_room'))
+    print(get_status(client.leave_room(room_id)))
 
 
 def get_room_msgs(client: 'FrostClient', room_id: int):
-    client.get_room_msgs(room_id)
-    print(get_status('get_room_msgs'))
+    print(get_status(client.get_room_msgs(room_id)))
 
 
 def get_room_members(client: 'FrostClient', room_id: int):
-    client.get_room_members(room_id)
-    status = get_status('get_room_members')
+    status = get_status(client.get_room_members(room_id))
 
     if status == Status.SUCCESS.value:
         print(Memory.rooms[room_id].members)
@@ -96,19 +76,17 @@ def run_client():
 
     # reg = None
     # while reg in (Status.INVALID_AUTH.value, None):
-    #     client.register(
+    #     reg = get_status(client.register(
     #         input('Username: '),
     #         input('Password: ')
-    #     )
-    #     reg = get_status('register')
+    #     ))
 
     login = None
     while login in (Status.INVALID_AUTH.value, None):
-        client.login(
+        login = get_status(client.login(
             input('Username: '),
             input('Password: ')
-        )
-        login = get_status('login')
+        ))
 
     get_joined_rooms(client)
 
@@ -132,6 +110,6 @@ def run_client():
     print(Memory.rooms)
 
     # send_msg(client)
-    # check_msgs()
+    # check_msgs(client)
 
     client.close()
@@ -0,0 +1,181 @@
+import math
+import struct
+import unittest
+from typing import Any
+
+from frost.ext.socketio import codec
+from frost.ext.socketio.codec import MsgPackCodec
+
+INTS = (
+    (0, 0x00), (0x7f, 0x7f), (0x80, 0xcc), (0xff, 0xcc), (0x100, 0xcd), (0xffff, 0xcd),
+    (0x10000, 0xce), (0xffffffff, 0xce), (0x100000000, 0xcf), ((1 << 64) - 1, 0xcf),
+    (-1, 0xff), (-0x20, 0xe0), (-0x21, 0xd0), (-0x80, 0xd0), (-0x81, 0xd1),
+    (-0x8000, 0xd1), (-0x8001, 0xd2), (-(1 << 31), 0xd2), (-(1 << 31) - 1, 0xd3),
+    (-(1 << 63), 0xd3)
+)
+"""Integers at each width boundary, with the type byte they are encoded with.
+"""
+
+STRS = (
+    (0, 0xa0), (31, 0xbf), (32, 0xd9), (255, 0xd9), (256, 0xda), (0xffff, 0xda), (0x10000, 0xdb)
+)
+BINS = ((0, 0xc4), (255, 0xc4), (256, 0xc5), (0xffff, 0xc5), (0x10000, 0xc6))
+ARRAYS = ((0, 0x90), (15, 0x9f), (16, 0xdc), (0xffff, 0xdc), (0x10000, 0xdd))
+MAPS = ((0, 0x80), (15, 0x8f), (16, 0xde), (0xffff, 0xde), (0x10000, 0xdf))
+"""Lengths at each length class boundary, with the type byte they are encoded with.
+"""
+
+NESTED = {
+    'headers': {'path': 'messages/new', 'status': 0, 'request_id': 7},
+    'msg': {
+        1: {'message': 'hé', 'from_user': {'username': 'u', 'id': -3}, 'ok': True},
+        2: {'message': 'x' * 40, 'timestamp': None, 'raw': b'\x00\xff', 'score': -2.5}
+    },
+    'members': [[1, 'a'], [2, 'b'], [], [[[0x10000]]]],
+    'flags': [False, None, 1.0, 0x100000000, -0x8001]
+}
+
+
+class FallbackMsgPackTest(unittest.TestCase):
+    """Tests the MessagePack implementation used when the :code:`msgpack` package \
+    is not installed, whether or not it is installed here.
+    """
+
+    def setUp(self) -> None:
+        self._msgpack = codec.msgpack
+        codec.msgpack = None
+        self.codec = MsgPackCodec()
+
+    def tearDown(self) -> None:
+        codec.msgpack = self._msgpack
+
+    def assertRoundTrip(self, value: Any, type_byte: int) -> bytes:
+        packets = self.codec.encode(value)
+
+        self.assertEqual(packets[0], type_byte, f'type byte of {value!r:.50}')
+        self.assertEqual(self.codec.decode(packets), value)
+        return packets
+
+    def test_ints(self) -> None:
+        for value, type_byte in INTS:
+            with self.subTest(value=value):
+                self.assertRoundTrip(value, type_byte)
+
+    def test_ints_out_of_range(self) -> None:
+        for value in (1 << 64, -(1 << 63) - 1):
+            with self.subTest(value=value):
+                self.assertRaises(OverflowError, self.codec.encode, value)
+
+    def test_constants(self) -> None:
+        for value, type_byte in ((None, 0xc0), (False, 0xc2), (True, 0xc3)):
+            with self.subTest(value=value):
+                self.assertIs(self.codec.decode(self.assertRoundTrip(value, type_byte)), value)
+
+    def test_floats(self) -> None:
+        for value in (0.0, -0.0, 1.5, -2.25, 1e300, 5e-324, math.inf, -math.inf):
+            with self.subTest(value=value):
+                self.assertRoundTrip(value, 0xcb)
+
+        self.assertTrue(math.isnan(self.codec.decode(self.codec.encode(math.nan))))
+        self.assertEqual(self.codec.decode(b'\xca' + struct.pack('!f', 1.5)), 1.5)
+
+    def test_str_lengths(self) -> None:
+        for length, type_byte in STRS:
+            with self.subTest(length=length):
+                self.assertRoundTrip('a' * length, type_byte)
+
+        # The length counts bytes, not characters
+        self.assertRoundTrip('é' * 16, 0xd9)
+
+    def test_bin_lengths(self) -> None:
+        for length, type_byte in BINS:
+            with self.subTest(length=length):
+                self.assertRoundTrip(b'\x01' * length, type_byte)
+
+    def test_array_lengths(self) -> None:
+        for length, type_byte in ARRAYS:
+            with self.subTest(length=length):
+                self.assertRoundTrip([1] * length, type_byte)
+
+        self.assertEqual(self.codec.decode(self.codec.encode((1, 'a'))), [1, 'a'])
+
+    def test_map_lengths(self) -> None:
+        for length, type_byte in MAPS:
+            with self.subTest(length=length):
+                self.assertRoundTrip({i: i for i in range(length)}, type_byte)
+
+    def test_nested(self) -> None:
+        self.assertRoundTrip(NESTED, 0x84)
+
+        deep: Any = 'bottom'
+        for _ in range(100):
+            deep = {'a': [deep]}
+
+        self.assertRoundTrip(deep, 0x81)
+
+    def test_unsupported_types(self) -> None:
+        for value in ({1, 2}, object(), {'a': {1j}}):
+            with self.subTest(value=value):
+                self.assertRaises(TypeError, self.codec.encode, value)
+
+    def test_truncated(self) -> None:
+        packets = self.codec.encode(NESTED)
+
+        for end in range(len(packets)):
+            with self.subTest(end=end):
+                self.assertRaises(ValueError, self.codec.decode, packets[:end])
+
+        for value in [value for value, _ in INTS] + [1.5, 'a' * 0x10000, [1] * 0x10000]:
+            packets = self.codec.encode(value)
+
+            # Cut inside the header, and just before the end
+            for end in {1, min(3, len(packets) - 1), len(packets) - 1} - {len(packets)}:
+                with self.subTest(value=f'{value!r:.20}', end=end):
+                    self.assertRaises(ValueError, self.codec.decode, packets[:end])
+
+    def test_oversized_lengths(self) -> None:
+        for packets in (
+            b'\xdb\xff\xff\xff\xff' + b'ab',
+            b'\xc6\xff\xff\xff\xff' + b'ab',
+            b'\xdd\xff\xff\xff\xff\x01\x02',
+            b'\xdf\xff\xff\xff\xff\x01\x02',
+            b'\xa5ab'
+        ):
+            with self.subTest(packets=packets):
+                self.assertRaises(ValueError, self.codec.decode, packets)
+
+    def test_malformed(self) -> None:
+        for packets in (
+            b'',
+            b'\xc1',
+            b'\xd4\x01\x00',
+            b'\xa2\xff\xfe',
+            b'\x81\x90\x00',
+            b'\x91' * 100000 + b'\x00',
+            b'\x00\x00'
+        ):
+            with self.subTest(packets=packets[:8]):
+                self.assertRaises(ValueError, self.codec.decode, packets)
+
+    def test_memoryview(self) -> None:
+        packets = self.codec.encode(NESTED)
+        self.assertEqual(self.codec.decode(memoryview(packets)), NESTED)
+
+    @unittest.skipIf(codec.msgpack is None, 'the msgpack package is not installed')
+    def test_matches_msgpack(self) -> None:
+        packb = self._msgpack.packb
+        unpackb = self._msgpack.unpackb
+
+        for value in [value for value, _ in INTS] + [NESTED, 'a' * 300, [None] * 20]:
+            with self.subTest(value=f'{value!r:.20}'):
+                packets = self.codec.encode(value)
+
+                self.assertEqual(packets, packb(value, use_bin_type=True))
+                self.assertEqual(
+                    unpackb(packets, raw=False, strict_map_key=False),
+                    self.codec.decode(packets)
+                )
+
+
+def run_test_codec() -> None:
+    unittest.main(module='tests.test_codec', argv=['python -m tests test_codec'])